@@ -2,6 +2,8 @@ import pandas as pd
 import numpy as np
 import random
 import os
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
 import matplotlib.pyplot as plt
 import seaborn as sns
 from typing import List, Tuple, Dict, Optional
@@ -13,12 +15,62 @@ GERACOES = 100
 TAXA_MUTACAO = 0.05        
 TAXA_CROSSOVER = 0.8       
 
+COLUNAS_NOTAS = ['NU_NOTA_MT', 'NU_NOTA_CN', 'NU_NOTA_LC', 'NU_NOTA_CH', 'NU_NOTA_REDACAO']
+COLUNAS_DIVERSIDADE = ['Q006', 'TP_ESCOLA', 'TP_COR_RACA']
+TOTAL_ESTADOS = 27
+TAMANHO_CACHE_FITNESS = 10_000
+
+class CacheFitness:
+    """
+    Cache LRU de fitness por grupo, com contadores de acertos e falhas.
+    A chave e canonica: os bytes do grupo ordenado em int32, entao a ordem
+    dos membros no cromossomo nao importa.
+    """
+
+    def __init__(self, capacidade: int = TAMANHO_CACHE_FITNESS):
+        self.capacidade = capacidade
+        self.valores = OrderedDict()
+        self.acertos = 0
+        self.falhas = 0
+
+    @staticmethod
+    def chaves(populacao: np.ndarray) -> List[bytes]:
+        ordenados = np.sort(np.asarray(populacao, dtype=np.int32), axis=1)
+        return [linha.tobytes() for linha in ordenados]
+
+    def obter(self, chave: bytes) -> Optional[float]:
+        valor = self.valores.get(chave)
+        if valor is None:
+            self.falhas += 1
+            return None
+        self.valores.move_to_end(chave)
+        self.acertos += 1
+        return valor
+
+    def guardar(self, chave: bytes, valor: float) -> None:
+        self.valores[chave] = valor
+        self.valores.move_to_end(chave)
+        if len(self.valores) > self.capacidade:
+            self.valores.popitem(last=False)
+
+    def zerar_contadores(self) -> None:
+        self.acertos = 0
+        self.falhas = 0
+
+    def estatisticas(self) -> Dict[str, float]:
+        consultas = self.acertos + self.falhas
+        return {'acertos': self.acertos, 'falhas': self.falhas,
+                'taxa_acerto': self.acertos / consultas if consultas else 0.0,
+                'tamanho': len(self.valores), 'capacidade': self.capacidade}
+
 class OtimizadorBolsas:
-    def __init__(self, caminho_dados: str, pesos: Optional[Dict[str, float]] = None):
+    def __init__(self, caminho_dados: str, pesos: Optional[Dict[str, float]] = None,
+                 tamanho_cache: int = TAMANHO_CACHE_FITNESS):
         """
         Inicializa o otimizador.
         :param pesos: Dicionario com chaves 'notas', 'diversidade', 'regional'. 
                       Se None, usa o padrao do PDF.
+        :param tamanho_cache: Grupos guardados no cache LRU de fitness (0 = sem cache).
         """
         # Define pesos padrao se nao forem passados
         if pesos is None:
@@ -27,29 +79,55 @@ class OtimizadorBolsas:
             self.pesos = pesos
 
         # Leitura com ponto e virgula
+        self.caminho_dados = caminho_dados
         self.df = pd.read_csv(caminho_dados, sep=';', encoding='latin1')
         self.indices_disponiveis = self.df.index.tolist()
         self.max_nota = 1000 
+
+        # Representacao em arrays, calculada uma unica vez: a media das notas
+        # de cada candidato e cada coluna categorica como codigos inteiros
+        # (0..total-1), junto com o total de categorias do dataset inteiro.
+        self.media_notas = self.df[COLUNAS_NOTAS].to_numpy(dtype=np.float64).mean(axis=1)
+        self.codigos_diversidade = []
+        self.totais_diversidade = []
+        for coluna in COLUNAS_DIVERSIDADE:
+            codigos, categorias = pd.factorize(self.df[coluna], use_na_sentinel=False)
+            self.codigos_diversidade.append(codigos)
+            self.totais_diversidade.append(len(categorias))
+        self.codigos_estado, estados = pd.factorize(self.df['SG_UF_RESIDENCIA'], use_na_sentinel=False)
+        self.total_codigos_estado = len(estados)
+        self.n_candidatos = len(self.df)
+        self.cache_fitness = CacheFitness(tamanho_cache)
         print(f"Dados carregados. Pesos: {self.pesos}")
 
-    def calcular_fitness(self, cromossomo: List[int]) -> float:
-        grupo = self.df.iloc[cromossomo]
+    @staticmethod
+    def contar_distintos(codigos: np.ndarray, total: int) -> np.ndarray:
+        """Quantidade de categorias distintas em cada linha de uma matriz de codigos."""
+        # Cada linha ganha uma faixa propria de `total` posicoes no bincount.
+        deslocados = codigos + (np.arange(codigos.shape[0]) * total)[:, None]
+        contagens = np.bincount(deslocados.ravel(), minlength=codigos.shape[0] * total)
+        return np.count_nonzero(contagens.reshape(codigos.shape[0], total), axis=1)
+
+    def calcular_fitness_populacao(self, populacao: np.ndarray) -> np.ndarray:
+        """
+        Avalia uma populacao inteira de uma vez.
+        :param populacao: Matriz (individuos x TAMANHO_GRUPO) com os indices dos candidatos.
+        :return: Array com o fitness de cada individuo.
+        """
+        populacao = np.asarray(populacao)
 
         # 1. Performance Academica
-        cols_notas = ['NU_NOTA_MT', 'NU_NOTA_CN', 'NU_NOTA_LC', 'NU_NOTA_CH', 'NU_NOTA_REDACAO']
-        media_grupo = grupo[cols_notas].mean().mean()
-        score_notas = media_grupo / self.max_nota
+        score_notas = self.media_notas[populacao].mean(axis=1) / self.max_nota
 
         # 2. Diversidade Socioeconomica
-        div_renda = len(grupo['Q006'].unique()) / len(self.df['Q006'].unique())
-        div_escola = len(grupo['TP_ESCOLA'].unique()) / len(self.df['TP_ESCOLA'].unique())
-        div_raca = len(grupo['TP_COR_RACA'].unique()) / len(self.df['TP_COR_RACA'].unique())
-        score_diversidade = (div_renda + div_escola + div_raca) / 3
+        score_diversidade = sum(
+            self.contar_distintos(codigos[populacao], total) / total
+            for codigos, total in zip(self.codigos_diversidade, self.totais_diversidade)
+        ) / len(COLUNAS_DIVERSIDADE)
 
         # 3. Cobertura Regional
-        qtd_estados = len(grupo['SG_UF_RESIDENCIA'].unique())
-        total_estados = 27
-        score_regional = qtd_estados / total_estados
+        qtd_estados = self.contar_distintos(self.codigos_estado[populacao], self.total_codigos_estado)
+        score_regional = qtd_estados / TOTAL_ESTADOS
 
         # Formula Final usando os PESOS DINAMICOS
         fitness = (self.pesos['notas'] * score_notas) + \
@@ -57,6 +135,40 @@ class OtimizadorBolsas:
                   (self.pesos['regional'] * score_regional)
         return fitness
 
+    def calcular_fitness(self, cromossomo: List[int]) -> float:
+        return float(self.calcular_fitness_populacao(np.asarray(cromossomo)[None, :])[0])
+
+    def avaliar_populacao(self, populacao: np.ndarray) -> np.ndarray:
+        """
+        Fitness da populacao passando pelo `cache_fitness`: so os grupos ineditos
+        sao calculados, numa unica chamada de `calcular_fitness_populacao`.
+        """
+        populacao = np.asarray(populacao)
+        if self.cache_fitness.capacidade <= 0:
+            return self.calcular_fitness_populacao(populacao)
+
+        fitnesses = np.empty(populacao.shape[0])
+        pendentes = {}
+        for i, chave in enumerate(CacheFitness.chaves(populacao)):
+            if chave in pendentes:
+                # Mesmo grupo repetido na populacao: calculado uma vez so
+                pendentes[chave].append(i)
+                self.cache_fitness.acertos += 1
+                continue
+            valor = self.cache_fitness.obter(chave)
+            if valor is None:
+                pendentes[chave] = [i]
+            else:
+                fitnesses[i] = valor
+
+        if pendentes:
+            primeiros = [posicoes[0] for posicoes in pendentes.values()]
+            calculados = self.calcular_fitness_populacao(populacao[primeiros])
+            for (chave, posicoes), valor in zip(pendentes.items(), calculados.tolist()):
+                fitnesses[posicoes] = valor
+                self.cache_fitness.guardar(chave, valor)
+        return fitnesses
+
     def gerar_individuo(self) -> List[int]:
         return random.sample(self.indices_disponiveis, TAMANHO_GRUPO)
 
@@ -91,13 +203,14 @@ class OtimizadorBolsas:
 
     def executar(self) -> Tuple[List[int], List[float]]:
         # Removidos prints excessivos para nao poluir o Streamlit
+        self.cache_fitness.zerar_contadores()
         populacao = [self.gerar_individuo() for _ in range(TAMANHO_POPULACAO)]
         melhor_historico = []
         melhor_solucao_global = None
         melhor_fit_global = -1.0
 
         for _ in range(GERACOES):
-            fitnesses = [self.calcular_fitness(ind) for ind in populacao]
+            fitnesses = self.avaliar_populacao(np.array(populacao)).tolist()
             
             max_fit_atual = max(fitnesses)
             idx_max = fitnesses.index(max_fit_atual)
@@ -123,6 +236,320 @@ class OtimizadorBolsas:
 
         return melhor_solucao_global, melhor_historico
 
+    # --- MOTOR EM LOTE: POPULACAO COMO MATRIZ int32 (individuos x TAMANHO_GRUPO) ---
+
+    def reparar_lote(self, populacao: np.ndarray, rng: np.random.Generator,
+                     lacunas: Optional[np.ndarray] = None) -> np.ndarray:
+        """
+        Substitui, em todas as linhas de uma vez, os genes repetidos (e as
+        posicoes marcadas em `lacunas`) por candidatos que ainda nao estao no
+        grupo. Devolve cada linha em ordem crescente.
+        """
+        n_ind = populacao.shape[0]
+        linhas = np.arange(n_ind)[:, None]
+
+        # Repetidos: na linha ordenada, todo gene igual ao anterior (mantem a 1a ocorrencia)
+        ordem = np.argsort(populacao, axis=1, kind='stable')
+        ordenados = np.take_along_axis(populacao, ordem, axis=1)
+        repetido_ordenado = np.zeros(populacao.shape, dtype=bool)
+        repetido_ordenado[:, 1:] = ordenados[:, 1:] == ordenados[:, :-1]
+        trocar = np.zeros(populacao.shape, dtype=bool)
+        np.put_along_axis(trocar, ordem, repetido_ordenado, axis=1)
+        if lacunas is not None:
+            trocar |= lacunas
+
+        # Mascara de pertinencia: presente[i, c] indica se o candidato c esta no grupo i
+        presente = np.zeros((n_ind, self.n_candidatos), dtype=bool)
+        presente[linhas, populacao] = True
+
+        while trocar.any():
+            lin, col = np.nonzero(trocar)
+            sorteados = rng.integers(0, self.n_candidatos, size=len(lin), dtype=np.int32)
+            # Aceita o sorteio fora do grupo e sem colisao com outro sorteio da mesma linha
+            _, primeiros = np.unique(lin.astype(np.int64) * self.n_candidatos + sorteados, return_index=True)
+            aceitos = np.zeros(len(lin), dtype=bool)
+            aceitos[primeiros] = True
+            aceitos &= ~presente[lin, sorteados]
+            lin, col, sorteados = lin[aceitos], col[aceitos], sorteados[aceitos]
+            populacao[lin, col] = sorteados
+            presente[lin, sorteados] = True
+            trocar[lin, col] = False
+
+        # Linhas ordenadas: membros em comum ficam alinhados entre os pais,
+        # e o crossover de um ponto os preserva em vez de gerar repetidos.
+        populacao.sort(axis=1)
+        return populacao
+
+    def gerar_populacao_lote(self, tamanho_populacao: int, rng: np.random.Generator) -> np.ndarray:
+        populacao = rng.integers(0, self.n_candidatos, size=(tamanho_populacao, TAMANHO_GRUPO), dtype=np.int32)
+        return self.reparar_lote(populacao, rng)
+
+    def selecionar_torneio_lote(self, fitnesses: np.ndarray, quantidade: int,
+                                rng: np.random.Generator) -> np.ndarray:
+        """Indices dos vencedores de `quantidade` torneios de 3 competidores."""
+        competidores = rng.integers(0, len(fitnesses), size=(quantidade, 3))
+        vencedor = np.argmax(fitnesses[competidores], axis=1)
+        return competidores[np.arange(quantidade), vencedor]
+
+    def crossover_lote(self, pais1: np.ndarray, pais2: np.ndarray,
+                       rng: np.random.Generator) -> np.ndarray:
+        """Crossover de um ponto em todos os pares; os pares sem crossover copiam os pais."""
+        n_pares = pais1.shape[0]
+        pontos = rng.integers(1, TAMANHO_GRUPO, size=n_pares)
+        pontos[rng.random(n_pares) >= TAXA_CROSSOVER] = TAMANHO_GRUPO
+        do_primeiro = np.arange(TAMANHO_GRUPO)[None, :] < pontos[:, None]
+        filhos1 = np.where(do_primeiro, pais1, pais2)
+        filhos2 = np.where(do_primeiro, pais2, pais1)
+        return np.concatenate([filhos1, filhos2])
+
+    def evoluir_lote(self, populacao: np.ndarray, geracoes: int, rng: np.random.Generator,
+                     melhor_solucao: Optional[np.ndarray] = None,
+                     melhor_fit: float = -1.0) -> Tuple[np.ndarray, np.ndarray, float, List[float]]:
+        """
+        Roda `geracoes` geracoes do motor em lote a partir de `populacao`.
+        :return: (populacao final, melhor solucao, melhor fitness, historico por geracao).
+        """
+        tamanho_populacao = populacao.shape[0]
+        melhor_historico = []
+        n_pares = tamanho_populacao // 2
+
+        for _ in range(geracoes):
+            fitnesses = self.avaliar_populacao(populacao)
+
+            idx_max = int(np.argmax(fitnesses))
+            max_fit_atual = float(fitnesses[idx_max])
+            if max_fit_atual > melhor_fit:
+                melhor_fit = max_fit_atual
+                melhor_solucao = populacao[idx_max].copy()
+
+            melhor_historico.append(max_fit_atual)
+
+            pais = self.selecionar_torneio_lote(fitnesses, 2 * n_pares, rng)
+            filhos = self.crossover_lote(populacao[pais[:n_pares]], populacao[pais[n_pares:]], rng)
+
+            # Elitismo na linha 0; os filhos completam a populacao
+            nova_pop = np.empty_like(populacao)
+            nova_pop[0] = melhor_solucao
+            nova_pop[1:] = filhos[:tamanho_populacao - 1]
+
+            # Mutacao: uma posicao sorteada vira lacuna e o reparo a preenche
+            lacunas = np.zeros(nova_pop.shape, dtype=bool)
+            mutantes = np.flatnonzero(rng.random(tamanho_populacao) < TAXA_MUTACAO)
+            mutantes = mutantes[mutantes > 0]
+            lacunas[mutantes, rng.integers(0, TAMANHO_GRUPO, size=len(mutantes))] = True
+            populacao = self.reparar_lote(nova_pop, rng, lacunas)
+
+        return populacao, melhor_solucao, melhor_fit, melhor_historico
+
+    def executar_lote(self, tamanho_populacao: int = TAMANHO_POPULACAO, geracoes: int = GERACOES,
+                      semente: Optional[int] = None) -> Tuple[List[int], List[float]]:
+        """
+        Mesmo ciclo evolutivo de `executar`, com selecao, crossover, reparo e
+        mutacao vetorizados sobre a populacao inteira.
+        :param semente: Semente do gerador NumPy (None = aleatoria).
+        :return: (melhor_solucao, melhor_historico), como em `executar`.
+        """
+        self.cache_fitness.zerar_contadores()
+        rng = np.random.default_rng(semente)
+        populacao = self.gerar_populacao_lote(tamanho_populacao, rng)
+        _, melhor_solucao_global, _, melhor_historico = self.evoluir_lote(populacao, geracoes, rng)
+        return melhor_solucao_global.tolist(), melhor_historico
+
+    # --- BUSCA LOCAL (HILL CLIMBING) COM FITNESS INCREMENTAL ---
+
+    def refinar_busca_local(self, cromossomo: List[int], tentativas: int = 10_000,
+                            semente: Optional[int] = None) -> Tuple[List[int], float]:
+        """
+        Refina um grupo trocando um membro por vez: cada tentativa sorteia uma
+        posicao e um candidato de fora e so aceita a troca se o fitness subir.
+        O fitness de cada troca vem do `AvaliadorIncremental`, em O(1).
+        :return: (grupo refinado, fitness recalculado do zero).
+        """
+        rng = random.Random(semente)
+        avaliador = AvaliadorIncremental(self, cromossomo)
+        for _ in range(tentativas):
+            posicao = rng.randrange(TAMANHO_GRUPO)
+            novo = rng.randrange(self.n_candidatos)
+            if avaliador.no_grupo[novo]:
+                continue
+            if avaliador.fitness_troca(posicao, novo) > avaliador.fitness:
+                avaliador.aplicar_troca(posicao, novo)
+        return avaliador.cromossomo[:], self.calcular_fitness(avaliador.cromossomo)
+
+    # --- MODELO DE ILHAS: POPULACOES INDEPENDENTES EM PROCESSOS, COM MIGRACAO ---
+
+    def evoluir_ilha(self, ilha: Dict, geracoes: int) -> Tuple[Dict, List[float], np.ndarray]:
+        """
+        Avanca uma ilha por `geracoes` geracoes e avalia a populacao resultante.
+        Os acertos e falhas de cache da ilha sao acumulados no proprio estado.
+        """
+        acertos, falhas = self.cache_fitness.acertos, self.cache_fitness.falhas
+        populacao, melhor_solucao, melhor_fit, historico = self.evoluir_lote(
+            ilha['populacao'], geracoes, ilha['rng'], ilha['melhor_solucao'], ilha['melhor_fit']
+        )
+        fitnesses = self.avaliar_populacao(populacao)
+        ilha = {'populacao': populacao, 'rng': ilha['rng'],
+                'melhor_solucao': melhor_solucao, 'melhor_fit': melhor_fit,
+                'acertos_cache': ilha['acertos_cache'] + self.cache_fitness.acertos - acertos,
+                'falhas_cache': ilha['falhas_cache'] + self.cache_fitness.falhas - falhas}
+        return ilha, historico, fitnesses
+
+    def executar_ilhas(self, n_ilhas: int = 4, tamanho_populacao: int = TAMANHO_POPULACAO,
+                       geracoes: int = GERACOES, intervalo_migracao: int = 10, n_migrantes: int = 2,
+                       sementes: Optional[List[int]] = None,
+                       n_processos: Optional[int] = None) -> Tuple[List[int], List[float]]:
+        """
+        Modelo de ilhas: `n_ilhas` populacoes evoluem em paralelo num pool de
+        processos e, a cada `intervalo_migracao` geracoes, os `n_migrantes`
+        melhores de cada ilha substituem os piores da ilha seguinte (anel).
+        :param sementes: Uma semente por ilha (None = aleatorias). Com as mesmas
+                         sementes o resultado se repete, com ou sem processos.
+        :param n_processos: Tamanho do pool (None = min(n_ilhas, nucleos); 1 = sem pool).
+                            Cada processo tem o seu `cache_fitness` (com a mesma
+                            capacidade) e os contadores somam os de todas as ilhas:
+                            o total de consultas e sempre o mesmo, mas os acertos
+                            dependem de qual processo recebeu cada ilha. Com 1, as
+                            ilhas compartilham um unico cache e os acertos se
+                            repetem; com pool, o `pool.map` entrega as ilhas a quem
+                            estiver livre e os acertos variam de uma execucao
+                            para outra.
+        :return: (melhor_solucao, melhor_historico), com o historico de cada
+                 geracao sendo o maior fitness entre todas as ilhas.
+        """
+        if sementes is None:
+            sementes = [None] * n_ilhas
+        if len(sementes) != n_ilhas:
+            raise ValueError(f"Esperadas {n_ilhas} sementes, recebidas {len(sementes)}.")
+        if n_migrantes >= tamanho_populacao:
+            raise ValueError("n_migrantes deve ser menor que o tamanho da populacao.")
+
+        ilhas = []
+        for semente in sementes:
+            rng = np.random.default_rng(semente)
+            ilhas.append({'populacao': self.gerar_populacao_lote(tamanho_populacao, rng), 'rng': rng,
+                          'melhor_solucao': None, 'melhor_fit': -1.0,
+                          'acertos_cache': 0, 'falhas_cache': 0})
+        melhor_historico = []
+
+        n_processos = n_processos or min(n_ilhas, os.cpu_count() or 1)
+        pool = None
+        if n_processos > 1:
+            pool = ProcessPoolExecutor(max_workers=n_processos, initializer=_iniciar_trabalhador_ilha,
+                                       initargs=(self.caminho_dados, self.pesos, self.cache_fitness.capacidade))
+        try:
+            for inicio in range(0, geracoes, intervalo_migracao):
+                n_geracoes = min(intervalo_migracao, geracoes - inicio)
+                if pool is None:
+                    resultados = [self.evoluir_ilha(ilha, n_geracoes) for ilha in ilhas]
+                else:
+                    resultados = list(pool.map(_evoluir_ilha_no_trabalhador, ilhas, [n_geracoes] * n_ilhas))
+                ilhas = [ilha for ilha, _, _ in resultados]
+                melhor_historico.extend(np.max([historico for _, historico, _ in resultados], axis=0).tolist())
+
+                # Migracao em anel: os melhores da ilha i-1 entram no lugar dos piores da ilha i
+                if inicio + n_geracoes < geracoes and n_ilhas > 1:
+                    ordens = [np.argsort(fitnesses) for _, _, fitnesses in resultados]
+                    migrantes = [ilha['populacao'][ordem[-n_migrantes:]].copy()
+                                 for ilha, ordem in zip(ilhas, ordens)]
+                    for i, (ilha, ordem) in enumerate(zip(ilhas, ordens)):
+                        ilha['populacao'][ordem[:n_migrantes]] = migrantes[i - 1]
+        finally:
+            if pool is not None:
+                pool.shutdown()
+
+        # Cada processo tem o seu cache; os contadores do run somam todas as ilhas,
+        # entao acertos e falhas dependem de como o pool distribuiu as ilhas
+        self.cache_fitness.acertos = sum(ilha['acertos_cache'] for ilha in ilhas)
+        self.cache_fitness.falhas = sum(ilha['falhas_cache'] for ilha in ilhas)
+
+        melhor_ilha = max(ilhas, key=lambda ilha: ilha['melhor_fit'])
+        return melhor_ilha['melhor_solucao'].tolist(), melhor_historico
+
+
+class AvaliadorIncremental:
+    """
+    Estado corrente de um grupo para avaliar trocas de um unico membro em O(1):
+    soma das medias de notas e, para Q006, TP_ESCOLA, TP_COR_RACA e
+    SG_UF_RESIDENCIA, a contagem de membros por categoria e o total de
+    categorias distintas.
+    """
+
+    def __init__(self, otimizador: OtimizadorBolsas, cromossomo: List[int]):
+        self.pesos = otimizador.pesos
+        self.max_nota = otimizador.max_nota
+        self.cromossomo = [int(c) for c in cromossomo]
+        # Listas em vez de arrays: o acesso escalar do Python e mais rapido
+        self.media_notas = otimizador.media_notas.tolist()
+        self.soma_notas = sum(self.media_notas[c] for c in self.cromossomo)
+        self.no_grupo = bytearray(otimizador.n_candidatos)
+        for c in self.cromossomo:
+            self.no_grupo[c] = 1
+
+        # Uma entrada por coluna: [codigos, contagens, distintos, divisor]
+        self.colunas = []
+        for codigos, total in zip(otimizador.codigos_diversidade, otimizador.totais_diversidade):
+            self.colunas.append(self._estado_coluna(codigos, total, total))
+        self.colunas.append(self._estado_coluna(
+            otimizador.codigos_estado, otimizador.total_codigos_estado, TOTAL_ESTADOS))
+        self.fitness = self._combinar(self.soma_notas, [coluna[2] for coluna in self.colunas])
+
+    def _estado_coluna(self, codigos: np.ndarray, total: int, divisor: int) -> list:
+        contagens = np.bincount(codigos[self.cromossomo], minlength=total).tolist()
+        distintos = sum(1 for contagem in contagens if contagem)
+        return [codigos.tolist(), contagens, distintos, divisor]
+
+    def _combinar(self, soma_notas: float, distintos: List[int]) -> float:
+        # Mesma formula de `calcular_fitness_populacao`
+        score_notas = soma_notas / len(self.cromossomo) / self.max_nota
+        score_diversidade = sum(
+            d / coluna[3] for d, coluna in zip(distintos[:-1], self.colunas[:-1])
+        ) / len(COLUNAS_DIVERSIDADE)
+        score_regional = distintos[-1] / self.colunas[-1][3]
+        return (self.pesos['notas'] * score_notas) + \
+               (self.pesos['diversidade'] * score_diversidade) + \
+               (self.pesos['regional'] * score_regional)
+
+    def _distintos_apos_troca(self, saindo: int, entrando: int) -> List[int]:
+        distintos = []
+        for codigos, contagens, atual, _ in self.colunas:
+            cat_sai, cat_entra = codigos[saindo], codigos[entrando]
+            if cat_sai != cat_entra:
+                atual += (contagens[cat_entra] == 0) - (contagens[cat_sai] == 1)
+            distintos.append(atual)
+        return distintos
+
+    def fitness_troca(self, posicao: int, novo: int) -> float:
+        """Fitness do grupo se `novo` entrar no lugar do membro em `posicao` (sem aplicar)."""
+        saindo = self.cromossomo[posicao]
+        soma_notas = self.soma_notas - self.media_notas[saindo] + self.media_notas[novo]
+        return self._combinar(soma_notas, self._distintos_apos_troca(saindo, novo))
+
+    def aplicar_troca(self, posicao: int, novo: int) -> None:
+        saindo = self.cromossomo[posicao]
+        distintos = self._distintos_apos_troca(saindo, novo)
+        self.soma_notas += self.media_notas[novo] - self.media_notas[saindo]
+        for coluna, d in zip(self.colunas, distintos):
+            coluna[1][coluna[0][saindo]] -= 1
+            coluna[1][coluna[0][novo]] += 1
+            coluna[2] = d
+        self.no_grupo[saindo] = 0
+        self.no_grupo[novo] = 1
+        self.cromossomo[posicao] = novo
+        self.fitness = self._combinar(self.soma_notas, distintos)
+
+
+# Cada processo do pool carrega os dados uma unica vez e reaproveita o otimizador.
+_OTIMIZADOR_TRABALHADOR: Optional[OtimizadorBolsas] = None
+
+
+def _iniciar_trabalhador_ilha(caminho_dados: str, pesos: Dict[str, float], tamanho_cache: int) -> None:
+    global _OTIMIZADOR_TRABALHADOR
+    _OTIMIZADOR_TRABALHADOR = OtimizadorBolsas(caminho_dados, pesos=pesos, tamanho_cache=tamanho_cache)
+
+
+def _evoluir_ilha_no_trabalhador(ilha: Dict, geracoes: int) -> Tuple[Dict, List[float], np.ndarray]:
+    return _OTIMIZADOR_TRABALHADOR.evoluir_ilha(ilha, geracoes)
+
 if __name__ == "__main__":
     # Mantem funcionamento original via terminal
     diretorio_atual = os.path.dirname(os.path.abspath(__file__))
@@ -21,6 +21,10 @@ p_notas = st.sidebar.slider("Performance Acadêmica", 0, 100, 50)
 p_diversidade = st.sidebar.slider("Diversidade Social", 0, 100, 30)
 p_regional = st.sidebar.slider("Cobertura Regional", 0, 100, 20)
 
+# Motor do algoritmo: todos devolvem (melhor_solucao, melhor_historico)
+st.sidebar.header("Motor do Algoritmo")
+modo = st.sidebar.radio("Modo de execução", ["Clássico", "Lote (vetorizado)", "Ilhas (multi-núcleo)"])
+
 # Botao de Acao
 btn_executar = st.sidebar.button("🤖 Encontrar Bolsistas", type="primary")
 
@@ -57,7 +61,12 @@ if btn_executar:
             with st.spinner('O algoritmo genético está evoluindo as gerações... Aguarde.'):
                 # Instancia passando os pesos da interface
                 ga = OtimizadorBolsas(arquivo_dados, pesos=pesos_normalizados)
-                melhor_indices, historico = ga.executar()
+                if modo == "Lote (vetorizado)":
+                    melhor_indices, historico = ga.executar_lote()
+                elif modo == "Ilhas (multi-núcleo)":
+                    melhor_indices, historico = ga.executar_ilhas()
+                else:
+                    melhor_indices, historico = ga.executar()
                 
                 # Prepara os dados finais
                 df_resultado = ga.df.iloc[melhor_indices]
@@ -0,0 +1,121 @@
+import os
+import sys
+
+import numpy as np
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from algoritmo_genetico import CacheFitness, OtimizadorBolsas
+
+ARQUIVO_DADOS = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'dados_enem_processados.csv')
+
+
+def registrar(nome_teste: str, status: str, detalhe: str) -> None:
+    print(f"[{status}] {nome_teste}: {detalhe}")
+
+
+def testar_despejo_lru() -> bool:
+    """Acima da capacidade sai o grupo usado ha mais tempo, nao o mais antigo inserido."""
+    nome_teste = "CACHE: DESPEJO LRU"
+    cache = CacheFitness(capacidade=2)
+    a, b, c = CacheFitness.chaves(np.array([[1, 2], [3, 4], [5, 6]]))
+    cache.guardar(a, 0.1)
+    cache.guardar(b, 0.2)
+    cache.obter(a)
+    cache.guardar(c, 0.3)
+    if list(cache.valores) != [a, c] or cache.obter(b) is not None:
+        registrar(nome_teste, "FALHA", "O grupo despejado nao foi o usado ha mais tempo.")
+        return False
+    registrar(nome_teste, "SUCESSO", "Com capacidade 2, o terceiro grupo despeja o menos usado.")
+    return True
+
+
+def testar_chave_canonica(ga: OtimizadorBolsas) -> bool:
+    """O mesmo grupo em outra ordem cai na mesma chave e e servido pelo cache."""
+    nome_teste = "CACHE: CHAVE CANONICA"
+    rng = np.random.default_rng(3)
+    populacao = ga.gerar_populacao_lote(10, rng)
+    embaralhada = rng.permuted(populacao, axis=1)
+
+    ga.cache_fitness.valores.clear()
+    ga.cache_fitness.zerar_contadores()
+    originais = ga.avaliar_populacao(populacao)
+    reavaliados = ga.avaliar_populacao(embaralhada)
+    if CacheFitness.chaves(populacao) != CacheFitness.chaves(embaralhada):
+        registrar(nome_teste, "FALHA", "Grupos iguais em outra ordem geraram chaves diferentes.")
+        return False
+    if ga.cache_fitness.acertos != 10 or not np.array_equal(originais, reavaliados):
+        registrar(nome_teste, "FALHA", f"{ga.cache_fitness.acertos} acertos em 10 grupos reordenados.")
+        return False
+    registrar(nome_teste, "SUCESSO", "10 grupos reordenados servidos pelo cache com o mesmo fitness.")
+    return True
+
+
+def testar_contadores(ga: OtimizadorBolsas) -> bool:
+    """Repetidos na mesma populacao contam como acerto; o fitness e calculado uma vez."""
+    nome_teste = "CACHE: CONTADORES"
+    rng = np.random.default_rng(5)
+    grupos = ga.gerar_populacao_lote(3, rng)
+    populacao = grupos[[0, 1, 2, 0]]
+
+    ga.cache_fitness.valores.clear()
+    ga.cache_fitness.zerar_contadores()
+    ga.avaliar_populacao(populacao)
+    primeira = (ga.cache_fitness.acertos, ga.cache_fitness.falhas)
+    ga.avaliar_populacao(populacao)
+    estatisticas = ga.cache_fitness.estatisticas()
+    esperado = {'acertos': 5, 'falhas': 3, 'taxa_acerto': 5 / 8, 'tamanho': 3}
+    obtido = {chave: estatisticas[chave] for chave in esperado}
+    if primeira != (1, 3) or obtido != esperado:
+        registrar(nome_teste, "FALHA", f"1a avaliacao {primeira}, esperado (1, 3); estatisticas {obtido}.")
+        return False
+    registrar(nome_teste, "SUCESSO", "3 falhas e 1 acerto na 1a avaliacao; 4 acertos na 2a.")
+    return True
+
+
+def testar_contadores_ilhas() -> bool:
+    """
+    No modelo de ilhas cada processo tem o seu cache e os contadores sao somados
+    entre as ilhas: o total de consultas nao depende de n_processos, mas os
+    acertos sim. Com pool eles nem se repetem entre execucoes (depende de qual
+    processo recebeu cada ilha); so nunca passam dos de um cache compartilhado.
+    """
+    nome_teste = "CACHE: CONTADORES NO MODELO DE ILHAS"
+    medicoes = {}
+    for n_processos in (1, 3):
+        ga = OtimizadorBolsas(ARQUIVO_DADOS)
+        resultado = ga.executar_ilhas(3, 20, 30, intervalo_migracao=5,
+                                      sementes=[20, 21, 22], n_processos=n_processos)
+        medicoes[n_processos] = (resultado, ga.cache_fitness.acertos, ga.cache_fitness.falhas)
+
+    (resultado_1, acertos_1, falhas_1), (resultado_3, acertos_3, falhas_3) = medicoes[1], medicoes[3]
+    if resultado_1 != resultado_3 or acertos_1 + falhas_1 != acertos_3 + falhas_3:
+        registrar(nome_teste, "FALHA", f"Consultas: {acertos_1 + falhas_1} sem pool x {acertos_3 + falhas_3} com pool.")
+        return False
+    if acertos_1 < acertos_3:
+        registrar(nome_teste, "FALHA", f"Cache compartilhado acertou menos ({acertos_1}) que os separados ({acertos_3}).")
+        return False
+    registrar(nome_teste, "SUCESSO", f"{acertos_1 + falhas_1} consultas nos dois casos; acertos: "
+                                     f"{acertos_1} com um cache, {acertos_3} com um cache por processo.")
+    return True
+
+
+def testar_sem_cache_ilhas() -> bool:
+    """tamanho_cache=0 desliga o cache tambem nos processos do pool."""
+    nome_teste = "CACHE: DESLIGADO NO MODELO DE ILHAS"
+    ga = OtimizadorBolsas(ARQUIVO_DADOS, tamanho_cache=0)
+    consultas = {}
+    for n_processos in (1, 3):
+        ga.executar_ilhas(3, 20, 10, intervalo_migracao=5, sementes=[30, 31, 32], n_processos=n_processos)
+        consultas[n_processos] = ga.cache_fitness.acertos + ga.cache_fitness.falhas
+    if any(consultas.values()):
+        registrar(nome_teste, "FALHA", f"Consultas ao cache com tamanho_cache=0, por n_processos: {consultas}.")
+        return False
+    registrar(nome_teste, "SUCESSO", "Nenhuma consulta ao cache com tamanho_cache=0, com e sem pool.")
+    return True
+
+
+if __name__ == "__main__":
+    ga = OtimizadorBolsas(ARQUIVO_DADOS)
+    resultados = [testar_despejo_lru(), testar_chave_canonica(ga), testar_contadores(ga),
+                  testar_contadores_ilhas(), testar_sem_cache_ilhas()]
+    sys.exit(0 if all(resultados) else 1)
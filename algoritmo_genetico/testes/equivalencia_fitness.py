@@ -0,0 +1,90 @@
+import os
+import sys
+import random
+from typing import List
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from algoritmo_genetico import AvaliadorIncremental, OtimizadorBolsas, TAMANHO_GRUPO
+
+ARQUIVO_DADOS = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'dados_enem_processados.csv')
+N_CROMOSSOMOS = 500
+TOLERANCIA = 1e-12
+N_TROCAS = 5_000
+
+
+def fitness_pandas(ga: OtimizadorBolsas, cromossomo: List[int]) -> float:
+    """Fitness original (iloc + unique sobre o DataFrame), usado como referencia."""
+    grupo = ga.df.iloc[cromossomo]
+
+    cols_notas = ['NU_NOTA_MT', 'NU_NOTA_CN', 'NU_NOTA_LC', 'NU_NOTA_CH', 'NU_NOTA_REDACAO']
+    media_grupo = grupo[cols_notas].mean().mean()
+    score_notas = media_grupo / ga.max_nota
+
+    div_renda = len(grupo['Q006'].unique()) / len(ga.df['Q006'].unique())
+    div_escola = len(grupo['TP_ESCOLA'].unique()) / len(ga.df['TP_ESCOLA'].unique())
+    div_raca = len(grupo['TP_COR_RACA'].unique()) / len(ga.df['TP_COR_RACA'].unique())
+    score_diversidade = (div_renda + div_escola + div_raca) / 3
+
+    qtd_estados = len(grupo['SG_UF_RESIDENCIA'].unique())
+    score_regional = qtd_estados / 27
+
+    return (ga.pesos['notas'] * score_notas) + \
+           (ga.pesos['diversidade'] * score_diversidade) + \
+           (ga.pesos['regional'] * score_regional)
+
+
+def registrar(nome_teste: str, status: str, detalhe: str) -> None:
+    print(f"[{status}] {nome_teste}: {detalhe}")
+
+
+def testar_fitness_vetorizado(ga: OtimizadorBolsas) -> bool:
+    """Cromossomos aleatorios: fitness vetorizado (individual e em populacao) igual ao original."""
+    nome_teste = "FITNESS VETORIZADO x PANDAS"
+    rng = random.Random(42)
+    cromossomos = [rng.sample(ga.indices_disponiveis, TAMANHO_GRUPO) for _ in range(N_CROMOSSOMOS)]
+
+    referencia = [fitness_pandas(ga, c) for c in cromossomos]
+    individual = [ga.calcular_fitness(c) for c in cromossomos]
+    populacao = ga.calcular_fitness_populacao(cromossomos).tolist()
+
+    maior_diferenca = max(max(abs(r - i), abs(r - p)) for r, i, p in zip(referencia, individual, populacao))
+    if maior_diferenca <= TOLERANCIA:
+        registrar(nome_teste, "SUCESSO", f"{N_CROMOSSOMOS} cromossomos, maior diferenca {maior_diferenca:.2e}.")
+        return True
+    registrar(nome_teste, "FALHA", f"Maior diferenca {maior_diferenca:.2e} acima de {TOLERANCIA:.0e}.")
+    return False
+
+
+def testar_trocas_incrementais(ga: OtimizadorBolsas) -> bool:
+    """Trocas aleatorias aplicadas em sequencia: o fitness incremental acompanha o recalculo completo."""
+    nome_teste = "FITNESS INCREMENTAL x RECALCULO"
+    rng = random.Random(7)
+    avaliador = AvaliadorIncremental(ga, rng.sample(ga.indices_disponiveis, TAMANHO_GRUPO))
+    maior_diferenca = abs(avaliador.fitness - ga.calcular_fitness(avaliador.cromossomo))
+    for _ in range(N_TROCAS):
+        posicao = rng.randrange(TAMANHO_GRUPO)
+        novo = rng.randrange(ga.n_candidatos)
+        if avaliador.no_grupo[novo]:
+            continue
+        previsto = avaliador.fitness_troca(posicao, novo)
+        avaliador.aplicar_troca(posicao, novo)
+        recalculado = ga.calcular_fitness(avaliador.cromossomo)
+        maior_diferenca = max(maior_diferenca, abs(previsto - recalculado), abs(avaliador.fitness - recalculado))
+
+    if len(set(avaliador.cromossomo)) != TAMANHO_GRUPO:
+        registrar(nome_teste, "FALHA", "O grupo ficou com membros repetidos apos as trocas.")
+        return False
+    if maior_diferenca <= TOLERANCIA:
+        registrar(nome_teste, "SUCESSO", f"{N_TROCAS} trocas, maior diferenca {maior_diferenca:.2e}.")
+        return True
+    registrar(nome_teste, "FALHA", f"Maior diferenca {maior_diferenca:.2e} acima de {TOLERANCIA:.0e}.")
+    return False
+
+
+if __name__ == "__main__":
+    resultados = []
+    for pesos in (None, {'notas': 0.2, 'diversidade': 0.5, 'regional': 0.3}):
+        ga = OtimizadorBolsas(ARQUIVO_DADOS, pesos=pesos)
+        resultados.append(testar_fitness_vetorizado(ga))
+        resultados.append(testar_trocas_incrementais(ga))
+    sys.exit(0 if all(resultados) else 1)
@@ -0,0 +1,104 @@
+import os
+import sys
+from typing import List
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from algoritmo_genetico import OtimizadorBolsas, TAMANHO_GRUPO
+
+ARQUIVO_DADOS = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'dados_enem_processados.csv')
+TAMANHO_POPULACAO = 20
+GERACOES = 30
+
+
+def registrar(nome_teste: str, status: str, detalhe: str) -> None:
+    print(f"[{status}] {nome_teste}: {detalhe}")
+
+
+def problemas_formato(ga: OtimizadorBolsas, melhor: List[int], historico: List[float], geracoes: int) -> List[str]:
+    """Confere o formato (melhor_solucao, melhor_historico) consumido pelo app.py."""
+    problemas = []
+    if not isinstance(melhor, list) or not all(isinstance(c, int) for c in melhor):
+        problemas.append("melhor_solucao nao e uma lista de int")
+    if len(melhor) != TAMANHO_GRUPO or len(set(melhor)) != TAMANHO_GRUPO:
+        problemas.append(f"grupo com {len(melhor)} membros ({len(set(melhor))} distintos)")
+    if min(melhor) < 0 or max(melhor) >= ga.n_candidatos:
+        problemas.append("indice fora do dataset")
+    if len(historico) != geracoes:
+        problemas.append(f"historico com {len(historico)} geracoes, esperadas {geracoes}")
+    elif abs(ga.calcular_fitness(melhor) - max(historico)) > 1e-12:
+        problemas.append("fitness da melhor solucao diferente do maior valor do historico")
+    return problemas
+
+
+def testar_formato_lote(ga: OtimizadorBolsas) -> bool:
+    nome_teste = "LOTE: FORMATO DO RETORNO"
+    melhor, historico = ga.executar_lote(TAMANHO_POPULACAO, GERACOES, semente=1)
+    problemas = problemas_formato(ga, melhor, historico, GERACOES)
+    if problemas:
+        registrar(nome_teste, "FALHA", "; ".join(problemas))
+        return False
+    registrar(nome_teste, "SUCESSO", f"{TAMANHO_GRUPO} candidatos distintos e {GERACOES} geracoes no historico.")
+    return True
+
+
+def testar_semente_lote(ga: OtimizadorBolsas) -> bool:
+    nome_teste = "LOTE: REPRODUTIBILIDADE POR SEMENTE"
+    primeira = ga.executar_lote(TAMANHO_POPULACAO, GERACOES, semente=7)
+    segunda = ga.executar_lote(TAMANHO_POPULACAO, GERACOES, semente=7)
+    outra = ga.executar_lote(TAMANHO_POPULACAO, GERACOES, semente=8)
+    if primeira != segunda:
+        registrar(nome_teste, "FALHA", "A mesma semente gerou resultados diferentes.")
+        return False
+    if outra == primeira:
+        registrar(nome_teste, "FALHA", "Sementes diferentes geraram o mesmo resultado.")
+        return False
+    registrar(nome_teste, "SUCESSO", "Mesma semente repete grupo e historico; outra semente muda o resultado.")
+    return True
+
+
+def testar_formato_ilhas(ga: OtimizadorBolsas) -> bool:
+    nome_teste = "ILHAS: FORMATO DO RETORNO"
+    melhor, historico = ga.executar_ilhas(3, TAMANHO_POPULACAO, GERACOES, intervalo_migracao=7,
+                                          sementes=[1, 2, 3], n_processos=1)
+    problemas = problemas_formato(ga, melhor, historico, GERACOES)
+    if problemas:
+        registrar(nome_teste, "FALHA", "; ".join(problemas))
+        return False
+    registrar(nome_teste, "SUCESSO", f"{TAMANHO_GRUPO} candidatos distintos e {GERACOES} geracoes no historico.")
+    return True
+
+
+def testar_semente_ilhas(ga: OtimizadorBolsas) -> bool:
+    nome_teste = "ILHAS: REPRODUTIBILIDADE POR SEMENTE"
+    primeira = ga.executar_ilhas(3, TAMANHO_POPULACAO, GERACOES, sementes=[4, 5, 6], n_processos=1)
+    segunda = ga.executar_ilhas(3, TAMANHO_POPULACAO, GERACOES, sementes=[4, 5, 6], n_processos=1)
+    outra = ga.executar_ilhas(3, TAMANHO_POPULACAO, GERACOES, sementes=[4, 5, 9], n_processos=1)
+    if primeira != segunda:
+        registrar(nome_teste, "FALHA", "As mesmas sementes geraram resultados diferentes.")
+        return False
+    if outra == primeira:
+        registrar(nome_teste, "FALHA", "Sementes diferentes geraram o mesmo resultado.")
+        return False
+    registrar(nome_teste, "SUCESSO", "Mesmas sementes repetem grupo e historico; outra semente muda o resultado.")
+    return True
+
+
+def testar_pool_ilhas(ga: OtimizadorBolsas) -> bool:
+    """Com as mesmas sementes, o pool de processos e o processo atual chegam ao mesmo resultado."""
+    nome_teste = "ILHAS: POOL x PROCESSO ATUAL"
+    sem_pool = ga.executar_ilhas(3, TAMANHO_POPULACAO, GERACOES, intervalo_migracao=7,
+                                 sementes=[10, 11, 12], n_processos=1)
+    com_pool = ga.executar_ilhas(3, TAMANHO_POPULACAO, GERACOES, intervalo_migracao=7,
+                                 sementes=[10, 11, 12], n_processos=3)
+    if sem_pool != com_pool:
+        registrar(nome_teste, "FALHA", "n_processos=1 e n_processos=3 divergem com as mesmas sementes.")
+        return False
+    registrar(nome_teste, "SUCESSO", "n_processos=1 e n_processos=3 devolvem o mesmo grupo e historico.")
+    return True
+
+
+if __name__ == "__main__":
+    ga = OtimizadorBolsas(ARQUIVO_DADOS)
+    resultados = [testar_formato_lote(ga), testar_semente_lote(ga),
+                  testar_formato_ilhas(ga), testar_semente_ilhas(ga), testar_pool_ilhas(ga)]
+    sys.exit(0 if all(resultados) else 1)
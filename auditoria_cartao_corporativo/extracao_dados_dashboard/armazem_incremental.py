@@ -0,0 +1,144 @@
+import json
+import os
+import shutil
+import pandas as pd
+
+TABELAS_AGREGADAS: list[str] = ["alertas", "fornecedor", "total"]
+
+
+def gravar_parquet(df: pd.DataFrame, caminho: str) -> None:
+    """Grava o Parquet de forma atômica (arquivo temporário + rename)."""
+    os.makedirs(os.path.dirname(caminho), exist_ok=True)
+    caminho_temp: str = f"{caminho}.tmp"
+    df.to_parquet(caminho_temp, index=False)
+    os.replace(caminho_temp, caminho)
+
+
+class ArmazemIncremental:
+    """
+    Estado persistido da auditoria incremental.
+
+    Guarda, em `pasta`:
+    - `manifesto.json`: impressão digital (tamanho e mtime) de cada CSV já
+      processado, os meses (ANO_MES) que ele alimenta e o total de linhas;
+    - `transacoes/<ANO_MES>/<arquivo>.parquet`: as transações normalizadas de
+      cada CSV, particionadas pelo mês da transação;
+    - `agregados/<ANO_MES>/<tabela>.parquet`: as somas em centavos do mês.
+
+    Se a `assinatura` (versão da normalização e configuração das regras)
+    mudar, o estado anterior é descartado.
+    """
+
+    def __init__(self, pasta: str, assinatura: str) -> None:
+        self.pasta: str = pasta
+        self.assinatura: str = assinatura
+        self._caminho_manifesto: str = os.path.join(pasta, "manifesto.json")
+        self.arquivos: dict[str, dict] = {}
+
+        if os.path.exists(self._caminho_manifesto):
+            with open(self._caminho_manifesto, encoding="utf-8") as f:
+                manifesto: dict = json.load(f)
+            if manifesto.get("assinatura") == assinatura:
+                self.arquivos = manifesto["arquivos"]
+            else:
+                print("Configuração da auditoria mudou: estado incremental reconstruído.")
+                shutil.rmtree(pasta)
+
+    @staticmethod
+    def impressao(arquivo: str) -> str:
+        info: os.stat_result = os.stat(arquivo)
+        return f"{info.st_size}_{info.st_mtime_ns}"
+
+    def comparar(self, arquivos: list[str]) -> tuple[list[str], list[str]]:
+        """Separa os CSVs novos ou alterados e os nomes que sumiram da pasta."""
+        nomes: set[str] = {os.path.basename(a) for a in arquivos}
+        alterados: list[str] = [
+            a for a in arquivos
+            if self.arquivos.get(os.path.basename(a), {}).get("impressao")
+            != self.impressao(a)
+        ]
+        removidos: list[str] = sorted(set(self.arquivos) - nomes)
+        return alterados, removidos
+
+    def meses(self, nome: str) -> list[str]:
+        return self.arquivos.get(nome, {}).get("meses", [])
+
+    def total_linhas(self) -> int:
+        return sum(info["linhas"] for info in self.arquivos.values())
+
+    def _caminho_transacoes(self, mes: str, nome: str) -> str:
+        base: str = os.path.splitext(nome)[0]
+        return os.path.join(self.pasta, "transacoes", mes, f"{base}.parquet")
+
+    def remover_arquivo(self, nome: str) -> None:
+        for mes in self.meses(nome):
+            caminho: str = self._caminho_transacoes(mes, nome)
+            if os.path.exists(caminho):
+                os.remove(caminho)
+        self.arquivos.pop(nome, None)
+
+    def gravar_transacoes(self, arquivo: str, df: pd.DataFrame) -> list[str]:
+        """Substitui as partições mensais de um CSV e o registra no manifesto."""
+        nome: str = os.path.basename(arquivo)
+        self.remover_arquivo(nome)
+
+        meses: list[str] = []
+        for mes, df_mes in df.groupby("ANO_MES", sort=True):
+            gravar_parquet(df_mes, self._caminho_transacoes(mes, nome))
+            meses.append(mes)
+
+        self.arquivos[nome] = {
+            "impressao": self.impressao(arquivo),
+            "meses": meses,
+            "linhas": len(df),
+        }
+        return meses
+
+    def ler_transacoes(self, meses: list[str]) -> list[tuple[str, pd.DataFrame]]:
+        """Partições dos meses pedidos, como pares (nome do CSV, transações)."""
+        partes: list[tuple[str, pd.DataFrame]] = []
+        for nome in sorted(self.arquivos):
+            for mes in meses:
+                caminho: str = self._caminho_transacoes(mes, nome)
+                if mes in self.meses(nome) and os.path.exists(caminho):
+                    partes.append((nome, pd.read_parquet(caminho)))
+        return partes
+
+    def gravar_agregados(self, mes: str, tabelas: dict[str, pd.DataFrame]) -> None:
+        for tabela in TABELAS_AGREGADAS:
+            gravar_parquet(
+                tabelas[tabela],
+                os.path.join(self.pasta, "agregados", mes, f"{tabela}.parquet"),
+            )
+
+    def remover_agregados(self, mes: str) -> None:
+        pasta_mes: str = os.path.join(self.pasta, "agregados", mes)
+        if os.path.isdir(pasta_mes):
+            shutil.rmtree(pasta_mes)
+
+    def ler_agregados(self) -> dict[str, pd.DataFrame]:
+        """Junta os agregados de todos os meses, em ordem de ANO_MES."""
+        pasta_agregados: str = os.path.join(self.pasta, "agregados")
+        meses: list[str] = (
+            sorted(os.listdir(pasta_agregados)) if os.path.isdir(pasta_agregados) else []
+        )
+        return {
+            tabela: pd.concat(
+                [
+                    pd.read_parquet(os.path.join(pasta_agregados, mes, f"{tabela}.parquet"))
+                    for mes in meses
+                ],
+                ignore_index=True,
+            )
+            for tabela in TABELAS_AGREGADAS
+        }
+
+    def salvar_manifesto(self) -> None:
+        os.makedirs(self.pasta, exist_ok=True)
+        caminho_temp: str = f"{self._caminho_manifesto}.tmp"
+        with open(caminho_temp, mode="w", encoding="utf-8") as f:
+            json.dump(
+                {"assinatura": self.assinatura, "arquivos": self.arquivos},
+                f, ensure_ascii=False, indent=2, sort_keys=True,
+            )
+        os.replace(caminho_temp, self._caminho_manifesto)
@@ -0,0 +1,101 @@
+from dataclasses import dataclass
+from datetime import date, timedelta
+from functools import lru_cache
+import numpy as np
+
+FERIADOS_FIXOS: list[str] = [
+    "-01-01", "-04-21", "-05-01", "-09-07", "-10-12",
+    "-11-02", "-11-15", "-11-20", "-12-25"
+]
+
+# Feriados móveis em dias a partir do domingo de Páscoa.
+DESLOCAMENTOS_PASCOA: dict[str, int] = {
+    "Carnaval (segunda-feira)": -48,
+    "Carnaval (terça-feira)": -47,
+    "Sexta-feira Santa": -2,
+    "Corpus Christi": 60,
+}
+
+# 1970-01-01 (dia 0 do datetime64[D]) foi uma quinta-feira (3, com segunda = 0).
+DIA_DA_SEMANA_EPOCA: int = 3
+
+
+def domingo_de_pascoa(ano: int) -> date:
+    """Data da Páscoa no calendário gregoriano (algoritmo de Meeus/Jones/Butcher)."""
+    a: int = ano % 19
+    b, c = divmod(ano, 100)
+    d, e = divmod(b, 4)
+    f: int = (b + 8) // 25
+    g: int = (b - f + 1) // 3
+    h: int = (19 * a + b - d - g + 15) % 30
+    i, k = divmod(c, 4)
+    l: int = (32 + 2 * e + 2 * i - h - k) % 7
+    m: int = (a + 11 * h + 22 * l) // 451
+    mes, dia = divmod(h + l - 7 * m + 114, 31)
+    return date(ano, mes, dia + 1)
+
+
+@dataclass(frozen=True)
+class CalendarioFeriados:
+    """
+    Feriados fixos e móveis de um intervalo de anos, com tabela de consulta.
+
+    `tabela` tem uma posição por dia entre 1º de janeiro de `ano_inicial` e
+    31 de dezembro de `ano_final` e vale True nos fins de semana e feriados;
+    a consulta de uma data é só a indexação pelo número do dia.
+    """
+
+    ano_inicial: int
+    ano_final: int
+    fixos: tuple[str, ...] = tuple(FERIADOS_FIXOS)
+    moveis: tuple[tuple[str, int], ...] = tuple(DESLOCAMENTOS_PASCOA.items())
+
+    def datas(self) -> np.ndarray:
+        """Todos os feriados do intervalo, ordenados, como datetime64[D]."""
+        feriados: set[date] = set()
+        for ano in range(self.ano_inicial, self.ano_final + 1):
+            feriados.update(date.fromisoformat(f"{ano}{dia}") for dia in self.fixos)
+            pascoa: date = domingo_de_pascoa(ano)
+            feriados.update(pascoa + timedelta(days=d) for _, d in self.moveis)
+        return np.array(sorted(feriados), dtype="datetime64[D]")
+
+    @property
+    def primeiro_dia(self) -> int:
+        return int(np.datetime64(f"{self.ano_inicial}-01-01", "D").view(np.int64))
+
+    @property
+    def tabela(self) -> np.ndarray:
+        return _tabela_dias_nao_uteis(self)
+
+    def dias_nao_uteis(self, datas: np.ndarray) -> np.ndarray:
+        """Marca as datas (datetime64) que caem em fim de semana ou feriado."""
+        tabela: np.ndarray = self.tabela
+        posicoes: np.ndarray = (
+            datas.astype("datetime64[D]").view(np.int64) - self.primeiro_dia
+        )
+        # NaT e datas fora do intervalo do calendário nunca são marcados.
+        dentro: np.ndarray = ~np.isnat(datas) & (posicoes >= 0) & (posicoes < len(tabela))
+        marcadas: np.ndarray = np.zeros(len(datas), dtype=bool)
+        marcadas[dentro] = tabela[posicoes[dentro]]
+        return marcadas
+
+
+@lru_cache(maxsize=16)
+def _tabela_dias_nao_uteis(calendario: CalendarioFeriados) -> np.ndarray:
+    primeiro: int = calendario.primeiro_dia
+    ultimo: int = int(
+        np.datetime64(f"{calendario.ano_final + 1}-01-01", "D").view(np.int64)
+    )
+    dias: np.ndarray = np.arange(primeiro, ultimo)
+    tabela: np.ndarray = (dias + DIA_DA_SEMANA_EPOCA) % 7 >= 5
+    tabela[calendario.datas().view(np.int64) - primeiro] = True
+    return tabela
+
+
+def calendario_para_datas(datas: np.ndarray) -> CalendarioFeriados | None:
+    """Calendário que cobre todos os anos presentes em `datas` (None se vazio)."""
+    validas: np.ndarray = datas[~np.isnat(datas)]
+    if len(validas) == 0:
+        return None
+    anos: np.ndarray = validas.astype("datetime64[Y]").view(np.int64) + 1970
+    return CalendarioFeriados(int(anos.min()), int(anos.max()))
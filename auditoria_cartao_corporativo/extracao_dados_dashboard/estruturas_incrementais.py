@@ -0,0 +1,188 @@
+import os
+import tempfile
+from typing import Iterator
+import numpy as np
+import pandas as pd
+
+# Marcadores das chaves inteiras de duplicidade. SEM_DATA fica longe de
+# qualquer dia real, então NaT só casa com NaT, inclusive com janela de dias.
+SEM_DATA: int = -(1 << 40)
+SEM_VALOR: int = np.iinfo(np.int64).min
+
+
+class CodificadorIncremental:
+    """Atribui códigos inteiros estáveis a textos vistos em blocos sucessivos."""
+
+    def __init__(self) -> None:
+        self._codigos: dict = {}
+        self.valores: list = []
+
+    def codificar(self, serie: pd.Series) -> np.ndarray:
+        codigos_locais, distintos = pd.factorize(serie)
+        # A última posição recebe os nulos (código -1 do factorize).
+        mapa: np.ndarray = np.full(len(distintos) + 1, -1, dtype=np.int32)
+        for posicao, valor in enumerate(distintos):
+            codigo: int | None = self._codigos.get(valor)
+            if codigo is None:
+                codigo = len(self.valores)
+                self._codigos[valor] = codigo
+                self.valores.append(valor)
+            mapa[posicao] = codigo
+        return mapa[codigos_locais]
+
+    def decodificar(self, codigos: np.ndarray) -> np.ndarray:
+        """Volta dos códigos aos textos; o código -1 vira None."""
+        return np.array(self.valores + [None], dtype=object)[codigos]
+
+
+def chaves_duplicidade(
+    df: pd.DataFrame, favorecidos: np.ndarray
+) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Chaves inteiras da R5: dia ordinal, valor em centavos e código do favorecido."""
+    datas: np.ndarray = df["DATA_DT"].to_numpy(dtype="datetime64[D]")
+    dias: np.ndarray = np.where(np.isnat(datas), SEM_DATA, datas.view(np.int64))
+
+    valores: np.ndarray = df["VALOR_NUM"].to_numpy(dtype=float)
+    centavos: np.ndarray = np.full(len(df), SEM_VALOR, dtype=np.int64)
+    com_valor: np.ndarray = ~np.isnan(valores)
+    centavos[com_valor] = np.round(valores[com_valor] * 100).astype(np.int64)
+
+    return dias, centavos, favorecidos.astype(np.int64)
+
+
+def marcar_duplicidades(
+    dias: np.ndarray, centavos: np.ndarray, favorecidos: np.ndarray, janela_dias: int = 0
+) -> np.ndarray:
+    """
+    Marca as linhas com outra de mesmo favorecido e valor a até `janela_dias` dias.
+
+    Com as chaves ordenadas por (favorecido, valor, dia), a linha mais próxima
+    de cada uma é sempre a anterior ou a seguinte, então basta comparar
+    vizinhas. Com `janela_dias=0` equivale a `duplicated(keep=False)`.
+    """
+    ordem: np.ndarray = np.lexsort((dias, centavos, favorecidos))
+    dias_ord: np.ndarray = dias[ordem]
+    vizinhas: np.ndarray = (
+        (favorecidos[ordem][1:] == favorecidos[ordem][:-1])
+        & (centavos[ordem][1:] == centavos[ordem][:-1])
+        & (dias_ord[1:] - dias_ord[:-1] <= janela_dias)
+    )
+    marcadas_ord: np.ndarray = np.zeros(len(ordem), dtype=bool)
+    marcadas_ord[1:] |= vizinhas
+    marcadas_ord[:-1] |= vizinhas
+
+    mascara: np.ndarray = np.empty(len(ordem), dtype=bool)
+    mascara[ordem] = marcadas_ord
+    return mascara
+
+
+class ParticoesEmDisco:
+    """
+    Registros de tamanho fixo espalhados em arquivos binários, um por partição.
+
+    `acrescentar` grava no fim do arquivo de cada partição só as linhas que
+    caem nela, na ordem em que chegaram; `ler` devolve uma partição inteira.
+    Com partições escolhidas por uma chave (ex.: o portador), tudo o que uma
+    regra precisa comparar fica junto, e a memória ocupada é a de um bloco ou
+    de uma partição, não a do histórico.
+    """
+
+    def __init__(self, tipo: np.dtype, n_particoes: int, pasta: str | None = None) -> None:
+        self.tipo: np.dtype = np.dtype(tipo)
+        self.n_particoes: int = max(1, n_particoes)
+        self.total: int = 0
+        self._temporaria = tempfile.TemporaryDirectory(prefix="particoes_", dir=pasta)
+
+    def _caminho(self, particao: int) -> str:
+        return os.path.join(self._temporaria.name, f"{particao:05d}.bin")
+
+    def acrescentar(self, chaves: np.ndarray, registros: np.ndarray) -> None:
+        """Grava `registros` na partição `chave % n_particoes` de cada um."""
+        particoes: np.ndarray = np.mod(chaves, self.n_particoes)
+        ordem: np.ndarray = np.argsort(particoes, kind="stable")
+        limites: np.ndarray = np.searchsorted(
+            particoes[ordem], np.arange(self.n_particoes + 1)
+        )
+        ordenados: np.ndarray = registros[ordem]
+        for particao in np.flatnonzero(np.diff(limites)):
+            with open(self._caminho(int(particao)), mode="ab") as f:
+                ordenados[limites[particao]:limites[particao + 1]].tofile(f)
+        self.total += len(registros)
+
+    def ler(self, particao: int) -> np.ndarray:
+        caminho: str = self._caminho(particao)
+        if not os.path.exists(caminho):
+            return np.empty(0, dtype=self.tipo)
+        return np.fromfile(caminho, dtype=self.tipo)
+
+    def __iter__(self) -> Iterator[np.ndarray]:
+        for particao in range(self.n_particoes):
+            yield self.ler(particao)
+
+    def fechar(self) -> None:
+        self._temporaria.cleanup()
+
+
+class IndiceDuplicidade:
+    """
+    Índice de duplicidade (R5) construído bloco a bloco, com memória limitada.
+
+    As chaves inteiras (dia, centavos, favorecido) de cada bloco vão para
+    `ParticoesEmDisco` pelo código do favorecido, já que só há duplicidade
+    dentro do mesmo favorecido, junto com a posição da linha e os
+    `campos_extras` pedidos. No final, cada partição é lida e marcada
+    sozinha por `marcar_duplicidades`: o pico de memória é o de uma partição
+    mais o dicionário de favorecidos distintos. Com `janela_dias > 0`,
+    também conta como duplicada a transação de mesmo favorecido e valor a
+    até N dias de distância.
+    """
+
+    CAMPOS: list[tuple[str, type]] = [
+        ("linha", np.int64), ("dia", np.int64), ("centavos", np.int64), ("favorecido", np.int64),
+    ]
+
+    def __init__(
+        self,
+        janela_dias: int = 0,
+        n_particoes: int = 1,
+        campos_extras: list[tuple[str, type]] | None = None,
+        pasta: str | None = None,
+    ) -> None:
+        self.janela_dias: int = janela_dias
+        self._favorecidos: CodificadorIncremental = CodificadorIncremental()
+        self._particoes: ParticoesEmDisco = ParticoesEmDisco(
+            np.dtype(self.CAMPOS + (campos_extras or [])), n_particoes, pasta
+        )
+
+    def registrar(self, bloco: pd.DataFrame, extras: dict[str, np.ndarray] | None = None) -> None:
+        """Acrescenta as chaves do bloco (e os valores de `campos_extras`, em `extras`)."""
+        dias, centavos, favorecidos = chaves_duplicidade(
+            bloco, self._favorecidos.codificar(bloco["NOME FAVORECIDO"])
+        )
+        registros: np.ndarray = np.empty(len(bloco), dtype=self._particoes.tipo)
+        registros["linha"] = np.arange(self._particoes.total, self._particoes.total + len(bloco))
+        registros["dia"] = dias
+        registros["centavos"] = centavos
+        registros["favorecido"] = favorecidos
+        for campo, valores in (extras or {}).items():
+            registros[campo] = valores
+        self._particoes.acrescentar(favorecidos, registros)
+
+    def marcadas_por_particao(self) -> Iterator[tuple[np.ndarray, np.ndarray]]:
+        """Cada partição com a máscara das suas linhas que têm alguma duplicidade."""
+        for registros in self._particoes:
+            if len(registros) == 0:
+                continue
+            yield registros, marcar_duplicidades(
+                registros["dia"], registros["centavos"], registros["favorecido"], self.janela_dias
+            )
+
+    def mascara(self) -> np.ndarray:
+        """Marca, na ordem de registro, as linhas com alguma duplicidade (1 byte por linha)."""
+        mascara: np.ndarray = np.zeros(self._particoes.total, dtype=bool)
+        for registros, marcadas in self.marcadas_por_particao():
+            mascara[registros["linha"][marcadas]] = True
+        return mascara
+
+    def fechar(self) -> None:
+        self._particoes.fechar()
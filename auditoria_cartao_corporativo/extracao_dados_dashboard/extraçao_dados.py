@@ -1,7 +1,24 @@
+import codecs
 import glob
+import hashlib
+import importlib.util
+import json
 import os
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from functools import partial
+from typing import Iterator
+import numpy as np
 import pandas as pd
 
+from armazem_incremental import ArmazemIncremental
+from calendario_feriados import DESLOCAMENTOS_PASCOA, FERIADOS_FIXOS
+from instrumentacao import RelatorioExecucao, medir, medir_iteracao
+from regras_auditoria import (
+    CHAVES_ALERTAS, REGRAS_AUDITORIA, agregar_alertas, alcance_dias,
+    avaliar_regras, montar_alertas,
+)
+
 
 def mascarar_nome(nome: str) -> str:
     if pd.isna(nome) or not str(nome).strip():
@@ -25,157 +42,766 @@ def mascarar_nome(nome: str) -> str:
     return f"{partes[0]} {iniciais}"
 
 
-def executar_auditoria_pasta(pasta_dados: str, pasta_resultados: str) -> None:
-    caminho_padrao: str = os.path.join(pasta_dados, "*.csv")
-    arquivos: list[str] = glob.glob(caminho_padrao)
+# Sal dos identificadores publicados (ID PORTADOR, ID FAVORECIDO). Mantido em
+# segredo, impede que alguém recalcule os identificadores a partir das listas
+# públicas de nomes do CPGF. Sem ele o hash desfaria a máscara dos nomes, então
+# a auditoria não publica identificadores sem o sal.
+VARIAVEL_SAL_IDENTIFICADORES: str = "CPGF_SAL_IDENTIFICADORES"
 
-    if not arquivos:
-        print(f"Nenhum arquivo CSV encontrado na pasta {pasta_dados}")
-        return
 
-    lista_dataframes: list[pd.DataFrame] = []
+def sal_identificadores() -> str:
+    """Lê o sal de `CPGF_SAL_IDENTIFICADORES`; falha se ele não estiver definido."""
+    sal: str = os.getenv(VARIAVEL_SAL_IDENTIFICADORES, "")
+    if not sal:
+        raise RuntimeError(
+            f"Defina a variável de ambiente {VARIAVEL_SAL_IDENTIFICADORES} com um sal secreto"
+            " e fixo entre execuções: sem ele, ID PORTADOR e ID FAVORECIDO poderiam ser"
+            " recalculados a partir dos nomes públicos do CPGF."
+        )
+    return sal
 
-    for arquivo in arquivos:
-        try:
-            df: pd.DataFrame = pd.read_csv(
-                arquivo, sep=";", encoding="utf-8"
-            )
-        except UnicodeDecodeError:
-            df = pd.read_csv(arquivo, sep=";", encoding="latin1")
 
-        lista_dataframes.append(df)
+def identificadores_anonimos(df: pd.DataFrame, colunas: list[str]) -> pd.Series:
+    """
+    Identificador estável de cada combinação de `colunas`, calculado sobre
+    os valores ainda não mascarados.
 
-    df_completo: pd.DataFrame = pd.concat(
-        lista_dataframes, ignore_index=True
+    Nomes diferentes com a mesma máscara ("JOAO S.") recebem identificadores
+    diferentes, então o identificador serve de chave onde o nome mascarado
+    colidiria. São os 16 primeiros dígitos do SHA-256 dos valores com o sal
+    de `CPGF_SAL_IDENTIFICADORES`, calculados uma vez por combinação; sem o
+    sal, levanta RuntimeError.
+    """
+    sal: str = sal_identificadores()
+    textos: list[str] = [
+        "\x1f".join(map(str, valores)) for valores in zip(*(df[c].tolist() for c in colunas))
+    ]
+    codigos, distintos = pd.factorize(pd.Series(textos, dtype=object))
+    identificadores: np.ndarray = np.array(
+        [hashlib.sha256(f"{sal}\x1f{texto}".encode("utf-8")).hexdigest()[:16] for texto in distintos],
+        dtype=object,
     )
+    return pd.Series(identificadores[codigos], index=df.index)
 
-    df_completo["VALOR_NUM"] = (
-        df_completo["VALOR TRANSAÇÃO"]
+
+def mascarar_nomes(nomes: pd.Series) -> pd.Series:
+    """
+    Versão vetorizada de `mascarar_nome` para uma coluna inteira.
+
+    Cada nome distinto é mascarado uma única vez e o resultado é espalhado de
+    volta pelos códigos do `factorize`; nulos (código -1) caem na última
+    posição, "NÃO IDENTIFICADO".
+    """
+    codigos, distintos = pd.factorize(nomes)
+    mascarados: np.ndarray = np.array(
+        [mascarar_nome(nome) for nome in distintos] + ["NÃO IDENTIFICADO"],
+        dtype=object,
+    )
+    return pd.Series(mascarados[codigos], index=nomes.index, name=nomes.name)
+
+
+VERSAO_CACHE: str = "3"
+
+# Esquema de leitura: apenas as colunas usadas pelas regras e métricas.
+# Texto de baixa cardinalidade vira categoria; valor e data chegam como texto
+# cru e são convertidos logo após a leitura. As demais colunas mantêm a
+# inferência do pandas (ex.: o CNPJ continua numérico como antes; ver
+# `normalizar_cpgf` para o CNPJ com células vazias).
+COLUNAS_CPGF: list[str] = [
+    "NOME ÓRGÃO",
+    "NOME PORTADOR",
+    "CNPJ OU CPF FAVORECIDO",
+    "NOME FAVORECIDO",
+    "TRANSAÇÃO",
+    "DATA TRANSAÇÃO",
+    "VALOR TRANSAÇÃO",
+]
+TIPOS_CPGF: dict[str, str] = {
+    "NOME ÓRGÃO": "category",
+    "TRANSAÇÃO": "category",
+    "DATA TRANSAÇÃO": "str",
+    "VALOR TRANSAÇÃO": "str",
+}
+COLUNAS_CATEGORICAS: list[str] = [
+    coluna for coluna, tipo in TIPOS_CPGF.items() if tipo == "category"
+]
+
+MOTOR_CSV: str = "pyarrow" if importlib.util.find_spec("pyarrow") else "c"
+
+_CODIFICACOES_DETECTADAS: dict[tuple[str, int, int], str] = {}
+
+
+def normalizar_cpgf(df: pd.DataFrame) -> pd.DataFrame:
+    """Converte valor/data e higieniza os favorecidos de um lote de transações."""
+    df["VALOR_NUM"] = (
+        df["VALOR TRANSAÇÃO"]
         .str.replace(".", "", regex=False)
         .str.replace(",", ".", regex=False)
         .astype(float)
     )
 
-    df_completo["DATA_DT"] = pd.to_datetime(
-        df_completo["DATA TRANSAÇÃO"], format="%d/%m/%Y", errors="coerce"
+    df["DATA_DT"] = pd.to_datetime(
+        df["DATA TRANSAÇÃO"], format="%d/%m/%Y", errors="coerce"
     )
 
-    df_completo["ANO_MES"] = (
-        df_completo["DATA_DT"].dt.to_period("M").astype(str)
-    )
+    df["ANO_MES"] = df["DATA_DT"].dt.to_period("M").astype(str)
+    df = df.drop(columns=["VALOR TRANSAÇÃO", "DATA TRANSAÇÃO"])
 
     # =========================================================================
     # HIGIENIZAÇÃO DE SAQUES E DESPESAS OPERACIONAIS/SIGILOSAS
     # =========================================================================
-    df_completo["CNPJ OU CPF FAVORECIDO"] = (
-        df_completo["CNPJ OU CPF FAVORECIDO"].astype(str).str.strip()
-    )
+    # Célula vazia numa coluna de CNPJs numéricos faz o leitor inferir float;
+    # o inteiro anulável mantém o texto sem ".0", como num arquivo sem vazios.
+    cnpj: pd.Series = df["CNPJ OU CPF FAVORECIDO"]
+    if pd.api.types.is_float_dtype(cnpj) and (cnpj.dropna() % 1 == 0).all():
+        cnpj = cnpj.astype("Int64")
+    df["CNPJ OU CPF FAVORECIDO"] = cnpj.astype(str).str.strip()
 
-    mask_saque: pd.Series = df_completo["TRANSAÇÃO"].str.contains(
+    mask_saque: pd.Series = df["TRANSAÇÃO"].str.contains(
         "SAQUE", case=False, na=False
     )
-    df_completo.loc[mask_saque, "NOME FAVORECIDO"] = "SAQUE EM ESPÉCIE"
-    df_completo.loc[mask_saque, "CNPJ OU CPF FAVORECIDO"] = "0"
+    df.loc[mask_saque, "NOME FAVORECIDO"] = "SAQUE EM ESPÉCIE"
+    df.loc[mask_saque, "CNPJ OU CPF FAVORECIDO"] = "0"
 
     mask_anomalo: pd.Series = (
-        df_completo["NOME FAVORECIDO"]
+        df["NOME FAVORECIDO"]
         .str.upper()
         .isin(["NAO S. A.", "SEM I.", "SIGILOSO"])
-        | df_completo["CNPJ OU CPF FAVORECIDO"].str.startswith("-")
+        | df["CNPJ OU CPF FAVORECIDO"].str.startswith("-")
     )
     mask_sigilo: pd.Series = mask_anomalo & (~mask_saque)
-    df_completo.loc[mask_sigilo, "NOME FAVORECIDO"] = (
-        "DESPESA OPERACIONAL / SIGILOSA"
+    df.loc[mask_sigilo, "NOME FAVORECIDO"] = "DESPESA OPERACIONAL / SIGILOSA"
+    df.loc[mask_sigilo, "CNPJ OU CPF FAVORECIDO"] = "0"
+
+    return df
+
+
+def detectar_codificacao(arquivo: str, tamanho_bloco: int = 1 << 16) -> str:
+    """
+    Identifica a codificação do CSV varrendo os bytes uma única vez.
+
+    Arquivos com BOM são tratados como `utf-8-sig`; nos demais, o primeiro
+    byte inválido em UTF-8 encerra a varredura e define `latin1` (nos CSVs
+    do CPGF isso já acontece no cabeçalho). O resultado fica memorizado por
+    caminho, tamanho e mtime.
+    """
+    info: os.stat_result = os.stat(arquivo)
+    chave: tuple[str, int, int] = (
+        os.path.abspath(arquivo), info.st_size, info.st_mtime_ns
     )
-    df_completo.loc[mask_sigilo, "CNPJ OU CPF FAVORECIDO"] = "0"
+    if chave in _CODIFICACOES_DETECTADAS:
+        return _CODIFICACOES_DETECTADAS[chave]
 
-    print(f"Registros carregados para análise avançada: {len(df_completo)}")
+    with open(arquivo, mode="rb") as f:
+        bloco: bytes = f.read(tamanho_bloco)
+        if bloco.startswith(codecs.BOM_UTF8):
+            codificacao: str = "utf-8-sig"
+        else:
+            codificacao = "utf-8"
+            decodificador = codecs.getincrementaldecoder("utf-8")()
+            try:
+                while bloco:
+                    decodificador.decode(bloco)
+                    bloco = f.read(tamanho_bloco)
+                decodificador.decode(b"", final=True)
+            except UnicodeDecodeError:
+                codificacao = "latin1"
 
-    # =========================================================================
-    # PROCESSAMENTO DAS 6 REGRAS DIRETAS (DADOS BRUTOS)
-    # =========================================================================
+    _CODIFICACOES_DETECTADAS[chave] = codificacao
+    return codificacao
+
+
+def parametros_leitura(arquivo: str) -> dict:
+    """Monta codificação, colunas e tipos de leitura de um CSV do CPGF."""
+    codificacao: str = detectar_codificacao(arquivo)
+    cabecalho: pd.Index = pd.read_csv(
+        arquivo, sep=";", encoding=codificacao, nrows=0
+    ).columns
+
+    # Colunas ausentes não são pedidas ao leitor: a falta delas continua
+    # aparecendo como KeyError na normalização, como na leitura completa.
+    colunas: list[str] = [c for c in COLUNAS_CPGF if c in cabecalho]
+    return {
+        "sep": ";",
+        "encoding": codificacao,
+        "usecols": colunas,
+        "dtype": {c: t for c, t in TIPOS_CPGF.items() if c in colunas},
+    }
+
+
+# =========================================================================
+# VALIDAÇÃO DE ESQUEMA (ANTES DA LEITURA COMPLETA)
+# =========================================================================
+LINHAS_AMOSTRA_VALIDACAO: int = 1_000
+ARQUIVO_REGISTRO_QUARENTENA: str = "quarentena.jsonl"
+
+
+def pasta_quarentena_padrao(pasta_dados: str) -> str:
+    """Pasta irmã da entrada (dados_brutos -> dados_brutos_quarentena), fora dela."""
+    return f"{os.path.normpath(os.path.abspath(pasta_dados))}_quarentena"
+
+
+class ErroEsquemaCPGF(ValueError):
+    """CSVs fora do esquema do CPGF, com os problemas de cada arquivo."""
+
+    def __init__(self, problemas: dict[str, list[str]], pasta_quarentena: str | None) -> None:
+        self.problemas: dict[str, list[str]] = problemas
+        self.pasta_quarentena: str | None = pasta_quarentena
+        destino: str = f" (movidos para {pasta_quarentena})" if pasta_quarentena else ""
+        linhas: list[str] = [
+            f"  - {os.path.basename(arquivo)}: {'; '.join(motivos)}"
+            for arquivo, motivos in problemas.items()
+        ]
+        super().__init__(
+            f"{len(problemas)} arquivo(s) fora do esquema do CPGF{destino}:\n" + "\n".join(linhas)
+        )
+
+
+def validar_arquivo_cpgf(
+    arquivo: str, linhas_amostra: int = LINHAS_AMOSTRA_VALIDACAO
+) -> list[str]:
+    """
+    Confere o cabeçalho e as primeiras `linhas_amostra` linhas de um CSV.
+
+    Exige as colunas de `COLUNAS_CPGF` e que valor e data preenchidos
+    convertam como na normalização. Células vazias são aceitas, inclusive
+    colunas inteiras: os extratos do CPGF trazem linhas sigilosas sem data e
+    sem favorecido. Devolve a lista de
+    problemas encontrados, vazia quando o arquivo está no esquema.
+    """
+    try:
+        amostra: pd.DataFrame = pd.read_csv(
+            arquivo, sep=";", encoding=detectar_codificacao(arquivo),
+            nrows=linhas_amostra, dtype=str, usecols=lambda coluna: coluna in COLUNAS_CPGF,
+        )
+    except (ValueError, pd.errors.ParserError) as e:
+        return [f"CSV ilegível ({e})"]
+
+    problemas: list[str] = []
+    ausentes: list[str] = [c for c in COLUNAS_CPGF if c not in amostra.columns]
+    if ausentes:
+        problemas.append(f"colunas ausentes: {', '.join(ausentes)}")
+    if amostra.empty:
+        return problemas
+
+    if "VALOR TRANSAÇÃO" in amostra.columns:
+        valores: pd.Series = amostra["VALOR TRANSAÇÃO"]
+        convertidos: pd.Series = pd.to_numeric(
+            valores.str.replace(".", "", regex=False).str.replace(",", ".", regex=False),
+            errors="coerce",
+        )
+        invalidos: pd.Series = valores[valores.notna() & convertidos.isna()]
+        if not invalidos.empty:
+            # +2: o índice começa em 0 e a linha 1 do arquivo é o cabeçalho.
+            problemas.append(
+                f"{len(invalidos)} valor(es) não numérico(s) em VALOR TRANSAÇÃO"
+                f" (linha {invalidos.index[0] + 2}: {invalidos.iloc[0]!r})"
+            )
+
+    if "DATA TRANSAÇÃO" in amostra.columns:
+        datas: pd.Series = amostra["DATA TRANSAÇÃO"]
+        convertidas: pd.Series = pd.to_datetime(datas, format="%d/%m/%Y", errors="coerce")
+        invalidas: pd.Series = datas[datas.notna() & convertidas.isna()]
+        if not invalidas.empty:
+            problemas.append(
+                f"{len(invalidas)} data(s) fora do formato DD/MM/AAAA em DATA TRANSAÇÃO"
+                f" (linha {invalidas.index[0] + 2}: {invalidas.iloc[0]!r})"
+            )
 
-    r1: pd.DataFrame = df_completo[df_completo["VALOR_NUM"] > 3000.00].copy()
-    r1["REGRA"] = "R1 - Gasto Diário Elevado"
+    return problemas
 
-    df_ordenado: pd.DataFrame = (
-        df_completo.dropna(subset=["DATA_DT", "NOME PORTADOR"])
-        .sort_values(by=["NOME PORTADOR", "DATA_DT"])
-        .copy()
+
+def mover_para_quarentena(problemas: dict[str, list[str]], pasta_quarentena: str) -> None:
+    """Move os CSVs reprovados para `pasta_quarentena` e registra os motivos."""
+    os.makedirs(pasta_quarentena, exist_ok=True)
+    data_hora: str = pd.Timestamp.now().strftime("%Y-%m-%d %H:%M:%S")
+    with open(
+        os.path.join(pasta_quarentena, ARQUIVO_REGISTRO_QUARENTENA), mode="a", encoding="utf-8"
+    ) as f:
+        for arquivo, motivos in problemas.items():
+            os.replace(arquivo, os.path.join(pasta_quarentena, os.path.basename(arquivo)))
+            registro: dict = {
+                "data_hora": data_hora, "arquivo": os.path.basename(arquivo), "problemas": motivos,
+            }
+            f.write(json.dumps(registro, ensure_ascii=False) + "\n")
+
+
+def validar_pasta_cpgf(
+    arquivos: list[str],
+    pasta_quarentena: str | None = None,
+    linhas_amostra: int = LINHAS_AMOSTRA_VALIDACAO,
+) -> None:
+    """
+    Valida todos os CSVs antes da auditoria e reprova de uma vez só.
+
+    Os problemas de todos os arquivos são reunidos num único
+    `ErroEsquemaCPGF`; com `pasta_quarentena`, os arquivos reprovados são
+    movidos para lá antes do erro, e a próxima execução segue sem eles.
+    """
+    problemas: dict[str, list[str]] = {}
+    for arquivo in arquivos:
+        motivos: list[str] = validar_arquivo_cpgf(arquivo, linhas_amostra)
+        if motivos:
+            problemas[arquivo] = motivos
+    if not problemas:
+        return
+    if pasta_quarentena:
+        mover_para_quarentena(problemas, pasta_quarentena)
+    raise ErroEsquemaCPGF(problemas, pasta_quarentena)
+
+
+def ler_arquivo_cpgf(arquivo: str) -> pd.DataFrame:
+    """Lê um CSV mensal do CPGF e devolve o lote já normalizado."""
+    parametros: dict = parametros_leitura(arquivo)
+    with medir("leitura_csv") as etapa:
+        try:
+            df: pd.DataFrame = pd.read_csv(arquivo, engine=MOTOR_CSV, **parametros)
+        except ValueError:
+            if MOTOR_CSV == "c":
+                raise
+            # Com `dtype`, o pyarrow não converte célula vazia numa coluna que
+            # inferiu como inteira (ex.: CNPJ em branco). O motor C infere
+            # float, como a leitura completa original.
+            df = pd.read_csv(arquivo, engine="c", **parametros)
+        if etapa is not None:
+            etapa.linhas_saida = len(df)
+    with medir("normalizacao", len(df)):
+        return normalizar_cpgf(df)
+
+
+def ler_blocos_cpgf(arquivo: str, tamanho_bloco: int) -> Iterator[pd.DataFrame]:
+    """Lê um CSV do CPGF em blocos de `tamanho_bloco` linhas já normalizados."""
+    # O motor pyarrow não suporta leitura em blocos; aqui usamos sempre o C.
+    with pd.read_csv(
+        arquivo, engine="c", chunksize=tamanho_bloco, **parametros_leitura(arquivo)
+    ) as leitor:
+        for bloco in leitor:
+            with medir("normalizacao", len(bloco)):
+                normalizado: pd.DataFrame = normalizar_cpgf(bloco.reset_index(drop=True))
+            yield normalizado
+
+
+def carregar_arquivo_com_cache(arquivo: str, pasta_cache: str) -> pd.DataFrame:
+    """
+    Devolve o lote normalizado de um CSV, reaproveitando o Parquet em cache.
+
+    A chave do cache combina caminho, tamanho e mtime do arquivo de origem
+    (além da VERSAO_CACHE), então qualquer alteração no CSV ou na
+    normalização invalida a entrada automaticamente.
+    """
+    info: os.stat_result = os.stat(arquivo)
+    prefixo: str = hashlib.sha1(
+        os.path.abspath(arquivo).encode("utf-8")
+    ).hexdigest()[:16]
+    caminho_cache: str = os.path.join(
+        pasta_cache,
+        f"{prefixo}_{info.st_size}_{info.st_mtime_ns}_v{VERSAO_CACHE}.parquet",
+    )
+
+    if os.path.exists(caminho_cache):
+        with medir("leitura_cache"):
+            return pd.read_parquet(caminho_cache)
+
+    df: pd.DataFrame = ler_arquivo_cpgf(arquivo)
+
+    os.makedirs(pasta_cache, exist_ok=True)
+    for obsoleto in glob.glob(os.path.join(pasta_cache, f"{prefixo}_*.parquet")):
+        os.remove(obsoleto)
+
+    caminho_temp: str = f"{caminho_cache}.tmp"
+    try:
+        df.to_parquet(caminho_temp, index=False)
+        os.replace(caminho_temp, caminho_cache)
+    except (ImportError, ValueError, TypeError) as e:
+        # Sem pyarrow (ou com tipos mistos não serializáveis) o cache é
+        # apenas ignorado: o lote já normalizado segue normalmente.
+        if os.path.exists(caminho_temp):
+            os.remove(caminho_temp)
+        print(f"Cache indisponível para {os.path.basename(arquivo)}: {e}")
+
+    return df
+
+
+def concatenar_lotes(lotes: list[pd.DataFrame]) -> pd.DataFrame:
+    """Une os lotes mensais preservando as colunas categóricas do esquema."""
+    df: pd.DataFrame = pd.concat(lotes, ignore_index=True)
+    # Categorias diferentes entre arquivos fazem o concat cair para texto.
+    for coluna in COLUNAS_CATEGORICAS:
+        if coluna in df.columns and not isinstance(
+            df[coluna].dtype, pd.CategoricalDtype
+        ):
+            df[coluna] = df[coluna].astype("category")
+    return df
+
+
+def carregar_lote(arquivo: str, pasta_cache: str | None = None) -> pd.DataFrame:
+    """Carrega um CSV normalizado, passando pelo cache quando configurado."""
+    if pasta_cache:
+        return carregar_arquivo_com_cache(arquivo, pasta_cache)
+    return ler_arquivo_cpgf(arquivo)
+
+
+def resolver_processos(n_processos: int | None) -> int:
+    """Define quantos processos leem os CSVs (argumento ou CPGF_PROCESSOS)."""
+    if n_processos is None:
+        n_processos = int(os.getenv("CPGF_PROCESSOS", "1"))
+    return max(1, n_processos)
+
+
+def carregar_pasta(
+    arquivos: list[str], pasta_cache: str | None = None, n_processos: int = 1
+) -> list[pd.DataFrame]:
+    """
+    Carrega os CSVs mensais, em série ou num pool de processos.
+
+    `executor.map` devolve os lotes na mesma ordem de `arquivos`, então a
+    concatenação é idêntica à do caminho serial.
+    """
+    carregar = partial(carregar_lote, pasta_cache=pasta_cache)
+
+    if n_processos > 1 and len(arquivos) > 1:
+        with ProcessPoolExecutor(
+            max_workers=min(n_processos, len(arquivos))
+        ) as executor:
+            return list(executor.map(carregar, arquivos))
+
+    return [carregar(arquivo) for arquivo in arquivos]
+
+
+CHAVES_PORTADOR: list[str] = ["ANO_MES", "NOME PORTADOR"]
+CHAVES_FORNECEDOR: list[str] = [
+    "ANO_MES", "NOME PORTADOR", "CNPJ OU CPF FAVORECIDO", "NOME FAVORECIDO"
+]
+
+
+@dataclass
+class AgregadosAuditoria:
+    """
+    Somas parciais de onde saem as duas métricas publicadas.
+
+    Todos os valores estão em centavos inteiros, então agregados de blocos
+    diferentes podem ser somados em qualquer ordem com resultado idêntico.
+    `ocorrencias`, quando pedida, é a tabela de alertas transação a transação.
+    """
+
+    alertas: pd.DataFrame
+    fornecedor: pd.DataFrame
+    total: pd.DataFrame
+    ocorrencias: pd.DataFrame | None = None
+
+
+def detalhar_alertas(
+    df: pd.DataFrame, ocorrencias: pd.DataFrame, alertas: pd.DataFrame
+) -> pd.DataFrame:
+    """
+    Tabela de alertas transação a transação, para consultas de detalhe.
+
+    Traz as mesmas linhas que entram no score (com mês e portador) e, além
+    delas, a data, o órgão, o favorecido e o tipo de cada transação.
+    """
+    linhas: np.ndarray = ocorrencias["LINHA"].to_numpy()
+    detalhe: pd.DataFrame = pd.DataFrame({
+        "ANO_MES": alertas["ANO_MES"].to_numpy(),
+        "DATA_DT": df["DATA_DT"].to_numpy()[linhas],
+        "NOME ÓRGÃO": df["NOME ÓRGÃO"].to_numpy()[linhas],
+        "NOME PORTADOR": alertas["NOME PORTADOR"].to_numpy(),
+        "CNPJ OU CPF FAVORECIDO": df["CNPJ OU CPF FAVORECIDO"].to_numpy()[linhas],
+        "NOME FAVORECIDO": df["NOME FAVORECIDO"].to_numpy()[linhas],
+        "TRANSAÇÃO": df["TRANSAÇÃO"].to_numpy()[linhas],
+        "VALOR_NUM": alertas["VALOR_NUM"].to_numpy(),
+        "VALOR_CENTAVOS": alertas["VALOR_CENTAVOS"].to_numpy(),
+        "REGRA": alertas["REGRA"].array,
+    })
+    return detalhe[
+        detalhe["ANO_MES"].notna() & detalhe["NOME PORTADOR"].notna()
+    ].reset_index(drop=True)
+
+
+def agregar_gastos(df: pd.DataFrame) -> tuple[pd.DataFrame, pd.DataFrame]:
+    """Soma os gastos por fornecedor e o total de cada portador no mês."""
+    gastos: pd.DataFrame = df[CHAVES_FORNECEDOR].assign(
+        CENTAVOS=np.round(df["VALOR_NUM"].to_numpy() * 100)
     )
-    df_ordenado["SOMA_3DIAS"] = (
-        df_ordenado.groupby("NOME PORTADOR")["VALOR_NUM"]
-        .rolling(3, min_periods=3)
+    por_fornecedor: pd.DataFrame = (
+        gastos.groupby(CHAVES_FORNECEDOR)["CENTAVOS"].sum().reset_index()
+    )
+    total: pd.DataFrame = (
+        gastos.groupby(CHAVES_PORTADOR)["CENTAVOS"].sum().reset_index()
+    )
+    return por_fornecedor, total
+
+
+def combinar_parciais(parciais: list[pd.DataFrame], chaves: list[str]) -> pd.DataFrame:
+    """Soma tabelas parciais com as mesmas chaves numa única tabela."""
+    return (
+        pd.concat(parciais, ignore_index=True)
+        .groupby(chaves, observed=True)
         .sum()
-        .droplevel(0)
+        .reset_index()
     )
-    df_ordenado["DIAS_INTERVALO"] = (
-        df_ordenado.groupby("NOME PORTADOR")["DATA_DT"].diff(2).dt.days
+
+
+def auditar_em_memoria(
+    df_completo: pd.DataFrame, detalhar: bool = False
+) -> AgregadosAuditoria:
+    """
+    Avalia as regras e agrega os gastos com todo o histórico carregado.
+
+    Com `detalhar`, guarda também a tabela de alertas transação a transação.
+    """
+    with medir("regras", len(df_completo)) as etapa:
+        ocorrencias: pd.DataFrame = avaliar_regras(df_completo)
+        if etapa is not None:
+            etapa.linhas_saida = len(ocorrencias)
+    with medir("alertas", len(ocorrencias)) as etapa:
+        df_alertas_todos: pd.DataFrame = montar_alertas(df_completo, ocorrencias)
+        df_alertas: pd.DataFrame = agregar_alertas(df_alertas_todos)
+        if etapa is not None:
+            etapa.linhas_saida = len(df_alertas)
+    with medir("gastos", len(df_completo)) as etapa:
+        por_fornecedor, total = agregar_gastos(df_completo)
+        if etapa is not None:
+            etapa.linhas_saida = len(por_fornecedor)
+    detalhe: pd.DataFrame | None = (
+        detalhar_alertas(df_completo, ocorrencias, df_alertas_todos) if detalhar else None
     )
-    r2: pd.DataFrame = df_ordenado[
-        (df_ordenado["SOMA_3DIAS"] > 5000.00)
-        & (df_ordenado["DIAS_INTERVALO"] <= 2)
-    ].copy()
-    r2["REGRA"] = "R2 - Suspeita de Fracionamento"
+    return AgregadosAuditoria(df_alertas, por_fornecedor, total, detalhe)
+
+
+# Volume de CSV por partição em disco do modo em fluxo. Cada linha vira
+# algumas dezenas de bytes nas partições, então uma partição cabe com folga
+# na memória mesmo com arquivos mensais grandes.
+BYTES_CSV_POR_PARTICAO: int = 128 * 1024 * 1024
+
+
+def resolver_particoes(arquivos: list[str], n_particoes: int | None) -> int:
+    """Partições do modo em fluxo: o argumento ou uma por BYTES_CSV_POR_PARTICAO."""
+    if n_particoes is None:
+        total_bytes: int = sum(os.path.getsize(arquivo) for arquivo in arquivos)
+        n_particoes = -(-total_bytes // BYTES_CSV_POR_PARTICAO)
+    return max(1, n_particoes)
+
+
+def auditar_em_fluxo(
+    arquivos: list[str], tamanho_bloco: int, n_particoes: int | None = None
+) -> tuple[AgregadosAuditoria, int]:
+    """
+    Processa a pasta bloco a bloco, sem carregar o histórico completo.
+
+    As regras por transação (R1, R3, R4) e os gastos por fornecedor são
+    agregados a cada bloco. As demais regras guardam só o seu estado: a R6
+    soma os gastos sigilosos por mês e órgão, e a R2 e a R5 gravam chaves
+    inteiras de tamanho fixo em `n_particoes` partições em disco (por
+    portador e por favorecido), avaliadas uma de cada vez no final. A
+    memória fica limitada ao bloco, a uma partição, às somas por chave
+    distinta e aos dicionários de textos distintos, não ao número de linhas.
+    O resultado é idêntico ao de `auditar_em_memoria`.
+    """
+    regras_linha = [r for r in REGRAS_AUDITORIA if r.por_transacao]
+    regras_estado = [r for r in REGRAS_AUDITORIA if not r.por_transacao]
+    n_particoes = resolver_particoes(arquivos, n_particoes)
+    estados: dict[str, object] = {
+        r.codigo: r.estado_incremental(r.limites, n_particoes) for r in regras_estado
+    }
+
+    alertas: list[pd.DataFrame] = []
+    fornecedor: list[pd.DataFrame] = []
+    total: list[pd.DataFrame] = []
+    total_linhas: int = 0
+
+    try:
+        for arquivo in arquivos:
+            blocos = medir_iteracao("leitura_bloco", ler_blocos_cpgf(arquivo, tamanho_bloco))
+            for bloco in blocos:
+                with medir("regras_bloco", len(bloco)):
+                    ocorrencias: pd.DataFrame = avaliar_regras(bloco, regras_linha)
+                    alertas.append(
+                        agregar_alertas(montar_alertas(bloco, ocorrencias, regras_linha))
+                    )
+                with medir("gastos_bloco", len(bloco)):
+                    fornecedor_bloco, total_bloco = agregar_gastos(bloco)
+                    fornecedor.append(fornecedor_bloco)
+                    total.append(total_bloco)
+                with medir("estado_bloco", len(bloco)):
+                    for estado in estados.values():
+                        estado.registrar(bloco)
+                total_linhas += len(bloco)
+
+                # Mantém as parciais com o tamanho das chaves distintas, não do
+                # número de blocos já lidos.
+                with medir("combinacao_parciais"):
+                    alertas = [combinar_parciais(alertas, CHAVES_ALERTAS)]
+                    fornecedor = [combinar_parciais(fornecedor, CHAVES_FORNECEDOR)]
+                    total = [combinar_parciais(total, CHAVES_PORTADOR)]
+
+        for regra in regras_estado:
+            with medir(f"regra_{regra.codigo}", total_linhas):
+                for parcial in estados[regra.codigo].alertas(regra):
+                    alertas = [combinar_parciais(alertas + [parcial], CHAVES_ALERTAS)]
+    finally:
+        for estado in estados.values():
+            estado.fechar()
+
+    agregados: AgregadosAuditoria = AgregadosAuditoria(
+        combinar_parciais(alertas, CHAVES_ALERTAS),
+        combinar_parciais(fornecedor, CHAVES_FORNECEDOR),
+        combinar_parciais(total, CHAVES_PORTADOR),
+    )
+    return agregados, total_linhas
+
+
+def auditar_em_duckdb(
+    arquivos: list[str], n_processos: int | None = None
+) -> tuple[AgregadosAuditoria, int]:
+    """
+    Avalia regras e agregações em SQL no DuckDB, sem carregar os CSVs no pandas.
+
+    O DuckDB é dependência opcional: só é importado quando este modo é usado.
+    """
+    from motor_duckdb import auditar_com_duckdb
+
+    codificacoes: list[str] = [detectar_codificacao(a) for a in arquivos]
+    alertas, fornecedor, total, total_linhas = auditar_com_duckdb(
+        arquivos, codificacoes, n_processos
+    )
+    return AgregadosAuditoria(alertas, fornecedor, total), total_linhas
+
+
+def assinatura_auditoria() -> str:
+    """Resumo da normalização e das regras; muda quando o estado salvo expira."""
+    configuracao: str = repr((
+        VERSAO_CACHE,
+        [(r.codigo, r.nome, sorted(r.limites.items())) for r in REGRAS_AUDITORIA],
+        FERIADOS_FIXOS,
+        sorted(DESLOCAMENTOS_PASCOA.items()),
+    ))
+    return hashlib.sha1(configuracao.encode("utf-8")).hexdigest()
+
 
-    feriados_fixos: list[str] = [
-        "-01-01", "-04-21", "-05-01", "-09-07", "-10-12",
-        "-11-02", "-11-15", "-11-20", "-12-25"
+def meses_alcancados(datas: pd.Series, alcance: int) -> set[str]:
+    """Meses (ANO_MES) das datas deslocadas de -alcance a +alcance dias."""
+    validas: pd.Series = datas.dropna()
+    meses: set[str] = set()
+    for deslocamento in sorted({-alcance, 0, alcance}):
+        deslocadas: pd.Series = validas + pd.Timedelta(days=deslocamento)
+        meses.update(deslocadas.dt.to_period("M").astype(str).unique())
+    return meses
+
+
+def janela_do_mes(mes: str, alcance: int) -> tuple[pd.Timestamp, pd.Timestamp, list[str]]:
+    """Primeiro e último dia do mês ampliados pelo alcance, e os meses cobertos."""
+    periodo: pd.Period = pd.Period(mes, freq="M")
+    inicio: pd.Timestamp = periodo.start_time.normalize() - pd.Timedelta(days=alcance)
+    fim: pd.Timestamp = periodo.end_time.normalize() + pd.Timedelta(days=alcance)
+    return inicio, fim, [str(p) for p in pd.period_range(inicio, fim, freq="M")]
+
+
+def transacoes_com_contexto(
+    armazem: ArmazemIncremental, mes: str, alcance: int
+) -> pd.DataFrame:
+    """
+    Transações do mês e das datas vizinhas que as regras com janela enxergam.
+
+    As partições voltam na ordem da carga completa (CSV por nome e, dentro
+    dele, a linha original), para que os desempates sejam os mesmos.
+    """
+    inicio, fim, meses = janela_do_mes(mes, alcance)
+
+    por_arquivo: dict[str, list[pd.DataFrame]] = {}
+    for nome, parte in armazem.ler_transacoes(meses):
+        por_arquivo.setdefault(nome, []).append(parte)
+
+    lotes: list[pd.DataFrame] = [
+        pd.concat(partes, ignore_index=True).sort_values("LINHA_ORIGEM", kind="stable")
+        for _, partes in sorted(por_arquivo.items())
     ]
-    is_fim_de_semana: pd.Series = df_completo["DATA_DT"].dt.dayofweek.isin([5, 6])
-    is_feriado: pd.Series = df_completo["DATA_DT"].dt.strftime("-%m-%d").isin(feriados_fixos)
-    r3: pd.DataFrame = df_completo[is_fim_de_semana | is_feriado].copy()
-    r3["REGRA"] = "R3 - Uso em Dias Não Úteis"
+    df: pd.DataFrame = concatenar_lotes(lotes)
+    return df[(df["DATA_DT"] >= inicio) & (df["DATA_DT"] <= fim)].reset_index(drop=True)
 
-    r4: pd.DataFrame = df_completo[
-        df_completo["TRANSAÇÃO"].str.contains("SAQUE", case=False, na=False)
-    ].copy()
-    r4["REGRA"] = "R4 - Operação de Saque"
 
-    r5: pd.DataFrame = df_completo[
-        df_completo.duplicated(
-            subset=["DATA_DT", "VALOR_NUM", "NOME FAVORECIDO"], keep=False
-        )
-    ].copy()
-    r5["REGRA"] = "R5 - Transação Duplicada no Dia"
+def auditar_incremental(
+    arquivos: list[str], pasta_estado: str
+) -> tuple[AgregadosAuditoria, int]:
+    """
+    Reprocessa apenas os meses afetados pelos CSVs novos, alterados ou removidos.
 
-    df_sigiloso: pd.DataFrame = df_completo[
-        df_completo["NOME PORTADOR"].str.upper().str.contains("SIGILOSO", na=False)
-    ].copy()
-    agro_sigilo: pd.DataFrame = (
-        df_sigiloso.groupby(["ANO_MES", "NOME ÓRGÃO"])["VALOR_NUM"]
-        .sum()
-        .reset_index()
+    Um CSV afeta os meses das suas transações e, por causa das regras com
+    janela de dias (R2 cruza a virada do mês), os meses a até `alcance_dias`
+    dias delas. Cada mês afetado é recalculado com as transações vizinhas
+    como contexto; os demais agregados vêm prontos de `pasta_estado`.
+    """
+    armazem: ArmazemIncremental = ArmazemIncremental(
+        pasta_estado, assinatura_auditoria()
     )
-    orgaos_estourados: pd.DataFrame = agro_sigilo[agro_sigilo["VALOR_NUM"] > 10000.00]
+    alcance: int = alcance_dias()
+    alterados, removidos = armazem.comparar(arquivos)
+
+    meses_afetados: set[str] = set()
+    for nome in removidos + [os.path.basename(a) for a in alterados]:
+        # Os meses antigos de um CSV alterado ou removido também mudam.
+        for mes in armazem.meses(nome):
+            meses_afetados.update(janela_do_mes(mes, alcance)[2])
+        armazem.remover_arquivo(nome)
+
+    for arquivo in alterados:
+        df: pd.DataFrame = ler_arquivo_cpgf(arquivo)
+        df["LINHA_ORIGEM"] = np.arange(len(df), dtype=np.int64)
+        with medir("particionamento", len(df)):
+            armazem.gravar_transacoes(arquivo, df)
+        meses_afetados |= meses_alcancados(df["DATA_DT"], alcance)
 
-    r6: pd.DataFrame = df_completo[
-        df_completo["NOME PORTADOR"].str.upper().str.contains("SIGILOSO", na=False)
-        & df_completo.set_index(["ANO_MES", "NOME ÓRGÃO"]).index.isin(
-            orgaos_estourados.set_index(["ANO_MES", "NOME ÓRGÃO"]).index
+    for mes in sorted(meses_afetados):
+        with medir("contexto_mes") as etapa:
+            df_contexto: pd.DataFrame = transacoes_com_contexto(armazem, mes, alcance)
+            if etapa is not None:
+                etapa.linhas_saida = len(df_contexto)
+        do_mes: pd.Series = df_contexto["ANO_MES"] == mes
+        if not do_mes.any():
+            armazem.remover_agregados(mes)
+            continue
+
+        alertas: pd.DataFrame = montar_alertas(
+            df_contexto, avaliar_regras(df_contexto)
         )
-    ].copy()
-    r6["REGRA"] = "R6 - Despesa Sigilosa Excedente"
-    r6["NOME PORTADOR"] = "SIGILOSO - " + r6["NOME ÓRGÃO"]
+        with medir("agregacao_mes", len(df_contexto)):
+            por_fornecedor, total = agregar_gastos(df_contexto[do_mes])
+            armazem.gravar_agregados(mes, {
+                "alertas": agregar_alertas(alertas[alertas["ANO_MES"] == mes]),
+                "fornecedor": por_fornecedor,
+                "total": total,
+            })
 
-    df_alertas_todos: pd.DataFrame = pd.concat(
-        [r1, r2, r3, r4, r5, r6], ignore_index=True
+    armazem.salvar_manifesto()
+    print(
+        f"Auditoria incremental: {len(alterados)} arquivo(s) novo(s) ou alterado(s),"
+        f" {len(removidos)} removido(s), {len(meses_afetados)} mês(es) recalculado(s)."
     )
 
-    os.makedirs(pasta_resultados, exist_ok=True)
+    with medir("leitura_agregados"):
+        tabelas: dict[str, pd.DataFrame] = armazem.ler_agregados()
+    agregados: AgregadosAuditoria = AgregadosAuditoria(
+        tabelas["alertas"], tabelas["fornecedor"], tabelas["total"]
+    )
+    return agregados, armazem.total_linhas()
 
-    # =========================================================================
-    # MÉTRICA DE RISCO 1: SCORE PONDERADO DE FRAUDE POR PORTADOR E MÊS
-    # =========================================================================
+
+# =========================================================================
+# MÉTRICA DE RISCO 1: SCORE PONDERADO DE FRAUDE POR PORTADOR E MÊS
+# =========================================================================
+def calcular_score_mensal(agregados: AgregadosAuditoria) -> pd.DataFrame:
+    """Top 5 portadores por mês no score (valor em alerta x regras violadas)."""
     analise_portador: pd.DataFrame = (
-        df_alertas_todos.groupby(["ANO_MES", "NOME PORTADOR"])
+        agregados.alertas.groupby(CHAVES_PORTADOR)
         .agg(
-            VALOR_TOTAL_ALERTA=("VALOR_NUM", "sum"),
+            VALOR_TOTAL_ALERTA=("CENTAVOS", "sum"),
             REGRAS_VIOLADAS=("REGRA", "nunique"),
-            TOTAL_TRANSACOES_SUSPEITAS=("VALOR_NUM", "count")
+            TOTAL_TRANSACOES_SUSPEITAS=("TRANSACOES", "sum")
         )
         .reset_index()
     )
+    analise_portador["VALOR_TOTAL_ALERTA"] = (
+        analise_portador["VALOR_TOTAL_ALERTA"] / 100
+    )
 
     analise_portador["SCORE_RISCO"] = (
         analise_portador["VALOR_TOTAL_ALERTA"] * analise_portador["REGRAS_VIOLADAS"]
@@ -188,33 +814,30 @@ def executar_auditoria_pasta(pasta_dados: str, pasta_resultados: str) -> None:
         analise_portador.groupby("ANO_MES").head(5).reset_index(drop=True)
     )
 
-    top_5_score_mensal["NOME PORTADOR"] = top_5_score_mensal["NOME PORTADOR"].apply(
-        mascarar_nome
-    )
-
-    caminho_top5: str = os.path.join(
-        pasta_resultados, "airtable_top5_criticidade_mensal.csv"
+    top_5_score_mensal.insert(
+        top_5_score_mensal.columns.get_loc("NOME PORTADOR"), "ID PORTADOR",
+        identificadores_anonimos(top_5_score_mensal, ["NOME PORTADOR"]),
     )
-    top_5_score_mensal.to_csv(
-        caminho_top5, sep=";", index=False, encoding="utf-8"
+    top_5_score_mensal["NOME PORTADOR"] = mascarar_nomes(
+        top_5_score_mensal["NOME PORTADOR"]
     )
+    return top_5_score_mensal
 
-    # =========================================================================
-    # MÉTRICA DE RISCO 2: CONCENTRAÇÃO EM FORNECEDOR ÚNICO
-    # =========================================================================
-    gasto_total_portador: pd.DataFrame = (
-        df_completo.groupby(["ANO_MES", "NOME PORTADOR"])["VALOR_NUM"]
-        .sum()
-        .reset_index(name="GASTO_TOTAL_PORTADOR_MES")
+
+# =========================================================================
+# MÉTRICA DE RISCO 2: CONCENTRAÇÃO EM FORNECEDOR ÚNICO
+# =========================================================================
+def montar_concentracao(agregados: AgregadosAuditoria) -> pd.DataFrame:
+    """Participação de cada fornecedor no gasto mensal de cada portador."""
+    gasto_total_portador: pd.DataFrame = agregados.total.rename(
+        columns={"CENTAVOS": "GASTO_TOTAL_PORTADOR_MES"}
     )
+    gasto_total_portador["GASTO_TOTAL_PORTADOR_MES"] /= 100
 
-    gasto_por_fornecedor: pd.DataFrame = (
-        df_completo.groupby(
-            ["ANO_MES", "NOME PORTADOR", "CNPJ OU CPF FAVORECIDO", "NOME FAVORECIDO"]
-        )["VALOR_NUM"]
-        .sum()
-        .reset_index(name="GASTO_FORNECEDOR_MES")
+    gasto_por_fornecedor: pd.DataFrame = agregados.fornecedor.rename(
+        columns={"CENTAVOS": "GASTO_FORNECEDOR_MES"}
     )
+    gasto_por_fornecedor["GASTO_FORNECEDOR_MES"] /= 100
 
     df_concentracao: pd.DataFrame = pd.merge(
         gasto_por_fornecedor,
@@ -225,6 +848,12 @@ def executar_auditoria_pasta(pasta_dados: str, pasta_resultados: str) -> None:
     df_concentracao["PERC_CONCENTRACAO"] = (
         (df_concentracao["GASTO_FORNECEDOR_MES"] / df_concentracao["GASTO_TOTAL_PORTADOR_MES"]) * 100
     )
+    return df_concentracao
+
+
+def calcular_concentracao_mensal(agregados: AgregadosAuditoria) -> pd.DataFrame:
+    """Até 25 casos por mês de portador com mais de 75% do gasto num fornecedor."""
+    df_concentracao: pd.DataFrame = montar_concentracao(agregados)
 
     alertas_fornecedor: pd.DataFrame = df_concentracao[
         (df_concentracao["PERC_CONCENTRACAO"] > 75.0)
@@ -240,21 +869,198 @@ def executar_auditoria_pasta(pasta_dados: str, pasta_resultados: str) -> None:
         alertas_fornecedor.groupby("ANO_MES").head(25).reset_index(drop=True)
     )
 
-    top_concentracao_mensal["NOME PORTADOR"] = top_concentracao_mensal["NOME PORTADOR"].apply(
-        mascarar_nome
+    top_concentracao_mensal.insert(
+        top_concentracao_mensal.columns.get_loc("NOME PORTADOR"), "ID PORTADOR",
+        identificadores_anonimos(top_concentracao_mensal, ["NOME PORTADOR"]),
     )
-    top_concentracao_mensal["NOME FAVORECIDO"] = top_concentracao_mensal["NOME FAVORECIDO"].apply(
-        mascarar_nome
+    top_concentracao_mensal.insert(
+        top_concentracao_mensal.columns.get_loc("CNPJ OU CPF FAVORECIDO"), "ID FAVORECIDO",
+        identificadores_anonimos(
+            top_concentracao_mensal, ["CNPJ OU CPF FAVORECIDO", "NOME FAVORECIDO"]
+        ),
+    )
+    top_concentracao_mensal["NOME PORTADOR"] = mascarar_nomes(
+        top_concentracao_mensal["NOME PORTADOR"]
+    )
+    top_concentracao_mensal["NOME FAVORECIDO"] = mascarar_nomes(
+        top_concentracao_mensal["NOME FAVORECIDO"]
+    )
+    return top_concentracao_mensal
+
+
+def publicar_metricas(agregados: AgregadosAuditoria, pasta_resultados: str) -> None:
+    """Calcula as duas métricas de risco e grava os CSVs do Airtable."""
+    os.makedirs(pasta_resultados, exist_ok=True)
+
+    with medir("metrica_score", len(agregados.alertas)) as etapa:
+        top_5_score_mensal: pd.DataFrame = calcular_score_mensal(agregados)
+        if etapa is not None:
+            etapa.linhas_saida = len(top_5_score_mensal)
+    caminho_top5: str = os.path.join(
+        pasta_resultados, "airtable_top5_criticidade_mensal.csv"
+    )
+    top_5_score_mensal.to_csv(
+        caminho_top5, sep=";", index=False, encoding="utf-8"
     )
 
+    with medir("metrica_concentracao", len(agregados.fornecedor)) as etapa:
+        top_concentracao_mensal: pd.DataFrame = calcular_concentracao_mensal(agregados)
+        if etapa is not None:
+            etapa.linhas_saida = len(top_concentracao_mensal)
     caminho_concentracao: str = os.path.join(
         pasta_resultados, "airtable_indicio_direcionamento.csv"
     )
     top_concentracao_mensal.to_csv(
         caminho_concentracao, sep=";", index=False, encoding="utf-8"
     )
+
+
+def gravar_saida_colunar(agregados: AgregadosAuditoria, pasta_parquet: str) -> None:
+    """
+    Grava as tabelas completas de alertas e de concentração em Parquet.
+
+    As tabelas são particionadas por ANO_MES e têm os nomes mascarados como
+    nos CSVs do Airtable. O pyarrow só é importado quando a saída é pedida.
+    """
+    from saida_colunar import gravar_tabela_particionada
+
+    ocorrencias: pd.DataFrame = agregados.ocorrencias.copy()
+    ocorrencias["NOME PORTADOR"] = mascarar_nomes(ocorrencias["NOME PORTADOR"])
+    ocorrencias["NOME FAVORECIDO"] = mascarar_nomes(ocorrencias["NOME FAVORECIDO"])
+    gravar_tabela_particionada(ocorrencias, pasta_parquet, "ocorrencias")
+
+    concentracao: pd.DataFrame = montar_concentracao(agregados)
+    concentracao["NOME PORTADOR"] = mascarar_nomes(concentracao["NOME PORTADOR"])
+    concentracao["NOME FAVORECIDO"] = mascarar_nomes(concentracao["NOME FAVORECIDO"])
+    gravar_tabela_particionada(concentracao, pasta_parquet, "concentracao")
+
+
+def executar_auditoria_pasta(
+    pasta_dados: str,
+    pasta_resultados: str,
+    pasta_cache: str | None = None,
+    n_processos: int | None = None,
+    modo: str = "memoria",
+    tamanho_bloco: int = 50_000,
+    n_particoes: int | None = None,
+    pasta_estado: str | None = None,
+    perfilar: bool = False,
+    rastrear_memoria: bool = False,
+    pasta_parquet: str | None = None,
+    validar: bool = True,
+    pasta_quarentena: str | None = None,
+) -> None:
+    """
+    Executa a auditoria sobre todos os CSVs de `pasta_dados`.
+
+    `modo="memoria"` carrega o histórico inteiro (com cache e leitura
+    paralela opcionais); `modo="fluxo"` lê os arquivos em blocos de
+    `tamanho_bloco` linhas, guarda o estado da R2 e da R5 em `n_particoes`
+    partições em disco (por padrão uma a cada 128 MB de CSV) e gera os
+    mesmos CSVs com memória limitada;
+    `modo="duckdb"` executa regras e agregações em SQL no DuckDB, usando
+    `n_processos` (quando informado) como número de threads;
+    `modo="incremental"` guarda agregados por mês em `pasta_estado` e só
+    recalcula os meses afetados por CSVs novos, alterados ou removidos.
+
+    Cada execução grava `relatorio_execucao.json` em `pasta_resultados`, com
+    tempo, linhas e pico de memória de cada etapa, e acrescenta um resumo em
+    `historico_execucoes.jsonl`. `perfilar` inclui no relatório as funções
+    mais custosas do cProfile (e grava `perfil_execucao.prof`);
+    `rastrear_memoria` mede com tracemalloc o pico de alocações de cada etapa.
+
+    Com `pasta_parquet`, grava também a tabela completa de alertas
+    (transação a transação) e a de concentração por fornecedor em Parquet
+    particionado por ANO_MES; só o modo em memória guarda as transações
+    necessárias para a primeira.
+
+    Antes de qualquer leitura completa, `validar` confere cabeçalho, valor e
+    data das primeiras linhas de cada CSV. Os arquivos reprovados são
+    MOVIDOS para fora de `pasta_dados`, para `pasta_quarentena` (por padrão
+    a pasta irmã `<pasta_dados>_quarentena`), e a execução para com um único
+    `ErroEsquemaCPGF` listando todos eles. Para conferir uma pasta sem
+    alterá-la, chame `validar_pasta_cpgf(arquivos)` sem pasta de quarentena.
+
+    Sem a variável `CPGF_SAL_IDENTIFICADORES`, a execução para com
+    RuntimeError antes da validação (ver `sal_identificadores`).
+    """
+    caminho_padrao: str = os.path.join(pasta_dados, "*.csv")
+    # Ordenado por nome (AAAAMM_CPGF.csv) para que a concatenação, e com ela
+    # o desempate das ordenações seguintes, não dependa do sistema de arquivos.
+    arquivos: list[str] = sorted(glob.glob(caminho_padrao))
+
+    if not arquivos:
+        print(f"Nenhum arquivo CSV encontrado na pasta {pasta_dados}")
+        return
+
+    if modo not in ("memoria", "fluxo", "duckdb", "incremental"):
+        raise ValueError(f"Modo de execução desconhecido: {modo!r}")
+    if modo == "incremental" and not pasta_estado:
+        raise ValueError("O modo incremental exige uma pasta_estado.")
+    if pasta_parquet and modo != "memoria":
+        raise ValueError("A saída em Parquet (pasta_parquet) exige o modo memoria.")
+    # Os CSVs publicados levam identificadores salgados: sem o sal, a
+    # execução para aqui, antes de qualquer leitura.
+    sal_identificadores()
+
+    with RelatorioExecucao(perfilar, rastrear_memoria) as relatorio:
+        if validar:
+            with medir("validacao"):
+                validar_pasta_cpgf(
+                    arquivos, pasta_quarentena or pasta_quarentena_padrao(pasta_dados)
+                )
+
+        with medir(modo) as etapa:
+            if modo == "fluxo":
+                n_particoes = resolver_particoes(arquivos, n_particoes)
+                agregados, total_linhas = auditar_em_fluxo(arquivos, tamanho_bloco, n_particoes)
+            elif modo == "duckdb":
+                agregados, total_linhas = auditar_em_duckdb(arquivos, n_processos)
+            elif modo == "incremental":
+                agregados, total_linhas = auditar_incremental(arquivos, pasta_estado)
+            else:
+                with medir("carga") as etapa_carga:
+                    lista_dataframes: list[pd.DataFrame] = carregar_pasta(
+                        arquivos, pasta_cache, resolver_processos(n_processos)
+                    )
+                    if etapa_carga is not None:
+                        etapa_carga.linhas_saida = sum(len(df) for df in lista_dataframes)
+                with medir("concatenacao") as etapa_concatenacao:
+                    df_completo: pd.DataFrame = concatenar_lotes(lista_dataframes)
+                    if etapa_concatenacao is not None:
+                        etapa_concatenacao.linhas_saida = len(df_completo)
+                total_linhas = len(df_completo)
+                agregados = auditar_em_memoria(df_completo, detalhar=bool(pasta_parquet))
+            if etapa is not None:
+                etapa.linhas_saida = total_linhas
+
+        print(f"Registros carregados para análise avançada: {total_linhas}")
+
+        with medir("publicacao"):
+            publicar_metricas(agregados, pasta_resultados)
+
+        if pasta_parquet:
+            with medir("saida_colunar", len(agregados.ocorrencias)):
+                gravar_saida_colunar(agregados, pasta_parquet)
+
+    relatorio.gravar(pasta_resultados, {
+        "modo": modo,
+        "arquivos": len(arquivos),
+        "linhas": total_linhas,
+        "parametros": {
+            "n_processos": n_processos,
+            "tamanho_bloco": tamanho_bloco if modo == "fluxo" else None,
+            "n_particoes": n_particoes if modo == "fluxo" else None,
+            "cache": pasta_cache is not None,
+            "perfilar": perfilar,
+            "rastrear_memoria": rastrear_memoria,
+            "parquet": pasta_parquet is not None,
+        },
+    })
     print("Processamento concluído com total sucesso e dados higienizados!")
 
 
 if __name__ == "__main__":
-    executar_auditoria_pasta("dados_brutos", "resultados_auditoria")
\ No newline at end of file
+    executar_auditoria_pasta(
+        "dados_brutos", "resultados_auditoria", pasta_cache="cache_cpgf"
+    )
\ No newline at end of file
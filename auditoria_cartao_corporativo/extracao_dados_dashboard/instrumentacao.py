@@ -0,0 +1,337 @@
+import cProfile
+import json
+import os
+import platform
+import pstats
+import sys
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass, field
+from datetime import datetime
+from typing import Iterable, Iterator, TypeVar
+
+try:
+    import resource
+except ImportError:  # Windows não tem o módulo resource.
+    resource = None
+
+ARQUIVO_RELATORIO: str = "relatorio_execucao.json"
+ARQUIVO_HISTORICO: str = "historico_execucoes.jsonl"
+ARQUIVO_PERFIL: str = "perfil_execucao.prof"
+
+T = TypeVar("T")
+
+
+BYTES_PAGINA: int = os.sysconf("SC_PAGE_SIZE") if hasattr(os, "sysconf") else 4096
+INTERVALO_AMOSTRAGEM_RSS: float = 0.01
+
+
+def pico_rss_processo_mb() -> float | None:
+    """
+    Maior RSS do processo desde que ele começou, em MB (None onde não há
+    `resource`). Nunca diminui e inclui o que veio antes da auditoria.
+    """
+    if resource is None:
+        return None
+    pico: int = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux informa em KB; macOS, em bytes.
+    return pico / 1024**2 if sys.platform == "darwin" else pico / 1024
+
+
+def rss_atual_mb() -> float | None:
+    """RSS atual do processo em MB, lido de /proc/self/statm (None fora do Linux)."""
+    try:
+        with open("/proc/self/statm", mode="rb") as f:
+            paginas_residentes: int = int(f.read().split()[1])
+    except (OSError, IndexError, ValueError):
+        return None
+    return paginas_residentes * BYTES_PAGINA / 1024**2
+
+
+class AmostradorRss(threading.Thread):
+    """
+    Lê o RSS atual a cada `intervalo` segundos numa thread à parte e guarda o
+    maior valor desde o último `reiniciar`, como o `reset_peak` do tracemalloc.
+    """
+
+    def __init__(self, intervalo: float = INTERVALO_AMOSTRAGEM_RSS) -> None:
+        super().__init__(name="amostrador_rss", daemon=True)
+        self.intervalo: float = intervalo
+        self.pico: float = 0.0
+        self._trava: threading.Lock = threading.Lock()
+        self._parar: threading.Event = threading.Event()
+
+    def amostrar(self) -> float:
+        rss: float = rss_atual_mb() or 0.0
+        with self._trava:
+            self.pico = max(self.pico, rss)
+        return rss
+
+    def reiniciar(self) -> tuple[float, float]:
+        """Devolve (pico desde o último reinício, RSS atual) e recomeça o pico do RSS atual."""
+        rss: float = rss_atual_mb() or 0.0
+        with self._trava:
+            pico: float = max(self.pico, rss)
+            self.pico = rss
+        return pico, rss
+
+    def run(self) -> None:
+        while not self._parar.wait(self.intervalo):
+            self.amostrar()
+
+    def parar(self) -> None:
+        self._parar.set()
+        self.join()
+
+
+@dataclass
+class MedicaoEtapa:
+    """Totais acumulados de uma etapa (somados quando ela roda várias vezes)."""
+
+    etapa: str
+    chamadas: int = 0
+    segundos: float = 0.0
+    linhas_entrada: int | None = None
+    linhas_saida: int | None = None
+    pico_rss_mb: float | None = None
+    delta_rss_mb: float | None = None
+    pico_tracemalloc_mb: float | None = None
+
+
+@dataclass
+class _EtapaAberta:
+    caminho: str
+    inicio: float
+    linhas_entrada: int | None
+    linhas_saida: int | None = None
+    pico_tracemalloc: int = 0
+    rss_inicio: float = 0.0
+    pico_rss: float = 0.0
+
+
+def _somar(atual: float | None, valor: float | None) -> float | None:
+    if valor is None:
+        return atual
+    return valor if atual is None else atual + valor
+
+
+def _maior(atual: float | None, valor: float | None) -> float | None:
+    if valor is None:
+        return atual
+    return valor if atual is None else max(atual, valor)
+
+
+@dataclass
+class RelatorioExecucao:
+    """
+    Coleta as medições das etapas de uma execução da auditoria.
+
+    Enquanto o relatório está ativo (`with RelatorioExecucao() as r:`), cada
+    `medir(...)` do pipeline registra tempo, linhas de entrada/saída e, pelo
+    `AmostradorRss`, o pico de RSS durante a etapa e a variação do RSS entre o
+    início e o fim dela; etapas aninhadas aparecem como "pai/filha". Com
+    `rastrear_memoria`, o tracemalloc mede o pico de alocações Python/NumPy de
+    cada etapa; com `perfilar`, o cProfile acompanha a execução inteira.
+    """
+
+    perfilar: bool = False
+    rastrear_memoria: bool = False
+    etapas: dict[str, MedicaoEtapa] = field(default_factory=dict)
+    _pilha: list[_EtapaAberta] = field(default_factory=list)
+    _perfil: cProfile.Profile | None = None
+    _amostrador: AmostradorRss | None = None
+    _inicio: float = 0.0
+    _data_hora: str = ""
+    total_segundos: float = 0.0
+    rss_inicial_mb: float | None = None
+    pico_rss_mb: float | None = None
+
+    def __enter__(self) -> "RelatorioExecucao":
+        global _relatorio_ativo
+        _relatorio_ativo = self
+        self._data_hora = datetime.now().isoformat(timespec="seconds")
+        if self.rastrear_memoria:
+            tracemalloc.start()
+        self.rss_inicial_mb = rss_atual_mb()
+        if self.rss_inicial_mb is not None:
+            self.pico_rss_mb = self.rss_inicial_mb
+            self._amostrador = AmostradorRss()
+            self._amostrador.reiniciar()
+            self._amostrador.start()
+        if self.perfilar:
+            self._perfil = cProfile.Profile()
+            self._perfil.enable()
+        self._inicio = time.perf_counter()
+        return self
+
+    def __exit__(self, *excecao) -> None:
+        global _relatorio_ativo
+        self.total_segundos = time.perf_counter() - self._inicio
+        if self._perfil is not None:
+            self._perfil.disable()
+        if self.rastrear_memoria:
+            tracemalloc.stop()
+        if self._amostrador is not None:
+            self._amostrador.parar()
+            self._pico_rss_ate_aqui()
+            self._amostrador = None
+        _relatorio_ativo = None
+
+    def _pico_rss_ate_aqui(self) -> tuple[float, float]:
+        """Reinicia o amostrador, acumulando o pico no da execução: (pico, RSS atual)."""
+        pico, rss = self._amostrador.reiniciar()
+        self.pico_rss_mb = max(self.pico_rss_mb or 0.0, pico)
+        return pico, rss
+
+    def abrir(self, nome: str, linhas_entrada: int | None) -> _EtapaAberta:
+        if self.rastrear_memoria:
+            # O pico acumulado até aqui pertence à etapa pai.
+            if self._pilha:
+                self._pilha[-1].pico_tracemalloc = max(
+                    self._pilha[-1].pico_tracemalloc, tracemalloc.get_traced_memory()[1]
+                )
+            tracemalloc.reset_peak()
+        rss_inicio: float = 0.0
+        if self._amostrador is not None:
+            # Idem para o pico de RSS.
+            pico, rss_inicio = self._pico_rss_ate_aqui()
+            if self._pilha:
+                self._pilha[-1].pico_rss = max(self._pilha[-1].pico_rss, pico)
+        caminho: str = "/".join([e.caminho for e in self._pilha[-1:]] + [nome])
+        # Registrada na abertura, a etapa pai aparece antes das filhas.
+        self.etapas.setdefault(caminho, MedicaoEtapa(caminho))
+        aberta: _EtapaAberta = _EtapaAberta(
+            caminho, time.perf_counter(), linhas_entrada, rss_inicio=rss_inicio, pico_rss=rss_inicio
+        )
+        self._pilha.append(aberta)
+        return aberta
+
+    def fechar(self, aberta: _EtapaAberta) -> None:
+        segundos: float = time.perf_counter() - aberta.inicio
+        self._pilha.pop()
+
+        pico_tracemalloc_mb: float | None = None
+        if self.rastrear_memoria:
+            pico: int = max(aberta.pico_tracemalloc, tracemalloc.get_traced_memory()[1])
+            pico_tracemalloc_mb = pico / 1024**2
+            if self._pilha:
+                self._pilha[-1].pico_tracemalloc = max(self._pilha[-1].pico_tracemalloc, pico)
+            tracemalloc.reset_peak()
+
+        pico_rss_mb: float | None = None
+        delta_rss_mb: float | None = None
+        if self._amostrador is not None:
+            pico, rss_fim = self._pico_rss_ate_aqui()
+            pico_rss_mb = max(aberta.pico_rss, pico)
+            delta_rss_mb = rss_fim - aberta.rss_inicio
+            if self._pilha:
+                self._pilha[-1].pico_rss = max(self._pilha[-1].pico_rss, pico_rss_mb)
+
+        medicao: MedicaoEtapa = self.etapas[aberta.caminho]
+        medicao.chamadas += 1
+        medicao.segundos += segundos
+        medicao.linhas_entrada = _somar(medicao.linhas_entrada, aberta.linhas_entrada)
+        medicao.linhas_saida = _somar(medicao.linhas_saida, aberta.linhas_saida)
+        medicao.pico_rss_mb = _maior(medicao.pico_rss_mb, pico_rss_mb)
+        medicao.delta_rss_mb = _somar(medicao.delta_rss_mb, delta_rss_mb)
+        medicao.pico_tracemalloc_mb = _maior(medicao.pico_tracemalloc_mb, pico_tracemalloc_mb)
+
+    def funcoes_mais_custosas(self, limite: int = 25) -> list[dict]:
+        """Resumo do cProfile: funções com maior tempo acumulado."""
+        if self._perfil is None:
+            return []
+        estatisticas: pstats.Stats = pstats.Stats(self._perfil)
+        linhas: list[dict] = []
+        for (arquivo, linha, funcao), (_, chamadas, proprio, acumulado, _) in (
+            estatisticas.stats.items()
+        ):
+            linhas.append({
+                "funcao": f"{os.path.basename(arquivo)}:{linha}({funcao})",
+                "chamadas": chamadas,
+                "segundos_proprios": round(proprio, 6),
+                "segundos_acumulados": round(acumulado, 6),
+            })
+        linhas.sort(key=lambda l: l["segundos_acumulados"], reverse=True)
+        return linhas[:limite]
+
+    def gravar(self, pasta_resultados: str, contexto: dict) -> str:
+        """
+        Grava `relatorio_execucao.json` ao lado dos CSVs publicados e acrescenta
+        uma linha-resumo em `historico_execucoes.jsonl` para comparar execuções.
+        """
+        relatorio: dict = {
+            "data_hora": self._data_hora,
+            "python": platform.python_version(),
+            **contexto,
+            "total_segundos": round(self.total_segundos, 6),
+            # Amostrados durante a execução; o do processo vem do ru_maxrss e
+            # inclui o que o processo já ocupava antes dela.
+            "rss_inicial_mb": self.rss_inicial_mb,
+            "pico_rss_mb": self.pico_rss_mb,
+            "pico_rss_processo_mb": pico_rss_processo_mb(),
+            "etapas": [asdict(m) for m in self.etapas.values()],
+        }
+        if self._perfil is not None:
+            caminho_perfil: str = os.path.join(pasta_resultados, ARQUIVO_PERFIL)
+            self._perfil.dump_stats(caminho_perfil)
+            relatorio["perfil"] = {
+                "arquivo": ARQUIVO_PERFIL,
+                "funcoes_mais_custosas": self.funcoes_mais_custosas(),
+            }
+
+        os.makedirs(pasta_resultados, exist_ok=True)
+        caminho: str = os.path.join(pasta_resultados, ARQUIVO_RELATORIO)
+        with open(caminho, mode="w", encoding="utf-8") as f:
+            json.dump(relatorio, f, ensure_ascii=False, indent=2)
+
+        resumo: dict = {
+            chave: relatorio[chave]
+            for chave in ["data_hora", "modo", "linhas", "total_segundos", "pico_rss_mb", "pico_rss_processo_mb"]
+            if chave in relatorio
+        }
+        resumo["etapas"] = {m.etapa: round(m.segundos, 6) for m in self.etapas.values()}
+        with open(os.path.join(pasta_resultados, ARQUIVO_HISTORICO), mode="a", encoding="utf-8") as f:
+            f.write(json.dumps(resumo, ensure_ascii=False) + "\n")
+        return caminho
+
+
+_relatorio_ativo: RelatorioExecucao | None = None
+
+
+@contextmanager
+def medir(nome: str, linhas_entrada: int | None = None) -> Iterator[_EtapaAberta | None]:
+    """
+    Mede uma etapa do pipeline no relatório ativo (sem relatório, não faz nada).
+
+    O objeto devolvido aceita `linhas_saida`, preenchido pela própria etapa.
+    """
+    relatorio: RelatorioExecucao | None = _relatorio_ativo
+    if relatorio is None:
+        yield None
+        return
+    aberta: _EtapaAberta = relatorio.abrir(nome, linhas_entrada)
+    try:
+        yield aberta
+    finally:
+        relatorio.fechar(aberta)
+
+
+def medir_iteracao(nome: str, iteravel: Iterable[T]) -> Iterator[T]:
+    """
+    Repassa os itens de `iteravel` medindo cada `next()` como uma etapa.
+
+    Útil para leitores em blocos: o tempo de leitura fica em `nome`, e o
+    processamento de cada item, fora da medição, não é somado a ele.
+    """
+    iterador: Iterator[T] = iter(iteravel)
+    fim: object = object()
+    while True:
+        with medir(nome) as etapa:
+            item = next(iterador, fim)
+            if etapa is not None and item is not fim:
+                etapa.linhas_saida = len(item)
+        if item is fim:
+            return
+        yield item
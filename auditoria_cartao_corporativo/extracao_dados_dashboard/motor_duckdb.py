@@ -0,0 +1,276 @@
+import duckdb
+import numpy as np
+import pandas as pd
+
+from calendario_feriados import CalendarioFeriados
+from instrumentacao import medir
+from regras_auditoria import REGRAS_AUDITORIA, RegraAuditoria
+
+# Codificações detectadas em Python -> nomes aceitos pelo read_csv do DuckDB.
+CODIFICACOES_DUCKDB: dict[str, str] = {
+    "utf-8": "utf-8",
+    "utf-8-sig": "utf-8",
+    "latin1": "latin-1",
+}
+
+# Mesmos marcadores de nulo que o read_csv do pandas reconhece por padrão.
+NULOS_PANDAS: list[str] = [
+    "", "#N/A", "#N/A N/A", "#NA", "-1.#IND", "-1.#QNAN", "-NaN", "-nan",
+    "1.#IND", "1.#QNAN", "<NA>", "N/A", "NA", "NULL", "NaN", "None", "n/a",
+    "nan", "null",
+]
+
+SQL_LEITURA_ARQUIVO: str = """
+    SELECT
+        {indice} AS arquivo,
+        row_number() OVER () AS linha,
+        "NOME ÓRGÃO" AS orgao,
+        "NOME PORTADOR" AS portador,
+        "CNPJ OU CPF FAVORECIDO" AS cnpj_txt,
+        "NOME FAVORECIDO" AS favorecido,
+        "TRANSAÇÃO" AS transacao,
+        "DATA TRANSAÇÃO" AS data_txt,
+        "VALOR TRANSAÇÃO" AS valor_txt
+    FROM read_csv(
+        $arquivo_{indice}, delim = ';', quote = '"', header = true, all_varchar = true,
+        encoding = '{codificacao}', nullstr = $nulos
+    )
+"""
+
+SQL_TRANSACOES: str = """
+    CREATE TEMP TABLE transacoes AS
+    WITH bruto AS (
+        {leituras}
+    ),
+    tipado AS (
+        SELECT
+            arquivo,
+            linha,
+            orgao,
+            portador,
+            favorecido,
+            transacao,
+            CAST(replace(replace(valor_txt, '.', ''), ',', '.') AS DOUBLE) AS valor,
+            CAST(try_strptime(data_txt, '%d/%m/%Y') AS DATE) AS data,
+            -- O pandas infere o CNPJ como inteiro quando o arquivo inteiro é
+            -- numérico ou vazio (perdendo zeros à esquerda); fora disso,
+            -- mantém o texto.
+            trim(CASE
+                WHEN bool_and(cnpj_txt IS NULL OR TRY_CAST(cnpj_txt AS BIGINT) IS NOT NULL)
+                     OVER (PARTITION BY arquivo)
+                THEN CAST(CAST(cnpj_txt AS BIGINT) AS VARCHAR)
+                ELSE cnpj_txt
+            END) AS cnpj,
+            contains(upper(transacao), 'SAQUE') IS TRUE AS saque
+        FROM bruto
+    ),
+    higienizado AS (
+        SELECT
+            *,
+            NOT saque AND (
+                upper(favorecido) IN ('NAO S. A.', 'SEM I.', 'SIGILOSO')
+                OR starts_with(cnpj, '-')
+            ) IS TRUE AS sigilo
+        FROM tipado
+    )
+    SELECT
+        arquivo,
+        linha,
+        orgao,
+        portador,
+        CASE
+            WHEN saque THEN 'SAQUE EM ESPÉCIE'
+            WHEN sigilo THEN 'DESPESA OPERACIONAL / SIGILOSA'
+            ELSE favorecido
+        END AS favorecido,
+        CASE WHEN saque OR sigilo THEN '0' ELSE cnpj END AS cnpj,
+        transacao,
+        saque,
+        data,
+        valor,
+        round(valor * 100) AS centavos,
+        strftime(data, '%Y-%m') AS ano_mes
+    FROM higienizado
+"""
+
+# Cada regra devolve (ano_mes, portador, centavos) das transações violadas,
+# com os limites lidos do mesmo registro usado pelo motor pandas. Como no
+# pandas, transações sem data válida ficam sem ANO_MES e não entram nos
+# agrupamentos mensais.
+SQL_REGRAS: dict[str, str] = {
+    "R1": """
+        SELECT ano_mes, portador, centavos FROM transacoes
+        WHERE valor > {valor_minimo}
+    """,
+    "R2": """
+        SELECT ano_mes, portador, centavos FROM (
+            SELECT
+                *,
+                count(centavos) OVER janela AS qtd_valores,
+                sum(centavos) OVER janela AS soma_janela,
+                date_diff(
+                    'day',
+                    lag(data, 2) OVER (
+                        PARTITION BY portador ORDER BY data, arquivo, linha
+                    ),
+                    data
+                ) AS dias_intervalo
+            FROM transacoes
+            WHERE data IS NOT NULL AND portador IS NOT NULL
+            WINDOW janela AS (
+                PARTITION BY portador ORDER BY data, arquivo, linha
+                ROWS BETWEEN 2 PRECEDING AND CURRENT ROW
+            )
+        )
+        WHERE qtd_valores = 3
+          AND soma_janela > {soma_minima_centavos}
+          AND dias_intervalo <= {dias_maximos}
+    """,
+    "R3": """
+        SELECT ano_mes, portador, centavos FROM transacoes
+        WHERE isodow(data) IN (6, 7)
+           OR data IN (SELECT data FROM feriados)
+    """,
+    "R4": """
+        SELECT ano_mes, portador, centavos FROM transacoes
+        WHERE saque
+    """,
+    "R5": """
+        SELECT ano_mes, portador, centavos FROM (
+            SELECT
+                *,
+                count(*) OVER (
+                    PARTITION BY centavos, favorecido ORDER BY data
+                    RANGE BETWEEN INTERVAL {janela_dias} DAY PRECEDING
+                              AND INTERVAL {janela_dias} DAY FOLLOWING
+                ) AS repeticoes
+            FROM transacoes
+        )
+        WHERE repeticoes > 1
+    """,
+    "R6": """
+        SELECT ano_mes, 'SIGILOSO - ' || orgao AS portador, centavos FROM (
+            SELECT
+                *,
+                sum(centavos) OVER (PARTITION BY ano_mes, orgao) AS centavos_mes
+            FROM transacoes
+            WHERE contains(upper(portador), 'SIGILOSO')
+              AND ano_mes IS NOT NULL AND orgao IS NOT NULL
+        )
+        WHERE centavos_mes > {soma_mensal_minima_centavos}
+    """,
+}
+
+
+def sql_regra(regra: RegraAuditoria) -> str:
+    """Preenche o SQL da regra com os limites declarados no registro."""
+    limites: dict[str, float] = dict(regra.limites)
+    # Somas são comparadas em centavos inteiros, como no motor pandas.
+    for nome, valor in regra.limites.items():
+        if nome.startswith("soma"):
+            limites[f"{nome}_centavos"] = round(valor * 100)
+    return SQL_REGRAS[regra.codigo].format(**limites)
+
+
+def sql_alertas(regras: list[RegraAuditoria]) -> str:
+    """Une as ocorrências de todas as regras e agrega por mês, portador e regra."""
+    ocorrencias: str = "\nUNION ALL\n".join(
+        f"SELECT *, {posicao} AS regra FROM ({sql_regra(regra)})"
+        for posicao, regra in enumerate(regras)
+    )
+    return f"""
+        SELECT
+            ano_mes AS "ANO_MES",
+            portador AS "NOME PORTADOR",
+            regra AS "REGRA",
+            coalesce(sum(centavos), 0) AS "CENTAVOS",
+            count(centavos) AS "TRANSACOES"
+        FROM ({ocorrencias})
+        WHERE ano_mes IS NOT NULL AND portador IS NOT NULL
+        GROUP BY ALL
+        ORDER BY ALL
+    """
+
+
+SQL_FORNECEDOR: str = """
+    SELECT
+        ano_mes AS "ANO_MES",
+        portador AS "NOME PORTADOR",
+        cnpj AS "CNPJ OU CPF FAVORECIDO",
+        favorecido AS "NOME FAVORECIDO",
+        coalesce(sum(centavos), 0) AS "CENTAVOS"
+    FROM transacoes
+    WHERE ano_mes IS NOT NULL AND portador IS NOT NULL
+      AND cnpj IS NOT NULL AND favorecido IS NOT NULL
+    GROUP BY ALL
+    ORDER BY ALL
+"""
+
+SQL_TOTAL: str = """
+    SELECT
+        ano_mes AS "ANO_MES",
+        portador AS "NOME PORTADOR",
+        coalesce(sum(centavos), 0) AS "CENTAVOS"
+    FROM transacoes
+    WHERE ano_mes IS NOT NULL AND portador IS NOT NULL
+    GROUP BY ALL
+    ORDER BY ALL
+"""
+
+
+def auditar_com_duckdb(
+    arquivos: list[str],
+    codificacoes: list[str],
+    n_threads: int | None = None,
+    regras: list[RegraAuditoria] = REGRAS_AUDITORIA,
+) -> tuple[pd.DataFrame, pd.DataFrame, pd.DataFrame, int]:
+    """
+    Executa regras e agregações como SQL sobre os CSVs, fora da memória.
+
+    O DuckDB lê os arquivos em paralelo e despeja em disco o que não couber
+    na memória. Devolve as mesmas tabelas em centavos do motor pandas
+    (alertas, gastos por fornecedor e total por portador) e o número de
+    linhas lidas.
+    """
+    configuracao: dict = {"threads": n_threads} if n_threads else {}
+    con = duckdb.connect(database=":memory:", config=configuracao)
+    try:
+        leituras: str = "\nUNION ALL\n".join(
+            SQL_LEITURA_ARQUIVO.format(
+                indice=indice, codificacao=CODIFICACOES_DUCKDB[codificacao]
+            )
+            for indice, codificacao in enumerate(codificacoes)
+        )
+        parametros: dict = {"nulos": NULOS_PANDAS}
+        parametros.update(
+            {f"arquivo_{indice}": arquivo for indice, arquivo in enumerate(arquivos)}
+        )
+        with medir("leitura_sql") as etapa:
+            con.execute(SQL_TRANSACOES.format(leituras=leituras), parametros)
+            total_linhas, ano_inicial, ano_final = con.execute(
+                "SELECT count(*), min(year(data)), max(year(data)) FROM transacoes"
+            ).fetchone()
+            if etapa is not None:
+                etapa.linhas_saida = total_linhas
+
+        # Feriados fixos e móveis dos anos presentes, consultados por R3.
+        feriados: pd.DataFrame = pd.DataFrame({
+            "data": CalendarioFeriados(ano_inicial, ano_final).datas()
+            if ano_inicial is not None else np.array([], dtype="datetime64[D]")
+        })
+        con.register("feriados", feriados)
+
+        with medir("regras_sql", total_linhas) as etapa:
+            alertas: pd.DataFrame = con.execute(sql_alertas(regras)).df()
+            alertas["REGRA"] = pd.Categorical.from_codes(
+                alertas["REGRA"].to_numpy(), categories=[r.nome for r in regras]
+            )
+            if etapa is not None:
+                etapa.linhas_saida = len(alertas)
+        with medir("gastos_sql", total_linhas):
+            fornecedor: pd.DataFrame = con.execute(SQL_FORNECEDOR).df()
+            total: pd.DataFrame = con.execute(SQL_TOTAL).df()
+    finally:
+        con.close()
+
+    return alertas, fornecedor, total, total_linhas
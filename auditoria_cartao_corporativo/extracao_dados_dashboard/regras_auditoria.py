@@ -0,0 +1,459 @@
+from dataclasses import dataclass, field
+from typing import Any, Callable, Iterator
+import numpy as np
+import pandas as pd
+
+from calendario_feriados import FERIADOS_FIXOS, calendario_para_datas
+from estruturas_incrementais import (
+    SEM_VALOR, CodificadorIncremental, IndiceDuplicidade, ParticoesEmDisco,
+    chaves_duplicidade, marcar_duplicidades,
+)
+from instrumentacao import medir
+
+
+@dataclass(frozen=True)
+class RegraAuditoria:
+    """
+    Declaração de uma regra de auditoria.
+
+    `mascara` recebe o DataFrame normalizado e os `limites` da regra e devolve
+    um array booleano alinhado às linhas. `portador`, quando definido,
+    substitui o NOME PORTADOR das ocorrências da regra (ex.: R6 agrupa por
+    órgão em vez de por pessoa). `por_transacao` indica que a regra depende
+    apenas da própria linha e pode ser avaliada bloco a bloco.
+    `estado_incremental`, quando definido, cria a partir dos limites e de um
+    número de partições em disco o objeto que avalia a regra no modo em
+    fluxo: `registrar(bloco)` guarda só o que a regra precisa de cada bloco,
+    `alertas(regra)` devolve, partição a partição, as ocorrências já resumidas
+    por mês, portador e regra, e `fechar()` apaga as partições. Toda regra
+    que não é `por_transacao` precisa de um.
+    `limite_janela` nomeia o limite, em dias, até onde a regra compara uma
+    transação com outras de datas vizinhas (ex.: `dias_maximos` da R2).
+    """
+
+    codigo: str
+    nome: str
+    mascara: Callable[[pd.DataFrame, dict[str, float]], np.ndarray]
+    limites: dict[str, float] = field(default_factory=dict)
+    portador: Callable[[pd.DataFrame], pd.Series] | None = None
+    por_transacao: bool = False
+    estado_incremental: Callable[[dict[str, float], int], Any] | None = None
+    limite_janela: str | None = None
+
+
+def _serie_para_mascara(df: pd.DataFrame, marcadas: pd.Index) -> np.ndarray:
+    """Converte rótulos de linhas marcadas num array booleano posicional."""
+    mascara: np.ndarray = np.zeros(len(df), dtype=bool)
+    mascara[df.index.get_indexer(marcadas)] = True
+    return mascara
+
+
+def mascara_gasto_elevado(df: pd.DataFrame, limites: dict[str, float]) -> np.ndarray:
+    return (df["VALOR_NUM"] > limites["valor_minimo"]).to_numpy()
+
+
+NANOSSEGUNDOS_POR_DIA: int = 86_400 * 10**9
+
+
+def marcar_fracionamento(
+    codigos: np.ndarray, tempos: np.ndarray, centavos: np.ndarray, limites: dict[str, float]
+) -> np.ndarray:
+    """
+    Núcleo da R2 sobre arrays de linhas válidas (portador e data presentes).
+
+    As linhas são ordenadas por (código do portador, instante em ns), mantendo
+    a ordem de entrada nos empates como o `sort_values` da versão agrupada.
+    Depois disso, a linha i fecha uma janela de 3 transações do mesmo
+    portador quando o código da linha i-2 é igual ao dela. A soma é feita em
+    centavos, então o resultado é exato.
+    """
+    mascara: np.ndarray = np.zeros(len(codigos), dtype=bool)
+    if len(codigos) < 3:
+        return mascara
+
+    ordem: np.ndarray = np.lexsort((tempos, codigos))
+    codigos_ord: np.ndarray = codigos[ordem]
+    tempos_ord: np.ndarray = tempos[ordem]
+    centavos_ord: np.ndarray = centavos[ordem]
+
+    mesmo_portador: np.ndarray = codigos_ord[2:] == codigos_ord[:-2]
+    # NaN em qualquer das 3 parcelas anula a soma, como no rolling(min_periods=3).
+    soma_janela: np.ndarray = centavos_ord[2:] + centavos_ord[1:-1] + centavos_ord[:-2]
+    dias_intervalo: np.ndarray = (tempos_ord[2:] - tempos_ord[:-2]) // NANOSSEGUNDOS_POR_DIA
+
+    marcadas: np.ndarray = (
+        mesmo_portador
+        & (soma_janela > round(limites["soma_minima"] * 100))
+        & (dias_intervalo <= limites["dias_maximos"])
+    )
+    mascara[ordem[2:][marcadas]] = True
+    return mascara
+
+
+def mascara_fracionamento(df: pd.DataFrame, limites: dict[str, float]) -> np.ndarray:
+    """R2 com uma única ordenação estável e aritmética de arrays deslocados."""
+    codigos: np.ndarray = pd.factorize(df["NOME PORTADOR"])[0]
+    datas: np.ndarray = df["DATA_DT"].to_numpy(dtype="datetime64[ns]")
+    validas: np.ndarray = np.flatnonzero((codigos >= 0) & ~np.isnat(datas))
+
+    mascara: np.ndarray = np.zeros(len(df), dtype=bool)
+    mascara[validas] = marcar_fracionamento(
+        codigos[validas],
+        datas.view(np.int64)[validas],
+        np.round(df["VALOR_NUM"].to_numpy(dtype=float)[validas] * 100),
+        limites,
+    )
+    return mascara
+
+
+def mascara_fracionamento_agrupada(
+    df: pd.DataFrame, limites: dict[str, float]
+) -> np.ndarray:
+    """Versão original de R2 (groupby + rolling), mantida como referência."""
+    df_ordenado: pd.DataFrame = (
+        df[["NOME PORTADOR", "DATA_DT", "VALOR_NUM"]]
+        .dropna(subset=["DATA_DT", "NOME PORTADOR"])
+        .sort_values(by=["NOME PORTADOR", "DATA_DT"])
+    )
+    soma_janela: pd.Series = (
+        df_ordenado.groupby("NOME PORTADOR", observed=True)["VALOR_NUM"]
+        .rolling(3, min_periods=3)
+        .sum()
+        .droplevel(0)
+    )
+    dias_intervalo: pd.Series = (
+        df_ordenado.groupby("NOME PORTADOR", observed=True)["DATA_DT"]
+        .diff(2)
+        .dt.days
+    )
+    marcadas: pd.Series = (soma_janela > limites["soma_minima"]) & (
+        dias_intervalo <= limites["dias_maximos"]
+    )
+    return _serie_para_mascara(df, marcadas.index[marcadas.to_numpy()])
+
+
+def mascara_dia_nao_util(df: pd.DataFrame, limites: dict[str, float]) -> np.ndarray:
+    """R3 por consulta ao calendário de feriados (fixos e móveis) pelo número do dia."""
+    datas: np.ndarray = df["DATA_DT"].to_numpy(dtype="datetime64[D]")
+    calendario = calendario_para_datas(datas)
+    if calendario is None:
+        return np.zeros(len(df), dtype=bool)
+    return calendario.dias_nao_uteis(datas)
+
+
+def mascara_dia_nao_util_texto(
+    df: pd.DataFrame, limites: dict[str, float]
+) -> np.ndarray:
+    """Versão original de R3 (só feriados fixos, por texto), mantida como referência."""
+    is_fim_de_semana: pd.Series = df["DATA_DT"].dt.dayofweek.isin([5, 6])
+    is_feriado: pd.Series = df["DATA_DT"].dt.strftime("-%m-%d").isin(FERIADOS_FIXOS)
+    return (is_fim_de_semana | is_feriado).to_numpy()
+
+
+def mascara_saque(df: pd.DataFrame, limites: dict[str, float]) -> np.ndarray:
+    return df["TRANSAÇÃO"].str.contains("SAQUE", case=False, na=False).to_numpy()
+
+
+def mascara_duplicidade(df: pd.DataFrame, limites: dict[str, float]) -> np.ndarray:
+    """
+    R5: mesma data, valor e favorecido. Com `janela_dias > 0`, também marca
+    mesmo favorecido e valor a até N dias, sobre chaves inteiras ordenadas.
+    """
+    janela_dias: int = int(limites["janela_dias"])
+    if janela_dias == 0:
+        # Sem janela, o duplicated do pandas já é o caminho mais rápido.
+        return df.duplicated(
+            subset=["DATA_DT", "VALOR_NUM", "NOME FAVORECIDO"], keep=False
+        ).to_numpy()
+
+    dias, centavos, favorecidos = chaves_duplicidade(
+        df, pd.factorize(df["NOME FAVORECIDO"])[0]
+    )
+    return marcar_duplicidades(dias, centavos, favorecidos, janela_dias)
+
+
+def linhas_sigilosas(df: pd.DataFrame) -> pd.Series:
+    return df["NOME PORTADOR"].str.upper().str.contains("SIGILOSO", na=False)
+
+
+def mascara_sigilo_excedente(df: pd.DataFrame, limites: dict[str, float]) -> np.ndarray:
+    is_sigiloso: pd.Series = linhas_sigilosas(df)
+    # Soma em centavos inteiros: exata e independente da ordem das linhas.
+    agro_sigilo: pd.Series = (
+        df.loc[is_sigiloso, ["ANO_MES", "NOME ÓRGÃO"]]
+        .assign(CENTAVOS=np.round(df.loc[is_sigiloso, "VALOR_NUM"] * 100))
+        .groupby(["ANO_MES", "NOME ÓRGÃO"], observed=True)["CENTAVOS"]
+        .sum()
+    )
+    orgaos_estourados: pd.Index = agro_sigilo.index[
+        (agro_sigilo > round(limites["soma_mensal_minima"] * 100)).to_numpy()
+    ]
+    return (
+        is_sigiloso.to_numpy()
+        & df.set_index(["ANO_MES", "NOME ÓRGÃO"]).index.isin(orgaos_estourados)
+    )
+
+
+def portador_sigiloso(df: pd.DataFrame) -> pd.Series:
+    return "SIGILOSO - " + df["NOME ÓRGÃO"].astype(str)
+
+
+CHAVES_ALERTAS: list[str] = ["ANO_MES", "NOME PORTADOR", "REGRA"]
+
+
+def agregar_alertas(alertas: pd.DataFrame) -> pd.DataFrame:
+    """Resume as ocorrências por mês, portador e regra."""
+    return (
+        alertas.groupby(CHAVES_ALERTAS, observed=True)
+        .agg(
+            CENTAVOS=("VALOR_CENTAVOS", "sum"),
+            TRANSACOES=("VALOR_CENTAVOS", "count"),
+        )
+        .reset_index()
+    )
+
+
+def resumir_ocorrencias(
+    regra: RegraAuditoria, meses: np.ndarray, portadores: np.ndarray, centavos: np.ndarray
+) -> pd.DataFrame:
+    """`agregar_alertas` sobre ocorrências de uma regra vindas de um estado incremental."""
+    return agregar_alertas(pd.DataFrame({
+        "ANO_MES": meses,
+        "NOME PORTADOR": portadores,
+        "VALOR_CENTAVOS": centavos,
+        "REGRA": pd.Categorical.from_codes(
+            np.zeros(len(meses), dtype=np.int8), categories=[regra.nome]
+        ),
+    }))
+
+
+class EstadoFracionamento:
+    """
+    R2 no modo em fluxo: (portador, instante, centavos, mês) de cada linha
+    válida vai para a partição do portador, então cada janela de 3 transações
+    está inteira numa partição, e cada uma é ordenada e marcada sozinha.
+    Em memória fica um bloco, depois uma partição, e os dicionários de
+    portadores e meses distintos.
+    """
+
+    TIPO: np.dtype = np.dtype([
+        ("portador", np.int64), ("tempo", np.int64), ("centavos", np.float64), ("ano_mes", np.int64),
+    ])
+
+    def __init__(self, limites: dict[str, float], n_particoes: int) -> None:
+        self.limites: dict[str, float] = limites
+        self._portadores: CodificadorIncremental = CodificadorIncremental()
+        self._meses: CodificadorIncremental = CodificadorIncremental()
+        self._particoes: ParticoesEmDisco = ParticoesEmDisco(self.TIPO, n_particoes)
+
+    def registrar(self, bloco: pd.DataFrame) -> None:
+        portadores: np.ndarray = self._portadores.codificar(bloco["NOME PORTADOR"])
+        datas: np.ndarray = bloco["DATA_DT"].to_numpy(dtype="datetime64[ns]")
+        validas: np.ndarray = np.flatnonzero((portadores >= 0) & ~np.isnat(datas))
+
+        registros: np.ndarray = np.empty(len(validas), dtype=self.TIPO)
+        registros["portador"] = portadores[validas]
+        registros["tempo"] = datas.view(np.int64)[validas]
+        registros["centavos"] = np.round(bloco["VALOR_NUM"].to_numpy(dtype=float)[validas] * 100)
+        registros["ano_mes"] = self._meses.codificar(bloco["ANO_MES"])[validas]
+        self._particoes.acrescentar(registros["portador"], registros)
+
+    def alertas(self, regra: RegraAuditoria) -> Iterator[pd.DataFrame]:
+        for registros in self._particoes:
+            marcadas: np.ndarray = marcar_fracionamento(
+                registros["portador"], registros["tempo"], registros["centavos"], self.limites
+            )
+            if marcadas.any():
+                marcados: np.ndarray = registros[marcadas]
+                yield resumir_ocorrencias(
+                    regra,
+                    self._meses.decodificar(marcados["ano_mes"]),
+                    self._portadores.decodificar(marcados["portador"]),
+                    marcados["centavos"],
+                )
+
+    def fechar(self) -> None:
+        self._particoes.fechar()
+
+
+class EstadoDuplicidade:
+    """
+    R5 no modo em fluxo: o `IndiceDuplicidade` particionado pelo favorecido,
+    levando junto o mês e o portador de cada linha para montar os alertas.
+    """
+
+    CAMPOS_EXTRAS: list[tuple[str, type]] = [("portador", np.int64), ("ano_mes", np.int64)]
+
+    def __init__(self, limites: dict[str, float], n_particoes: int) -> None:
+        self._portadores: CodificadorIncremental = CodificadorIncremental()
+        self._meses: CodificadorIncremental = CodificadorIncremental()
+        self._indice: IndiceDuplicidade = IndiceDuplicidade(
+            int(limites["janela_dias"]), n_particoes, self.CAMPOS_EXTRAS
+        )
+
+    def registrar(self, bloco: pd.DataFrame) -> None:
+        self._indice.registrar(bloco, {
+            "portador": self._portadores.codificar(bloco["NOME PORTADOR"]),
+            "ano_mes": self._meses.codificar(bloco["ANO_MES"]),
+        })
+
+    def alertas(self, regra: RegraAuditoria) -> Iterator[pd.DataFrame]:
+        for registros, marcadas in self._indice.marcadas_por_particao():
+            if not marcadas.any():
+                continue
+            marcados: np.ndarray = registros[marcadas]
+            centavos: np.ndarray = marcados["centavos"].astype(float)
+            centavos[marcados["centavos"] == SEM_VALOR] = np.nan
+            yield resumir_ocorrencias(
+                regra,
+                self._meses.decodificar(marcados["ano_mes"]),
+                self._portadores.decodificar(marcados["portador"]),
+                centavos,
+            )
+
+    def fechar(self) -> None:
+        self._indice.fechar()
+
+
+class EstadoSigilo:
+    """
+    R6 no modo em fluxo: só a soma (em centavos) e a contagem das despesas
+    sigilosas por (ANO_MES, NOME ÓRGÃO), acumuladas bloco a bloco. Nada vai
+    para o disco; o estado tem o tamanho dos pares mês/órgão distintos.
+    """
+
+    CHAVES: list[str] = ["ANO_MES", "NOME ÓRGÃO"]
+
+    def __init__(self, limites: dict[str, float], n_particoes: int) -> None:
+        self.limites: dict[str, float] = limites
+        self._somas: pd.DataFrame | None = None
+
+    def registrar(self, bloco: pd.DataFrame) -> None:
+        sigilosas: pd.Series = linhas_sigilosas(bloco)
+        parcial: pd.DataFrame = (
+            bloco.loc[sigilosas, self.CHAVES]
+            .assign(CENTAVOS=np.round(bloco.loc[sigilosas, "VALOR_NUM"] * 100))
+            .groupby(self.CHAVES, observed=True)
+            .agg(CENTAVOS=("CENTAVOS", "sum"), TRANSACOES=("CENTAVOS", "count"))
+            .reset_index()
+        )
+        self._somas = (
+            pd.concat([self._somas, parcial], ignore_index=True)
+            .groupby(self.CHAVES, observed=True)
+            .sum()
+            .reset_index()
+        )
+
+    def alertas(self, regra: RegraAuditoria) -> Iterator[pd.DataFrame]:
+        if self._somas is None or regra.portador is None:
+            return
+        estourados: pd.DataFrame = self._somas[
+            self._somas["CENTAVOS"] > round(self.limites["soma_mensal_minima"] * 100)
+        ]
+        yield pd.DataFrame({
+            "ANO_MES": estourados["ANO_MES"].to_numpy(),
+            "NOME PORTADOR": regra.portador(estourados).to_numpy(),
+            "REGRA": pd.Categorical.from_codes(
+                np.zeros(len(estourados), dtype=np.int8), categories=[regra.nome]
+            ),
+            "CENTAVOS": estourados["CENTAVOS"].to_numpy(),
+            "TRANSACOES": estourados["TRANSACOES"].to_numpy(),
+        })
+
+    def fechar(self) -> None:
+        self._somas = None
+
+
+REGRAS_AUDITORIA: list[RegraAuditoria] = [
+    RegraAuditoria(
+        "R1", "R1 - Gasto Diário Elevado", mascara_gasto_elevado,
+        {"valor_minimo": 3000.00}, por_transacao=True,
+    ),
+    RegraAuditoria(
+        "R2", "R2 - Suspeita de Fracionamento", mascara_fracionamento,
+        {"soma_minima": 5000.00, "dias_maximos": 2},
+        estado_incremental=EstadoFracionamento, limite_janela="dias_maximos",
+    ),
+    RegraAuditoria(
+        "R3", "R3 - Uso em Dias Não Úteis", mascara_dia_nao_util,
+        por_transacao=True,
+    ),
+    RegraAuditoria(
+        "R4", "R4 - Operação de Saque", mascara_saque, por_transacao=True,
+    ),
+    RegraAuditoria(
+        "R5", "R5 - Transação Duplicada no Dia", mascara_duplicidade,
+        {"janela_dias": 0}, estado_incremental=EstadoDuplicidade,
+        limite_janela="janela_dias",
+    ),
+    RegraAuditoria(
+        "R6", "R6 - Despesa Sigilosa Excedente", mascara_sigilo_excedente,
+        {"soma_mensal_minima": 10000.00}, portador=portador_sigiloso,
+        estado_incremental=EstadoSigilo,
+    ),
+]
+
+
+def alcance_dias(regras: list[RegraAuditoria] = REGRAS_AUDITORIA) -> int:
+    """Maior distância, em dias, entre transações comparadas por alguma regra."""
+    return max(
+        (int(r.limites[r.limite_janela]) for r in regras if r.limite_janela),
+        default=0,
+    )
+
+
+def avaliar_regras(
+    df: pd.DataFrame, regras: list[RegraAuditoria] = REGRAS_AUDITORIA
+) -> pd.DataFrame:
+    """
+    Avalia todas as regras sobre o mesmo DataFrame e devolve a tabela esparsa
+    de ocorrências: uma linha (LINHA, REGRA) por transação violada, sem copiar
+    as transações.
+    """
+    linhas: list[np.ndarray] = []
+    codigos: list[np.ndarray] = []
+
+    for posicao, regra in enumerate(regras):
+        with medir(f"regra_{regra.codigo}", len(df)) as etapa:
+            marcadas: np.ndarray = np.flatnonzero(regra.mascara(df, regra.limites))
+            if etapa is not None:
+                etapa.linhas_saida = len(marcadas)
+        linhas.append(marcadas)
+        codigos.append(np.full(len(marcadas), posicao, dtype=np.int8))
+
+    return pd.DataFrame({
+        "LINHA": np.concatenate(linhas).astype(np.int64),
+        "REGRA": pd.Categorical.from_codes(
+            np.concatenate(codigos), categories=[r.nome for r in regras]
+        ),
+    })
+
+
+def montar_alertas(
+    df: pd.DataFrame,
+    ocorrencias: pd.DataFrame,
+    regras: list[RegraAuditoria] = REGRAS_AUDITORIA,
+) -> pd.DataFrame:
+    """Junta às ocorrências apenas as colunas usadas no score de risco."""
+    linhas: np.ndarray = ocorrencias["LINHA"].to_numpy()
+    codigos: np.ndarray = ocorrencias["REGRA"].cat.codes.to_numpy()
+
+    portadores: np.ndarray = df["NOME PORTADOR"].to_numpy(dtype=object)[linhas]
+    for posicao, regra in enumerate(regras):
+        if regra.portador is None:
+            continue
+        da_regra: np.ndarray = codigos == posicao
+        portadores[da_regra] = regra.portador(
+            df.iloc[linhas[da_regra]]
+        ).to_numpy(dtype=object)
+
+    valores: np.ndarray = df["VALOR_NUM"].to_numpy()[linhas]
+    return pd.DataFrame({
+        "ANO_MES": df["ANO_MES"].to_numpy()[linhas],
+        "NOME PORTADOR": portadores,
+        "VALOR_NUM": valores,
+        # Centavos inteiros (em float, para manter NaN) somam de forma exata,
+        # então o total não depende da ordem em que as ocorrências aparecem.
+        "VALOR_CENTAVOS": np.round(valores * 100),
+        "REGRA": ocorrencias["REGRA"].array,
+    })
@@ -0,0 +1,63 @@
+import os
+import shutil
+import pandas as pd
+import pyarrow as pa
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
+
+COLUNA_PARTICAO: str = "ANO_MES"
+
+
+def codificar_texto(df: pd.DataFrame) -> pd.DataFrame:
+    """Converte as colunas de texto em categóricas só com os valores presentes."""
+    df = df.copy()
+    for coluna in df.columns:
+        if isinstance(df[coluna].dtype, pd.CategoricalDtype):
+            df[coluna] = df[coluna].cat.remove_unused_categories()
+        elif pd.api.types.is_string_dtype(df[coluna]) or df[coluna].dtype == object:
+            df[coluna] = df[coluna].astype("category")
+    return df
+
+
+def gravar_tabela_particionada(df: pd.DataFrame, pasta: str, tabela: str) -> str:
+    """
+    Grava `df` em `pasta/tabela/ANO_MES=AAAA-MM/parte-0.parquet`.
+
+    Cada mês fica num diretório próprio (partição no estilo Hive), então uma
+    consulta lê só os meses filtrados. O texto vai codificado em dicionário
+    montado com os valores do próprio mês, para que cada arquivo não carregue
+    o dicionário do histórico inteiro. A tabela é escrita num diretório
+    temporário e só então substitui a anterior, sem deixar partições de
+    meses que sumiram.
+    """
+    destino: str = os.path.join(pasta, tabela)
+    temporario: str = f"{destino}.tmp"
+    if os.path.exists(temporario):
+        shutil.rmtree(temporario)
+    os.makedirs(temporario)
+
+    for mes, df_mes in df.groupby(COLUNA_PARTICAO, sort=True):
+        pasta_mes: str = os.path.join(temporario, f"{COLUNA_PARTICAO}={mes}")
+        os.makedirs(pasta_mes)
+        dados: pa.Table = pa.Table.from_pandas(
+            codificar_texto(df_mes.drop(columns=COLUNA_PARTICAO)), preserve_index=False
+        )
+        pq.write_table(dados, os.path.join(pasta_mes, "parte-0.parquet"))
+
+    if os.path.exists(destino):
+        shutil.rmtree(destino)
+    os.replace(temporario, destino)
+    return destino
+
+
+def ler_tabela_particionada(
+    pasta: str, tabela: str, meses: list[str] | None = None
+) -> pd.DataFrame:
+    """Lê a tabela inteira ou, com `meses`, apenas as partições desses meses."""
+    dataset: ds.Dataset = ds.dataset(
+        os.path.join(pasta, tabela), format="parquet", partitioning="hive"
+    )
+    filtro: ds.Expression | None = (
+        ds.field(COLUNA_PARTICAO).isin(meses) if meses is not None else None
+    )
+    return dataset.to_table(filter=filtro).to_pandas()
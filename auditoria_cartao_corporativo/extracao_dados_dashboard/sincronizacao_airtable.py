@@ -0,0 +1,353 @@
+import hashlib
+import json
+import math
+import os
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor, as_completed
+from dataclasses import dataclass, field
+from urllib.parse import quote
+import pandas as pd
+import requests
+from requests.adapters import HTTPAdapter
+
+URL_API_AIRTABLE: str = "https://api.airtable.com/v0"
+# Limites da API pública do Airtable: 10 registros por requisição de escrita
+# e 5 requisições por segundo por base (acima disso, HTTP 429 e 30 s de espera).
+REGISTROS_POR_LOTE: int = 10
+REQUISICOES_POR_SEGUNDO: float = 5.0
+ESPERA_LIMITE_EXCEDIDO: float = 30.0
+ARQUIVO_ESTADO_SINCRONIZACAO: str = "estado_sincronizacao_airtable.json"
+
+
+@dataclass(frozen=True)
+class TabelaAirtable:
+    """Um CSV publicado e a tabela do Airtable que o recebe."""
+
+    arquivo_csv: str
+    tabela: str
+    chaves: tuple[str, ...]
+    colunas_numericas: tuple[str, ...]
+
+
+TABELAS_AIRTABLE: tuple[TabelaAirtable, ...] = (
+    TabelaAirtable(
+        "airtable_top5_criticidade_mensal.csv",
+        "top_5_score_mensal",
+        ("ANO_MES", "ID PORTADOR"),
+        ("VALOR_TOTAL_ALERTA", "REGRAS_VIOLADAS", "TOTAL_TRANSACOES_SUSPEITAS", "SCORE_RISCO"),
+    ),
+    TabelaAirtable(
+        "airtable_indicio_direcionamento.csv",
+        "top_concentracao_mensal",
+        ("ANO_MES", "ID PORTADOR", "ID FAVORECIDO"),
+        ("GASTO_FORNECEDOR_MES", "GASTO_TOTAL_PORTADOR_MES", "PERC_CONCENTRACAO"),
+    ),
+)
+
+
+class RespostaInvalidaAirtable(requests.RequestException):
+    """Resposta de sucesso sem a lista `records`; o lote conta como recusado."""
+
+
+def registros_da_resposta(resposta: requests.Response) -> list[dict]:
+    """Extrai `records` de uma resposta 2xx, recusando corpos que não os tragam."""
+    try:
+        corpo = resposta.json()
+    except ValueError as erro:
+        raise RespostaInvalidaAirtable(
+            f"HTTP {resposta.status_code} com corpo que não é JSON", response=resposta
+        ) from erro
+    registros = corpo.get("records") if isinstance(corpo, dict) else None
+    if not isinstance(registros, list):
+        raise RespostaInvalidaAirtable(
+            f"HTTP {resposta.status_code} sem 'records': {str(corpo)[:200]}", response=resposta
+        )
+    return registros
+
+
+class LimitadorTaxa:
+    """
+    Espaça o início das requisições de todas as threads em 1/taxa segundos.
+
+    `pausar` empurra a próxima vaga para frente, fazendo todos os workers
+    respeitarem juntos a espera pedida por um HTTP 429.
+    """
+
+    def __init__(self, requisicoes_por_segundo: float) -> None:
+        self._intervalo: float = 1.0 / requisicoes_por_segundo
+        self._proxima_vaga: float = 0.0
+        self._trava: threading.Lock = threading.Lock()
+
+    def aguardar(self) -> None:
+        with self._trava:
+            agora: float = time.monotonic()
+            vaga: float = max(agora, self._proxima_vaga)
+            self._proxima_vaga = vaga + self._intervalo
+        if vaga > agora:
+            time.sleep(vaga - agora)
+
+    def pausar(self, segundos: float) -> None:
+        with self._trava:
+            self._proxima_vaga = max(self._proxima_vaga, time.monotonic() + segundos)
+
+
+class ClienteAirtable:
+    """
+    Cliente da API REST do Airtable para upserts e exclusões em lote.
+
+    Uma única `requests.Session` reaproveita as conexões HTTPS entre as
+    threads (o pool do adaptador tem uma conexão por worker), e o
+    `LimitadorTaxa` mantém o conjunto abaixo do limite da base.
+    """
+
+    def __init__(
+        self,
+        token: str,
+        base_id: str,
+        url_base: str = URL_API_AIRTABLE,
+        n_workers: int = 4,
+        requisicoes_por_segundo: float = REQUISICOES_POR_SEGUNDO,
+        espera_limite_excedido: float = ESPERA_LIMITE_EXCEDIDO,
+        tentativas: int = 5,
+        timeout: float = 30.0,
+    ) -> None:
+        self.url_base: str = f"{url_base.rstrip('/')}/{base_id}"
+        self.n_workers: int = n_workers
+        self.espera_limite_excedido: float = espera_limite_excedido
+        self.tentativas: int = tentativas
+        self.timeout: float = timeout
+        self.limitador: LimitadorTaxa = LimitadorTaxa(requisicoes_por_segundo)
+
+        self.sessao: requests.Session = requests.Session()
+        adaptador: HTTPAdapter = HTTPAdapter(pool_connections=1, pool_maxsize=n_workers)
+        self.sessao.mount("https://", adaptador)
+        self.sessao.mount("http://", adaptador)
+        self.sessao.headers.update({
+            "Authorization": f"Bearer {token}",
+            "Content-Type": "application/json",
+        })
+
+    def __enter__(self) -> "ClienteAirtable":
+        return self
+
+    def __exit__(self, *excecao) -> None:
+        self.sessao.close()
+
+    def requisitar(self, metodo: str, tabela: str, **kwargs) -> list[dict]:
+        """
+        Envia a requisição respeitando a taxa, repete em 429 e erros 5xx e
+        devolve os `records` da resposta (`RespostaInvalidaAirtable` se faltarem).
+        """
+        url: str = f"{self.url_base}/{quote(tabela, safe='')}"
+        for tentativa in range(1, self.tentativas + 1):
+            self.limitador.aguardar()
+            resposta: requests.Response = self.sessao.request(
+                metodo, url, timeout=self.timeout, **kwargs
+            )
+            if resposta.status_code == 429:
+                espera: float = float(resposta.headers.get("Retry-After", self.espera_limite_excedido))
+                self.limitador.pausar(espera)
+            elif resposta.status_code >= 500 and tentativa < self.tentativas:
+                self.limitador.pausar(2 ** (tentativa - 1))
+            else:
+                resposta.raise_for_status()
+                return registros_da_resposta(resposta)
+        resposta.raise_for_status()
+        return registros_da_resposta(resposta)
+
+    def upsert_lote(self, tabela: str, chaves: tuple[str, ...], registros: list[dict]) -> list[dict]:
+        """Cria ou atualiza até 10 registros, casando pelos campos `chaves`."""
+        corpo: dict = {
+            "performUpsert": {"fieldsToMergeOn": list(chaves)},
+            "records": [{"fields": campos} for campos in registros],
+            "typecast": True,
+        }
+        resposta: list[dict] = self.requisitar("PATCH", tabela, json=corpo)
+        if len(resposta) != len(registros) or not all("id" in r for r in resposta):
+            raise RespostaInvalidaAirtable(
+                f"upsert de {len(registros)} registro(s) devolveu {len(resposta)} com ID"
+            )
+        return resposta
+
+    def remover_lote(self, tabela: str, ids: list[str]) -> list[dict]:
+        """Exclui até 10 registros pelos IDs do Airtable."""
+        return self.requisitar("DELETE", tabela, params=[("records[]", i) for i in ids])
+
+
+@dataclass
+class ResumoSincronizacao:
+    tabela: str
+    enviados: int = 0
+    inalterados: int = 0
+    removidos: int = 0
+    lotes_com_falha: list[str] = field(default_factory=list)
+
+
+def impressao_registro(campos: dict) -> str:
+    """Hash estável dos campos, usado para saber se a linha mudou desde o último envio."""
+    texto: str = json.dumps(campos, sort_keys=True, ensure_ascii=False)
+    return hashlib.sha256(texto.encode("utf-8")).hexdigest()
+
+
+def carregar_registros(pasta_resultados: str, especificacao: TabelaAirtable) -> dict[str, dict]:
+    """Lê o CSV publicado e devolve os campos de cada linha indexados pela chave de upsert."""
+    df: pd.DataFrame = pd.read_csv(
+        os.path.join(pasta_resultados, especificacao.arquivo_csv),
+        sep=";", dtype=str, keep_default_na=False, encoding="utf-8",
+    )
+    # O CNPJ continua texto (zeros à esquerda); só as métricas viram número.
+    for coluna in especificacao.colunas_numericas:
+        df[coluna] = pd.to_numeric(df[coluna].mask(df[coluna] == ""))
+
+    chaves: list[str] = list(especificacao.chaves)
+    if ausentes := [c for c in chaves if c not in df.columns]:
+        raise ValueError(
+            f"{especificacao.arquivo_csv} não tem as colunas de chave {ausentes};"
+            " gere os CSVs de novo com extraçao_dados.py."
+        )
+    if df.duplicated(chaves).any():
+        raise ValueError(f"{especificacao.arquivo_csv} tem chaves de upsert repetidas: {chaves}")
+
+    registros: dict[str, dict] = {}
+    for campos in df.to_dict("records"):
+        campos = {
+            coluna: None if isinstance(valor, float) and math.isnan(valor) else valor
+            for coluna, valor in campos.items()
+        }
+        chave: str = json.dumps([campos[c] for c in chaves], ensure_ascii=False)
+        registros[chave] = campos
+    return registros
+
+
+def dividir_em_lotes(itens: list, tamanho: int = REGISTROS_POR_LOTE) -> list[list]:
+    return [itens[i:i + tamanho] for i in range(0, len(itens), tamanho)]
+
+
+def sincronizar_tabela(
+    cliente: ClienteAirtable,
+    especificacao: TabelaAirtable,
+    registros: dict[str, dict],
+    estado_tabela: dict[str, dict],
+) -> ResumoSincronizacao:
+    """
+    Envia ao Airtable só o que mudou desde o último envio bem-sucedido.
+
+    `estado_tabela` guarda, por chave, o ID do registro no Airtable e o hash
+    dos campos enviados. Linhas novas ou alteradas vão em upserts de 10;
+    chaves que saíram do CSV (ex.: portador que deixou o top 5 do mês) são
+    excluídas pelo ID. O estado só é atualizado para os lotes aceitos, então
+    um lote que falhou volta a ser enviado na próxima sincronização.
+    """
+    resumo: ResumoSincronizacao = ResumoSincronizacao(especificacao.tabela)
+    impressoes: dict[str, str] = {c: impressao_registro(r) for c, r in registros.items()}
+
+    alterados: list[str] = [
+        chave for chave in registros
+        if estado_tabela.get(chave, {}).get("hash") != impressoes[chave]
+    ]
+    removidos: list[str] = [chave for chave in estado_tabela if chave not in registros]
+    resumo.inalterados = len(registros) - len(alterados)
+
+    with ThreadPoolExecutor(max_workers=cliente.n_workers) as executor:
+        envios: dict[Future, list[str]] = {
+            executor.submit(
+                cliente.upsert_lote, especificacao.tabela, especificacao.chaves,
+                [registros[c] for c in lote],
+            ): lote
+            for lote in dividir_em_lotes(alterados)
+        }
+        exclusoes: dict[Future, list[str]] = {
+            executor.submit(
+                cliente.remover_lote, especificacao.tabela,
+                [estado_tabela[c]["id"] for c in lote],
+            ): lote
+            for lote in dividir_em_lotes(removidos)
+        }
+
+        for futuro in as_completed([*envios, *exclusoes]):
+            lote: list[str] = envios.get(futuro) or exclusoes[futuro]
+            try:
+                resposta: list[dict] = futuro.result()
+            except requests.RequestException as erro:
+                resumo.lotes_com_falha.append(f"{len(lote)} registro(s): {erro}")
+                continue
+            if futuro in envios:
+                # O Airtable devolve os registros na mesma ordem do envio.
+                for chave, registro in zip(lote, resposta):
+                    estado_tabela[chave] = {"id": registro["id"], "hash": impressoes[chave]}
+                resumo.enviados += len(lote)
+            else:
+                for chave in lote:
+                    del estado_tabela[chave]
+                resumo.removidos += len(lote)
+    return resumo
+
+
+def carregar_estado(caminho_estado: str, base_id: str) -> dict:
+    """Lê o último estado enviado; um estado de outra base é descartado."""
+    if os.path.exists(caminho_estado):
+        with open(caminho_estado, encoding="utf-8") as f:
+            estado: dict = json.load(f)
+        if estado.get("base_id") == base_id:
+            return estado
+    return {"base_id": base_id, "tabelas": {}}
+
+
+def gravar_estado(caminho_estado: str, estado: dict) -> None:
+    temporario: str = f"{caminho_estado}.tmp"
+    with open(temporario, mode="w", encoding="utf-8") as f:
+        json.dump(estado, f, ensure_ascii=False, indent=2)
+    os.replace(temporario, caminho_estado)
+
+
+def sincronizar_resultados(
+    pasta_resultados: str,
+    token: str | None = None,
+    base_id: str | None = None,
+    url_base: str = URL_API_AIRTABLE,
+    caminho_estado: str | None = None,
+    n_workers: int = 4,
+    requisicoes_por_segundo: float = REQUISICOES_POR_SEGUNDO,
+    espera_limite_excedido: float = ESPERA_LIMITE_EXCEDIDO,
+) -> list[ResumoSincronizacao]:
+    """
+    Publica no Airtable os CSVs de `pasta_resultados` (top 5 do score e
+    indício de direcionamento) por upsert, substituindo o envio manual.
+
+    Token e base vêm de `AIRTABLE_API_TOKEN` e `AIRTABLE_BASE_ID` quando não
+    informados. O estado do último envio fica em
+    `estado_sincronizacao_airtable.json`, ao lado dos CSVs.
+    """
+    token = token or os.getenv("AIRTABLE_API_TOKEN")
+    base_id = base_id or os.getenv("AIRTABLE_BASE_ID")
+    if not token or not base_id:
+        raise ValueError("Defina AIRTABLE_API_TOKEN e AIRTABLE_BASE_ID para sincronizar com o Airtable.")
+
+    caminho_estado = caminho_estado or os.path.join(pasta_resultados, ARQUIVO_ESTADO_SINCRONIZACAO)
+    estado: dict = carregar_estado(caminho_estado, base_id)
+
+    resumos: list[ResumoSincronizacao] = []
+    with ClienteAirtable(
+        token, base_id, url_base, n_workers, requisicoes_por_segundo, espera_limite_excedido
+    ) as cliente:
+        try:
+            for especificacao in TABELAS_AIRTABLE:
+                registros: dict[str, dict] = carregar_registros(pasta_resultados, especificacao)
+                estado_tabela: dict[str, dict] = estado["tabelas"].setdefault(especificacao.tabela, {})
+                resumo: ResumoSincronizacao = sincronizar_tabela(
+                    cliente, especificacao, registros, estado_tabela
+                )
+                resumos.append(resumo)
+                print(
+                    f"{resumo.tabela}: {resumo.enviados} enviados, {resumo.inalterados}"
+                    f" inalterados, {resumo.removidos} removidos"
+                    f", {len(resumo.lotes_com_falha)} lote(s) com falha"
+                )
+        finally:
+            gravar_estado(caminho_estado, estado)
+    return resumos
+
+
+if __name__ == "__main__":
+    sincronizar_resultados("resultados_auditoria")
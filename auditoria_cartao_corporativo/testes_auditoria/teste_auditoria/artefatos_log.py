@@ -0,0 +1,120 @@
+import glob
+import gzip
+import hashlib
+import json
+import os
+import zlib
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any
+
+# Um artefato recebe novos dumps até passar deste tamanho; depois começa outro.
+TAMANHO_MAXIMO_ARTEFATO: int = 50 * 1024**2
+ARTEFATOS_MANTIDOS: int = 5
+TAMANHO_BLOCO: int = 1 << 16
+
+
+@dataclass(frozen=True)
+class PonteiroArtefato:
+    """Onde ficou um dump: arquivo, posição do membro gzip, tamanho e hash do JSON."""
+
+    arquivo: str
+    deslocamento: int
+    bytes_json: int
+    sha256: str
+
+    def __str__(self) -> str:
+        return (
+            f"artefato={self.arquivo} deslocamento={self.deslocamento}"
+            f" bytes={self.bytes_json} sha256={self.sha256}"
+        )
+
+    @classmethod
+    def do_texto(cls, texto: str) -> "PonteiroArtefato":
+        """Recupera o ponteiro da linha gravada no log (formato de `__str__`)."""
+        campos: dict[str, str] = dict(
+            item.split("=", 1) for item in texto.split() if "=" in item
+        )
+        return cls(
+            campos["artefato"], int(campos["deslocamento"]),
+            int(campos["bytes"]), campos["sha256"],
+        )
+
+
+def listar_artefatos(pasta: str, prefixo: str) -> list[str]:
+    """Artefatos de `prefixo` do mais antigo ao mais recente (o nome leva a data e hora)."""
+    return sorted(glob.glob(os.path.join(pasta, f"{prefixo}.*.json.gz")))
+
+
+def artefato_atual(pasta: str, prefixo: str, tamanho_maximo: int) -> str:
+    """Último artefato enquanto couber mais um dump; senão, o nome de um novo."""
+    artefatos: list[str] = listar_artefatos(pasta, prefixo)
+    if artefatos and os.path.getsize(artefatos[-1]) < tamanho_maximo:
+        return artefatos[-1]
+    carimbo: str = datetime.now().strftime("%Y%m%d-%H%M%S-%f")
+    return os.path.join(pasta, f"{prefixo}.{carimbo}.json.gz")
+
+
+def gravar_json_compactado(
+    dados: Any,
+    pasta: str,
+    prefixo: str,
+    tamanho_maximo: int = TAMANHO_MAXIMO_ARTEFATO,
+    mantidos: int = ARTEFATOS_MANTIDOS,
+) -> PonteiroArtefato:
+    """
+    Grava `dados` como JSON indentado num membro gzip acrescentado ao artefato atual.
+
+    O JSON sai do `iterencode` em blocos de até 64 KB que vão direto para o
+    gzip e para o SHA-256, sem montar o texto inteiro na memória. Quando o
+    artefato passa de `tamanho_maximo`, o próximo dump abre outro arquivo, e
+    só os `mantidos` mais recentes são preservados.
+    """
+    os.makedirs(pasta, exist_ok=True)
+    caminho: str = artefato_atual(pasta, prefixo, tamanho_maximo)
+    resumo = hashlib.sha256()
+    bytes_json: int = 0
+
+    with open(caminho, mode="ab") as bruto:
+        deslocamento: int = bruto.tell()
+        with gzip.GzipFile(fileobj=bruto, mode="wb", compresslevel=6) as compactado:
+            pendentes: list[str] = []
+            tamanho_pendente: int = 0
+            trechos = json.JSONEncoder(indent=4, ensure_ascii=False).iterencode(dados)
+            for trecho in trechos:
+                pendentes.append(trecho)
+                tamanho_pendente += len(trecho)
+                if tamanho_pendente >= TAMANHO_BLOCO:
+                    bloco: bytes = "".join(pendentes).encode("utf-8")
+                    resumo.update(bloco)
+                    compactado.write(bloco)
+                    bytes_json += len(bloco)
+                    pendentes, tamanho_pendente = [], 0
+            bloco = "".join(pendentes).encode("utf-8")
+            resumo.update(bloco)
+            compactado.write(bloco)
+            bytes_json += len(bloco)
+
+    for antigo in listar_artefatos(pasta, prefixo)[:-mantidos]:
+        os.remove(antigo)
+    return PonteiroArtefato(os.path.basename(caminho), deslocamento, bytes_json, resumo.hexdigest())
+
+
+def ler_json_compactado(pasta: str, ponteiro: PonteiroArtefato) -> Any:
+    """Lê de volta um dump pelo ponteiro do log, conferindo o SHA-256."""
+    descompactador = zlib.decompressobj(wbits=16 + zlib.MAX_WBITS)
+    resumo = hashlib.sha256()
+    partes: list[bytes] = []
+    with open(os.path.join(pasta, ponteiro.arquivo), mode="rb") as f:
+        f.seek(ponteiro.deslocamento)
+        # Descompacta só o membro do ponteiro: para no fim dele, não no fim do arquivo.
+        while not descompactador.eof:
+            bloco: bytes = f.read(TAMANHO_BLOCO)
+            if not bloco:
+                break
+            parte: bytes = descompactador.decompress(bloco)
+            resumo.update(parte)
+            partes.append(parte)
+    if resumo.hexdigest() != ponteiro.sha256:
+        raise ValueError(f"Hash divergente no dump {ponteiro}")
+    return json.loads(b"".join(partes))
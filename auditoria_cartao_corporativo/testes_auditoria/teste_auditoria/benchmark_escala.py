@@ -0,0 +1,148 @@
+import filecmp
+import importlib.util
+import json
+import os
+import shutil
+import tempfile
+import time
+from datetime import datetime
+
+import sys
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../../extracao_dados_dashboard')))
+# pyrefly: ignore [missing-import]
+from extraçao_dados import VARIAVEL_SAL_IDENTIFICADORES, executar_auditoria_pasta
+# pyrefly: ignore [missing-import]
+from instrumentacao import ARQUIVO_RELATORIO
+from dados_sinteticos import LINHAS_POR_MES, gerar_pasta_cpgf
+from desempenho import medir_em_processo_isolado
+
+LOG_BENCHMARK: str = os.path.join(os.path.dirname(__file__), "../logs/auditoria_benchmark_escala.log")
+
+# Sal fixo dos testes: a auditoria não publica identificadores sem sal.
+os.environ.setdefault(VARIAVEL_SAL_IDENTIFICADORES, "sal-dos-testes")
+
+# De 1 mês a 10 anos de extratos (~10.500 linhas por mês, como os reais).
+# CPGF_BENCHMARK_MESES="1,12" restringe as escalas numa rodada rápida.
+ESCALAS_MESES: list[int] = [
+    int(n) for n in os.getenv("CPGF_BENCHMARK_MESES", "1,12,36,120").split(",")
+]
+MODOS_BENCHMARK: list[str] = ["memoria", "fluxo"] + (
+    ["duckdb"] if importlib.util.find_spec("duckdb") else []
+)
+
+
+def inicializar_log_benchmark() -> None:
+    """Cria ou limpa o arquivo de log no início do benchmark de escala."""
+    with open(LOG_BENCHMARK, mode="w", encoding="utf-8") as f:
+        data_hora: str = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        f.write("========================================================\n")
+        f.write(" BENCHMARK DE ESCALA - DADOS SINTÉTICOS DO CPGF\n")
+        f.write(f" Data de Execução: {data_hora}\n")
+        f.write("========================================================\n\n")
+
+
+def registrar_medicao(nome_medicao: str, detalhe: str) -> None:
+    """Salva o resultado individual de cada medição no log do benchmark."""
+    data_hora: str = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    with open(LOG_BENCHMARK, mode="a", encoding="utf-8") as f:
+        f.write(f"[{data_hora}] {nome_medicao}: {detalhe}\n")
+
+
+def descrever_escala(n_meses: int) -> str:
+    if n_meses % 12 == 0:
+        anos: int = n_meses // 12
+        return f"{anos} ano" if anos == 1 else f"{anos} anos"
+    return f"{n_meses} mês" if n_meses == 1 else f"{n_meses} meses"
+
+
+def auditar_e_ler_relatorio(pasta_dados: str, pasta_resultados: str, modo: str) -> dict:
+    """Executa a auditoria e devolve o relatorio_execucao.json da rodada."""
+    executar_auditoria_pasta(pasta_dados, pasta_resultados, modo=modo)
+    with open(os.path.join(pasta_resultados, ARQUIVO_RELATORIO), encoding="utf-8") as f:
+        return json.load(f)
+
+
+def resumir_etapas(relatorio: dict) -> str:
+    """Tempo, vazão e pico de RSS das etapas de primeiro e segundo nível (sem as regras)."""
+    partes: list[str] = []
+    for etapa in relatorio["etapas"]:
+        caminho: str = etapa["etapa"]
+        if caminho.count("/") != 1 or "regra_" in caminho:
+            continue
+        texto: str = f"{caminho.split('/')[1]} {etapa['segundos']:.3f}s"
+        linhas: int | None = etapa["linhas_entrada"] or etapa["linhas_saida"]
+        if linhas and etapa["segundos"] > 0:
+            texto += f" ({linhas / etapa['segundos']:.0f} linhas/s)"
+        if etapa["pico_rss_mb"] is not None:
+            texto += f" [pico {etapa['pico_rss_mb']:.0f} MB, {etapa['delta_rss_mb']:+.0f} MB]"
+        partes.append(texto)
+    return ", ".join(partes)
+
+
+def medir_escala(n_meses: int, pasta_temp: str) -> dict[str, float]:
+    """Gera `n_meses` de extratos, audita em cada modo e devolve a vazão por modo."""
+    rotulo: str = descrever_escala(n_meses)
+    pasta_dados: str = os.path.join(pasta_temp, f"dados_{n_meses}")
+
+    inicio: float = time.perf_counter()
+    arquivos: list[str] = gerar_pasta_cpgf(pasta_dados, n_meses, linhas_por_mes=LINHAS_POR_MES)
+    tamanho_mb: float = sum(os.path.getsize(a) for a in arquivos) / 1024**2
+    registrar_medicao(
+        f"GERAÇÃO {rotulo}",
+        f"{len(arquivos)} arquivo(s) latin1, {tamanho_mb:.0f} MB | {time.perf_counter() - inicio:.1f}s",
+    )
+
+    vazoes: dict[str, float] = {}
+    pastas_resultado: dict[str, str] = {}
+    for modo in MODOS_BENCHMARK:
+        pastas_resultado[modo] = os.path.join(pasta_temp, f"resultados_{n_meses}_{modo}")
+        # Processo novo por rodada: o pico de RSS do relatório é só desta execução.
+        relatorio: dict = medir_em_processo_isolado(
+            auditar_e_ler_relatorio, pasta_dados, pastas_resultado[modo], modo
+        )
+        vazoes[modo] = relatorio["linhas"] / relatorio["total_segundos"]
+        registrar_medicao(
+            f"{rotulo.upper()} / {modo}",
+            f"{relatorio['linhas']} linhas | {relatorio['total_segundos']:.3f}s"
+            f" ({vazoes[modo]:.0f} linhas/s) | pico de RSS: {relatorio['pico_rss_processo_mb']:.0f} MB"
+            f" | {resumir_etapas(relatorio)}",
+        )
+
+    divergentes: list[str] = []
+    for modo, pasta in pastas_resultado.items():
+        nomes: list[str] = sorted(n for n in os.listdir(pastas_resultado["memoria"]) if n.endswith(".csv"))
+        _, diferentes, ausentes = filecmp.cmpfiles(pastas_resultado["memoria"], pasta, nomes, shallow=False)
+        divergentes += [f"{modo}: {n}" for n in diferentes + ausentes]
+    registrar_medicao(
+        f"SAÍDAS {rotulo}",
+        "CSVs idênticos em todos os modos" if not divergentes else f"DIVERGÊNCIAS {divergentes}",
+    )
+
+    shutil.rmtree(pasta_dados)
+    return vazoes
+
+
+def rodar_benchmark_escala() -> None:
+    inicializar_log_benchmark()
+    print("📈 Iniciando benchmark de escala com dados sintéticos...")
+
+    vazoes: dict[int, dict[str, float]] = {}
+    with tempfile.TemporaryDirectory() as pasta_temp:
+        for n_meses in ESCALAS_MESES:
+            vazoes[n_meses] = medir_escala(n_meses, pasta_temp)
+
+    # Vazão estável (ou crescente) ao longo das escalas indica custo linear.
+    for modo in MODOS_BENCHMARK:
+        registrar_medicao(
+            f"ESCALABILIDADE {modo}",
+            " -> ".join(
+                f"{descrever_escala(n)}: {vazoes[n][modo]:.0f} linhas/s" for n in ESCALAS_MESES
+            ),
+        )
+
+    print("🏁 Benchmark de escala finalizado.")
+    print("📄 O arquivo 'auditoria_benchmark_escala.log' foi gerado com os resultados.")
+
+
+if __name__ == "__main__":
+    rodar_benchmark_escala()
@@ -3,25 +3,41 @@ import json
 from datetime import datetime
 import requests
 
+from artefatos_log import gravar_json_compactado
 
-def registrar_log(mensagem: str, dados_brutos: dict | None = None) -> None:
-    """Grava o resultado do teste e o dump dos dados extraídos no arquivo de log."""
+ARQUIVO_LOG: str = os.path.join(os.path.dirname(__file__), "../logs/auditoria_confidencialidade.log")
+# Os dumps brutos ficam fora do log, em artefatos gzip com rotação por tamanho.
+PASTA_ARTEFATOS: str = os.path.join(os.path.dirname(__file__), "../logs/artefatos")
+PREFIXO_ARTEFATO: str = "dados_brutos_confidencialidade"
+MENSAGEM_INICIO: str = "--- INÍCIO DO TESTE DE EXTRAÇÃO BRUTA DE DADOS ---"
+MENSAGEM_FIM: str = "--- FIM DO TESTE DE EXTRAÇÃO BRUTA DE DADOS ---\n"
+
+
+def formatar_log(
+    mensagem: str, dados_brutos: dict | None = None, pasta_artefatos: str = PASTA_ARTEFATOS
+) -> str:
+    """
+    Monta o trecho do log com o resultado do teste.
+
+    Os dados extraídos vão para um artefato gzip em `pasta_artefatos`; o log
+    guarda só o ponteiro (arquivo, posição, tamanho e SHA-256 do JSON).
+    """
     data_hora: str = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-    linha_log: str = f"[{data_hora}] {mensagem}\n"
+    texto: str = f"[{data_hora}] {mensagem}\n"
+    if dados_brutos:
+        ponteiro = gravar_json_compactado(dados_brutos, pasta_artefatos, PREFIXO_ARTEFATO)
+        texto += f"[DADOS BRUTOS EXTRAÍDOS VIA API INTERNA]: {ponteiro}\n"
+    return texto
 
-    log_path = os.path.join(os.path.dirname(__file__), "../logs/auditoria_confidencialidade.log")
-    with open(log_path, mode="a", encoding="utf-8") as f:
-        f.write(linha_log)
-        if dados_brutos:
-            f.write("[DADOS BRUTOS EXTRAÍDOS VIA API INTERNA]:\n")
-            f.write(json.dumps(dados_brutos, indent=4, ensure_ascii=False))
-            f.write("\n")
 
+def registrar_log(mensagem: str, dados_brutos: dict | None = None) -> None:
+    """Grava o resultado do teste e o dump dos dados extraídos no arquivo de log."""
+    with open(ARQUIVO_LOG, mode="a", encoding="utf-8") as f:
+        f.write(formatar_log(mensagem, dados_brutos))
 
-def testar_extracao_bruta_airtable() -> None:
-    print("[TESTE 1 - EXTRAÇÃO BRUTA] Acessando API interna do painel...")
-    registrar_log("--- INÍCIO DO TESTE DE EXTRAÇÃO BRUTA DE DADOS ---")
 
+def montar_requisicao() -> dict:
+    """Requisição anônima à API interna do painel público (argumentos de `requests.request`)."""
     # URL interna de dados correspondente à aplicação pública informada
     url_api_interna: str = (
         "https://airtable.com/v0.3/application/appjku7kXHQcVCcXM/read"
@@ -40,55 +56,70 @@ def testar_extracao_bruta_airtable() -> None:
     params: dict[str, str] = {
         "stringifiedObjectIdsToRead": '["pagi1gIG0RYr1R3HO"]',
     }
+    return {"method": "GET", "url": url_api_interna, "headers": headers, "params": params, "timeout": 15}
+
+
+def avaliar_resposta(status_code: int, corpo: str) -> tuple[str, str, list[tuple]]:
+    """
+    Classifica a resposta da API interna.
+
+    Devolve a situação (APROVADO, REPROVADO ou ALERTA), a mensagem principal
+    e os argumentos de cada linha a registrar com `registrar_log`.
+    """
+    if status_code != 200:
+        msg_bloqueio: str = (
+            "✅ SUCESSO: O Airtable barrou a requisição direta à API"
+            f" interna. Status HTTP: {status_code}"
+        )
+        return "APROVADO", msg_bloqueio, [(msg_bloqueio,)]
 
     try:
-        resposta = requests.get(
-            url_api_interna, headers=headers, params=params, timeout=15
+        dados_json: dict = json.loads(corpo)
+    except ValueError:
+        dados_json = {}
+
+    # Verifica se a resposta contém a estrutura de dados esperada
+    if "data" in dados_json or "dataByObjectId" in dados_json:
+        msg_sucesso: str = (
+            "❌ CRÍTICO - FALHA GRAVE DE CONFIDENCIALIDADE: O endpoint da"
+            " API interna está totalmente exposto de forma pública."
+            " Os dados estruturados foram capturados integralmente sem"
+            " autenticação."
         )
+        # Salva o JSON completo com todas as linhas, colunas e valores originais
+        return "REPROVADO", msg_sucesso, [(msg_sucesso, dados_json)]
+
+    msg_estrutura_mudou: str = (
+        "⚠️ ALERTA: A requisição retornou sucesso (200), mas a"
+        " estrutura do JSON difere do esperado. Verifique o log."
+    )
+    return "ALERTA", msg_estrutura_mudou, [(msg_estrutura_mudou, dados_json or None)]
 
-        if resposta.status_code == 200:
-            dados_json: dict = resposta.json()
-
-            # Verifica se a resposta contém a estrutura de dados esperada
-            if "data" in dados_json or "dataByObjectId" in dados_json:
-                msg_sucesso: str = (
-                    "❌ CRÍTICO - FALHA GRAVE DE CONFIDENCIALIDADE: O endpoint da"
-                    " API interna está totalmente exposto de forma pública."
-                    " Os dados estruturados foram capturados integralmente sem"
-                    " autenticação."
-                )
-                print(msg_sucesso)
-                print(
-                    "[INFO] Dados obtidos com sucesso. Gravando cópia integral"
-                    " no log..."
-                )
-
-                # Salva o JSON completo com todas as linhas, colunas e valores originais
-                registrar_log(msg_sucesso, dados_brutos=dados_json)
-            else:
-                msg_estrutura_mudou: str = (
-                    "⚠️ ALERTA: A requisição retornou sucesso (200), mas a"
-                    " estrutura do JSON difere do esperado. Verifique o log."
-                )
-                print(msg_estrutura_mudou)
-                registrar_log(msg_estrutura_mudou, dados_brutos=dados_json)
-
-        else:
-            msg_bloqueio: str = (
-                "✅ SUCESSO: O Airtable barrou a requisição direta à API"
-                f" interna. Status HTTP: {resposta.status_code}"
+
+def testar_extracao_bruta_airtable() -> None:
+    print("[TESTE 1 - EXTRAÇÃO BRUTA] Acessando API interna do painel...")
+    registrar_log(MENSAGEM_INICIO)
+
+    try:
+        resposta = requests.request(**montar_requisicao())
+        situacao, mensagem, registros = avaliar_resposta(resposta.status_code, resposta.text)
+        print(mensagem)
+        if situacao == "REPROVADO":
+            print(
+                "[INFO] Dados obtidos com sucesso. Gravando cópia integral"
+                " no log..."
             )
-            print(msg_bloqueio)
-            registrar_log(msg_bloqueio)
+        for registro in registros:
+            registrar_log(*registro)
 
     except requests.exceptions.RequestException as e:
         msg_erro: str = f"❌ ERRO EXCEÇÃO DE CONEXÃO: {e}"
         print(msg_erro)
         registrar_log(msg_erro)
 
-    registrar_log("--- FIM DO TESTE DE EXTRAÇÃO BRUTA DE DADOS ---\n")
+    registrar_log(MENSAGEM_FIM)
     print("[INFO] Processo finalizado. Verifique o arquivo 'auditoria_confidencialidade.log'.")
 
 
 if __name__ == "__main__":
-    testar_extracao_bruta_airtable()
\ No newline at end of file
+    testar_extracao_bruta_airtable()
@@ -0,0 +1,339 @@
+import csv
+import os
+import numpy as np
+import pandas as pd
+
+import sys
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../../extracao_dados_dashboard')))
+# pyrefly: ignore [missing-import]
+from calendario_feriados import CalendarioFeriados
+
+# =========================================================================
+# PERFIL DOS DADOS REAIS (dados_brutos, 2025-01 a 2026-05, 147.291 linhas)
+# =========================================================================
+COLUNAS_CPGF_ORIGINAIS: list[str] = [
+    "CÓDIGO ÓRGÃO SUPERIOR", "NOME ÓRGÃO SUPERIOR", "CÓDIGO ÓRGÃO", "NOME ÓRGÃO",
+    "CÓDIGO UNIDADE GESTORA", "NOME UNIDADE GESTORA", "ANO EXTRATO", "MÊS EXTRATO",
+    "CPF PORTADOR", "NOME PORTADOR", "CNPJ OU CPF FAVORECIDO", "NOME FAVORECIDO",
+    "TRANSAÇÃO", "DATA TRANSAÇÃO", "VALOR TRANSAÇÃO",
+]
+
+LINHAS_POR_MES: int = 10_500
+
+# Proporção de cada tipo de lançamento.
+PROPORCAO_SIGILOSO: float = 0.22
+PROPORCAO_SAQUE: float = 0.10
+PROPORCAO_SEM_FAVORECIDO: float = 0.055  # compras com favorecido "-1"
+
+TRANSACOES_COMPRA: dict[str, float] = {
+    "COMPRA A/V - R$ - APRES": 0.983,
+    "COMPRA A/V - INT$ - APRES": 0.016,
+    "CPP LOJISTA TRF P/FATURA - REAL": 0.001,
+}
+TRANSACOES_SAQUE: dict[str, float] = {
+    "SAQUE CASH/ATM BB": 0.963,
+    "SAQUE - INT$ - APRES": 0.036,
+    "SAQUE MANUAL-CARTOES BB NA AGENCIA": 0.001,
+}
+TRANSACAO_SIGILOSA: str = "Informações protegidas por sigilo"
+
+# Compras: log-normal ajustada às compras reais (mediana ~R$ 250).
+MEDIA_LOG_COMPRA: float = 5.50
+DESVIO_LOG_COMPRA: float = 1.34
+# Saques e gastos sigilosos: valores redondos, com R$ 1.000,00 dominante.
+VALORES_REDONDOS: np.ndarray = np.array([100, 200, 300, 400, 500, 600, 700, 800, 900, 1000], dtype=float)
+PESOS_SAQUE: np.ndarray = np.array([6, 7, 6, 5, 8, 7, 5, 4, 4, 38], dtype=float)
+PROPORCAO_SIGILOSO_MIL: float = 0.83
+
+# Segunda a domingo; fins de semana e feriados são raros.
+PESOS_DIA_SEMANA: np.ndarray = np.array([0.169, 0.193, 0.200, 0.202, 0.193, 0.030, 0.013])
+# A transação aparece no extrato 1 mês (87%) ou 2 meses (13%) depois.
+PESOS_DEFASAGEM: dict[int, float] = {1: 0.87, 2: 0.13}
+
+# Padrões de risco injetados para exercitar R2 e R5 com volume.
+PROPORCAO_FRACIONAMENTO: float = 0.006
+PROPORCAO_DUPLICADA: float = 0.01
+
+PRENOMES: list[str] = [
+    "ANA", "ANTONIO", "CARLOS", "CLAUDIA", "DANIEL", "EDUARDO", "FERNANDA", "FRANCISCO",
+    "GABRIEL", "HELENA", "JOAO", "JOSE", "JULIANA", "LUCAS", "LUIZ", "MARCOS", "MARIA",
+    "MARIANA", "PAULO", "PATRICIA", "PEDRO", "RAFAEL", "RENATA", "RICARDO", "ROBERTO",
+    "SANDRA", "SERGIO", "TATIANA", "VANESSA", "VIVIANE",
+]
+SOBRENOMES: list[str] = [
+    "ALMEIDA", "ALVES", "ARAUJO", "BARBOSA", "CARDOSO", "CARVALHO", "CASTRO", "CORREA",
+    "COSTA", "DIAS", "FERNANDES", "FERREIRA", "GOMES", "LIMA", "LOPES", "MARTINS",
+    "MELO", "MENDES", "MOREIRA", "NASCIMENTO", "OLIVEIRA", "PEREIRA", "PINTO", "RAMOS",
+    "RIBEIRO", "ROCHA", "RODRIGUES", "SANTOS", "SILVA", "SOUZA", "TEIXEIRA", "VIEIRA",
+]
+RAMOS_FORNECEDOR: list[str] = [
+    "AUTO POSTO", "COMERCIAL", "DISTRIBUIDORA", "FARMACIA", "FERRAGENS", "HOTEL",
+    "MATERIAIS DE CONSTRUCAO", "MERCADO", "PAPELARIA", "RESTAURANTE", "SUPERMERCADO",
+    "TRANSPORTES", "AUTO PECAS", "INFORMATICA", "GRAFICA",
+]
+SUFIXOS_FORNECEDOR: list[str] = ["LTDA", "EIRELI", "ME", "S/A", "COMERCIO E SERVICOS LTDA"]
+
+
+def escolher(rng: np.random.Generator, opcoes: dict[str, float], n: int) -> np.ndarray:
+    """Sorteia `n` chaves de `opcoes` com as probabilidades dos valores."""
+    pesos: np.ndarray = np.array(list(opcoes.values()))
+    return np.array(list(opcoes))[rng.choice(len(opcoes), n, p=pesos / pesos.sum())]
+
+
+def digitos(rng: np.random.Generator, n: int, tamanho: int) -> np.ndarray:
+    """Textos numéricos aleatórios de `tamanho` dígitos (zeros à esquerda inclusos)."""
+    return np.array([f"{x:0{tamanho}d}" for x in rng.integers(0, 10**tamanho, n, dtype=np.int64)])
+
+
+def nomes_compostos(rng: np.random.Generator, n: int, *partes: list[str]) -> np.ndarray:
+    """`n` nomes formados sorteando uma palavra de cada lista de `partes`."""
+    sorteios: list[np.ndarray] = [np.array(lista)[rng.integers(0, len(lista), n)] for lista in partes]
+    return np.array([" ".join(palavras) for palavras in zip(*sorteios)])
+
+
+def pesos_zipf(n: int, expoente: float) -> np.ndarray:
+    """Pesos de cauda longa: poucos itens concentram boa parte dos sorteios."""
+    pesos: np.ndarray = 1 / np.arange(1, n + 1) ** expoente
+    return pesos / pesos.sum()
+
+
+class GeradorCPGF:
+    """
+    Gera extratos mensais sintéticos do CPGF com o esquema dos arquivos reais.
+
+    O cadastro (órgãos, unidades gestoras, portadores e fornecedores) é
+    sorteado uma vez a partir da `semente`, então meses gerados pelo mesmo
+    gerador compartilham portadores e fornecedores, como na série real. Os
+    arquivos saem em latin1, separados por ";", com todos os campos entre
+    aspas e quebras de linha CRLF, como os do Portal da Transparência.
+    """
+
+    def __init__(
+        self,
+        semente: int = 42,
+        n_orgaos: int = 190,
+        n_unidades: int = 1_200,
+        n_portadores: int = 6_000,
+        n_fornecedores: int = 60_000,
+    ) -> None:
+        self.rng: np.random.Generator = np.random.default_rng(semente)
+        rng: np.random.Generator = self.rng
+
+        # Hierarquia órgão superior -> órgão -> unidade gestora.
+        n_superiores: int = max(1, n_orgaos // 6)
+        superior_do_orgao: np.ndarray = rng.integers(0, n_superiores, n_orgaos)
+        self.orgaos: pd.DataFrame = pd.DataFrame({
+            "CÓDIGO ÓRGÃO SUPERIOR": (20000 + superior_do_orgao * 1000).astype(str),
+            "NOME ÓRGÃO SUPERIOR": [f"Ministério da Área Temática {s:02d}" for s in superior_do_orgao],
+            "CÓDIGO ÓRGÃO": (20000 + superior_do_orgao * 1000 + np.arange(n_orgaos) % 1000 + 1).astype(str),
+            "NOME ÓRGÃO": [f"Órgão de Gestão Pública nº {o:03d}" for o in range(n_orgaos)],
+        })
+        orgao_da_unidade: np.ndarray = np.sort(rng.choice(n_orgaos, n_unidades, p=pesos_zipf(n_orgaos, 1.1)))
+        self.unidades: pd.DataFrame = pd.DataFrame({
+            "ORGAO": orgao_da_unidade,
+            "CÓDIGO UNIDADE GESTORA": (110000 + np.arange(n_unidades)).astype(str),
+            "NOME UNIDADE GESTORA": [f"UNIDADE GESTORA REGIONAL {u:04d}" for u in range(n_unidades)],
+        })
+
+        # Portadores: cada um lotado numa unidade, com atividade de cauda longa.
+        self.portadores: pd.DataFrame = pd.DataFrame({
+            "UNIDADE": rng.choice(n_unidades, n_portadores, p=pesos_zipf(n_unidades, 0.9)),
+            "CPF PORTADOR": [f"***.{a}.{b}-**" for a, b in zip(digitos(rng, n_portadores, 3), digitos(rng, n_portadores, 3))],
+            "NOME PORTADOR": nomes_compostos(rng, n_portadores, PRENOMES, SOBRENOMES, SOBRENOMES),
+        })
+        self.pesos_portador: np.ndarray = rng.lognormal(0.0, 1.2, n_portadores)
+        self.pesos_portador /= self.pesos_portador.sum()
+
+        # Fornecedores: CNPJ de 14 dígitos e ~6% pessoas físicas (CPF de 11).
+        pessoa_fisica: np.ndarray = rng.random(n_fornecedores) < 0.06
+        self.fornecedores: pd.DataFrame = pd.DataFrame({
+            "CNPJ OU CPF FAVORECIDO": np.where(
+                pessoa_fisica, digitos(rng, n_fornecedores, 11), digitos(rng, n_fornecedores, 14)
+            ),
+            "NOME FAVORECIDO": np.where(
+                pessoa_fisica,
+                nomes_compostos(rng, n_fornecedores, PRENOMES, SOBRENOMES, SOBRENOMES),
+                nomes_compostos(rng, n_fornecedores, RAMOS_FORNECEDOR, SOBRENOMES, SUFIXOS_FORNECEDOR),
+            ),
+        })
+        self.pesos_fornecedor: np.ndarray = pesos_zipf(n_fornecedores, 1.0)
+
+        # Só alguns órgãos (polícias, presidência) têm gastos sigilosos.
+        self.orgaos_sigilosos: np.ndarray = rng.choice(n_orgaos, max(1, n_orgaos // 25), replace=False)
+
+    def datas_do_mes(self, ano: int, mes: int, n: int) -> np.ndarray:
+        """Datas (datetime64[D]) do mês sorteadas com o peso de cada dia da semana."""
+        inicio: np.datetime64 = np.datetime64(f"{ano:04d}-{mes:02d}", "M").astype("datetime64[D]")
+        fim: np.datetime64 = (np.datetime64(f"{ano:04d}-{mes:02d}", "M") + 1).astype("datetime64[D]")
+        dias: np.ndarray = np.arange(inicio, fim)
+        # 1970-01-01 foi uma quinta-feira (3, com segunda = 0).
+        pesos: np.ndarray = PESOS_DIA_SEMANA[(dias.view(np.int64) + 3) % 7]
+        # Feriados recebem o peso do domingo.
+        pesos[np.isin(dias, CalendarioFeriados(ano, ano).datas())] = PESOS_DIA_SEMANA[6]
+        return dias[self.rng.choice(len(dias), n, p=pesos / pesos.sum())]
+
+    def gerar_mes(self, ano: int, mes: int, n_linhas: int = LINHAS_POR_MES) -> pd.DataFrame:
+        """Extrato sintético de `ano`/`mes` com `n_linhas` lançamentos, tudo como texto."""
+        rng: np.random.Generator = self.rng
+        n_fracionadas: int = int(n_linhas * PROPORCAO_FRACIONAMENTO)
+        n_duplicadas: int = int(n_linhas * PROPORCAO_DUPLICADA)
+        n_base: int = n_linhas - 2 * n_fracionadas - n_duplicadas
+
+        tipo: np.ndarray = rng.choice(
+            3, n_base, p=[PROPORCAO_SIGILOSO, PROPORCAO_SAQUE, 1 - PROPORCAO_SIGILOSO - PROPORCAO_SAQUE]
+        )
+        sigiloso: np.ndarray = tipo == 0
+        saque: np.ndarray = tipo == 1
+        compra: np.ndarray = tipo == 2
+
+        portador: np.ndarray = rng.choice(len(self.portadores), n_base, p=self.pesos_portador)
+        unidade: np.ndarray = self.portadores["UNIDADE"].to_numpy()[portador]
+        # Gastos sigilosos ficam nas unidades dos órgãos com sigilo.
+        unidades_sigilosas: np.ndarray = np.flatnonzero(
+            np.isin(self.unidades["ORGAO"].to_numpy(), self.orgaos_sigilosos)
+        )
+        unidade[sigiloso] = rng.choice(unidades_sigilosas, sigiloso.sum())
+        orgao: np.ndarray = self.unidades["ORGAO"].to_numpy()[unidade]
+
+        # Datas: mês do extrato menos 1 ou 2 meses; sigilosos vêm sem data.
+        defasagem: np.ndarray = rng.choice(list(PESOS_DEFASAGEM), n_base, p=list(PESOS_DEFASAGEM.values()))
+        datas: np.ndarray = np.full(n_base, np.datetime64("NaT"), dtype="datetime64[D]")
+        for meses_antes in PESOS_DEFASAGEM:
+            periodo: pd.Period = pd.Period(year=ano, month=mes, freq="M") - meses_antes
+            alvo: np.ndarray = (defasagem == meses_antes) & ~sigiloso
+            datas[alvo] = self.datas_do_mes(periodo.year, periodo.month, alvo.sum())
+
+        valores: np.ndarray = np.round(rng.lognormal(MEDIA_LOG_COMPRA, DESVIO_LOG_COMPRA, n_base), 2)
+        # Parte das compras tem valor inteiro, como nos extratos reais.
+        inteiros: np.ndarray = rng.random(n_base) < 0.25
+        valores[inteiros] = np.maximum(np.round(valores[inteiros]), 1.0)
+        valores[saque] = rng.choice(VALORES_REDONDOS, saque.sum(), p=PESOS_SAQUE / PESOS_SAQUE.sum())
+        valores[sigiloso] = np.where(
+            rng.random(sigiloso.sum()) < PROPORCAO_SIGILOSO_MIL, 1000.0, valores[sigiloso]
+        )
+        valores = np.clip(valores, 0.06, 80_000.0)
+
+        fornecedor: np.ndarray = rng.choice(len(self.fornecedores), n_base, p=self.pesos_fornecedor)
+        transacao: np.ndarray = np.empty(n_base, dtype=object)
+        transacao[compra] = escolher(rng, TRANSACOES_COMPRA, compra.sum())
+        transacao[saque] = escolher(rng, TRANSACOES_SAQUE, saque.sum())
+        transacao[sigiloso] = TRANSACAO_SIGILOSA
+
+        cnpj: np.ndarray = self.fornecedores["CNPJ OU CPF FAVORECIDO"].to_numpy()[fornecedor].astype(object)
+        nome_favorecido: np.ndarray = self.fornecedores["NOME FAVORECIDO"].to_numpy()[fornecedor].astype(object)
+        sem_favorecido: np.ndarray = compra & (
+            (rng.random(n_base) < PROPORCAO_SEM_FAVORECIDO) | (transacao == "COMPRA A/V - INT$ - APRES")
+        )
+        cnpj[sem_favorecido], nome_favorecido[sem_favorecido] = "-1", "SEM INFORMACAO"
+        cnpj[saque], nome_favorecido[saque] = "-2", "NAO SE APLICA"
+        cnpj[sigiloso], nome_favorecido[sigiloso] = "-11", "Sigiloso"
+
+        df: pd.DataFrame = pd.DataFrame({
+            "ORGAO": orgao,
+            "UNIDADE": unidade,
+            "PORTADOR": portador,
+            "SIGILOSO": sigiloso,
+            "CNPJ OU CPF FAVORECIDO": cnpj,
+            "NOME FAVORECIDO": nome_favorecido,
+            "TRANSAÇÃO": transacao,
+            "DATA": datas,
+            "VALOR": valores,
+        })
+        df = pd.concat(
+            [df, self._fracionamentos(df, n_fracionadas), self._duplicadas(df, n_duplicadas)],
+            ignore_index=True,
+        )
+        return self._formatar(df, ano, mes)
+
+    def _fracionamentos(self, df: pd.DataFrame, n: int) -> pd.DataFrame:
+        """Para `n` compras, duas compras extras do mesmo portador em até 2 dias (R2)."""
+        compras: np.ndarray = np.flatnonzero(
+            df["TRANSAÇÃO"].str.startswith("COMPRA").to_numpy() & df["DATA"].notna().to_numpy()
+        )
+        if n == 0 or len(compras) == 0:
+            return df.iloc[:0]
+        origem: np.ndarray = self.rng.choice(compras, n, replace=False)
+        extras: pd.DataFrame = df.iloc[np.repeat(origem, 2)].copy()
+        extras["DATA"] = extras["DATA"] + pd.to_timedelta(self.rng.integers(0, 3, len(extras)), unit="D")
+        # Três parcelas que somam mais de R$ 5.000,00 (a original mantém seu valor).
+        extras["VALOR"] = np.round(self.rng.uniform(2_000, 3_500, len(extras)), 2)
+        return extras
+
+    def _duplicadas(self, df: pd.DataFrame, n: int) -> pd.DataFrame:
+        """Cópias exatas (data, valor e favorecido) de `n` lançamentos (R5)."""
+        if n == 0:
+            return df.iloc[:0]
+        return df.iloc[self.rng.choice(len(df), n, replace=False)].copy()
+
+    def _formatar(self, df: pd.DataFrame, ano: int, mes: int) -> pd.DataFrame:
+        """Converte os sorteios para o texto exato dos CSVs do Portal."""
+        unidades: pd.DataFrame = self.unidades.iloc[df["UNIDADE"].to_numpy()].reset_index(drop=True)
+        orgaos: pd.DataFrame = self.orgaos.iloc[df["ORGAO"].to_numpy()].reset_index(drop=True)
+        portadores: pd.DataFrame = self.portadores.iloc[df["PORTADOR"].to_numpy()].reset_index(drop=True)
+        sigiloso: np.ndarray = df["SIGILOSO"].to_numpy()
+
+        saida: pd.DataFrame = pd.concat([orgaos, unidades.drop(columns="ORGAO")], axis=1)
+        saida["ANO EXTRATO"] = f"{ano:04d}"
+        saida["MÊS EXTRATO"] = f"{mes:02d}"
+        saida["CPF PORTADOR"] = np.where(sigiloso, "", portadores["CPF PORTADOR"])
+        saida["NOME PORTADOR"] = np.where(sigiloso, "Sigiloso", portadores["NOME PORTADOR"])
+        saida["CNPJ OU CPF FAVORECIDO"] = df["CNPJ OU CPF FAVORECIDO"].to_numpy()
+        saida["NOME FAVORECIDO"] = df["NOME FAVORECIDO"].to_numpy()
+        saida["TRANSAÇÃO"] = df["TRANSAÇÃO"].to_numpy()
+        saida["DATA TRANSAÇÃO"] = df["DATA"].dt.strftime("%d/%m/%Y").fillna("").to_numpy()
+        saida["VALOR TRANSAÇÃO"] = [f"{v:.2f}".replace(".", ",") for v in df["VALOR"].to_numpy()]
+
+        # Os extratos do Portal vêm agrupados por órgão e unidade gestora.
+        return saida.sort_values(
+            ["CÓDIGO ÓRGÃO SUPERIOR", "CÓDIGO ÓRGÃO", "CÓDIGO UNIDADE GESTORA"], kind="stable"
+        )[COLUNAS_CPGF_ORIGINAIS].reset_index(drop=True)
+
+    def gravar_mes(self, pasta: str, ano: int, mes: int, n_linhas: int = LINHAS_POR_MES) -> str:
+        """Grava `AAAAMM_CPGF.csv` em `pasta` e devolve o caminho."""
+        os.makedirs(pasta, exist_ok=True)
+        caminho: str = os.path.join(pasta, f"{ano:04d}{mes:02d}_CPGF.csv")
+        self.gerar_mes(ano, mes, n_linhas).to_csv(
+            caminho, sep=";", index=False, encoding="latin1",
+            quoting=csv.QUOTE_ALL, lineterminator="\r\n",
+        )
+        return caminho
+
+
+def gerar_pasta_cpgf(
+    pasta: str,
+    n_meses: int,
+    ano_inicial: int = 2016,
+    mes_inicial: int = 1,
+    linhas_por_mes: int = LINHAS_POR_MES,
+    semente: int = 42,
+) -> list[str]:
+    """
+    Gera `n_meses` extratos consecutivos a partir de `ano_inicial`/`mes_inicial`.
+
+    O número de linhas de cada mês varia ±20% em torno de `linhas_por_mes`,
+    como nos extratos reais. A mesma semente gera sempre os mesmos arquivos.
+    """
+    gerador: GeradorCPGF = GeradorCPGF(semente)
+    primeiro: pd.Period = pd.Period(year=ano_inicial, month=mes_inicial, freq="M")
+    arquivos: list[str] = []
+    for deslocamento in range(n_meses):
+        periodo: pd.Period = primeiro + deslocamento
+        n_linhas: int = int(linhas_por_mes * gerador.rng.uniform(0.8, 1.2))
+        arquivos.append(gerador.gravar_mes(pasta, periodo.year, periodo.month, n_linhas))
+    return arquivos
+
+
+def esvaziar_celulas(arquivo: str, passos: dict[str, int], codificacao: str = "latin1") -> None:
+    """
+    Apaga, no próprio CSV, uma a cada `passos[coluna]` células de cada coluna.
+
+    Os extratos do Portal podem trazer CNPJ ou valor em branco; as células
+    vazias mudam a inferência de tipos do leitor (ex.: CNPJ numérico vira float).
+    """
+    df: pd.DataFrame = pd.read_csv(arquivo, sep=";", dtype=str, keep_default_na=False, encoding=codificacao)
+    for coluna, passo in passos.items():
+        df.loc[df.index % passo == 0, coluna] = ""
+    df.to_csv(
+        arquivo, sep=";", index=False, encoding=codificacao,
+        quoting=csv.QUOTE_ALL, lineterminator="\r\n",
+    )
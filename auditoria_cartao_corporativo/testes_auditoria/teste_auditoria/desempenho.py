@@ -0,0 +1,263 @@
+import io
+import multiprocessing
+import os
+import resource
+import shutil
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from typing import Callable
+import pandas as pd
+
+import sys
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../../extracao_dados_dashboard')))
+# pyrefly: ignore [missing-import]
+import extraçao_dados
+# pyrefly: ignore [missing-import]
+from extraçao_dados import (
+    MOTOR_CSV, VARIAVEL_SAL_IDENTIFICADORES, carregar_pasta, concatenar_lotes, detectar_codificacao,
+    executar_auditoria_pasta, ler_arquivo_cpgf, mascarar_nome, mascarar_nomes, normalizar_cpgf,
+)
+# pyrefly: ignore [missing-import]
+from estruturas_incrementais import IndiceDuplicidade
+# pyrefly: ignore [missing-import]
+from regras_auditoria import (
+    REGRAS_AUDITORIA, mascara_dia_nao_util, mascara_dia_nao_util_texto, mascara_duplicidade,
+    mascara_fracionamento, mascara_fracionamento_agrupada,
+)
+
+PASTA_DADOS_REAIS: str = os.path.abspath(
+    os.path.join(os.path.dirname(__file__), "../../extracao_dados_dashboard/dados_brutos")
+)
+LOG_DESEMPENHO: str = os.path.join(os.path.dirname(__file__), "../logs/auditoria_desempenho.log")
+
+# Sal fixo dos testes: a auditoria não publica identificadores sem sal.
+os.environ.setdefault(VARIAVEL_SAL_IDENTIFICADORES, "sal-dos-testes")
+
+
+def inicializar_log_desempenho() -> None:
+    """Cria ou limpa o arquivo de log no início da bateria de medições."""
+    with open(LOG_DESEMPENHO, mode="w", encoding="utf-8") as f:
+        data_hora: str = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        f.write("========================================================\n")
+        f.write(" BENCHMARK DE DESEMPENHO - PIPELINE DE EXTRAÇÃO\n")
+        f.write(f" Data de Execução: {data_hora}\n")
+        f.write("========================================================\n\n")
+
+
+def registrar_medicao(nome_medicao: str, detalhe: str) -> None:
+    """Salva o resultado individual de cada medição no log de desempenho."""
+    data_hora: str = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    with open(LOG_DESEMPENHO, mode="a", encoding="utf-8") as f:
+        f.write(f"[{data_hora}] {nome_medicao}: {detalhe}\n")
+
+
+def cronometrar(funcao: Callable[[], object], repeticoes: int = 3) -> float:
+    """Executa a função algumas vezes e devolve o melhor tempo em segundos."""
+    melhor: float = float("inf")
+    for _ in range(repeticoes):
+        inicio: float = time.perf_counter()
+        funcao()
+        melhor = min(melhor, time.perf_counter() - inicio)
+    return melhor
+
+
+def medir_em_processo_isolado(funcao: Callable, *args) -> tuple:
+    """Roda a função num processo novo (spawn) para que o pico de RSS seja só dela."""
+    contexto = multiprocessing.get_context("spawn")
+    with ProcessPoolExecutor(max_workers=1, mp_context=contexto) as executor:
+        return executor.submit(funcao, *args).result()
+
+
+def rss_apos_aquecimento_mb() -> float:
+    """Carrega o motor de CSV antes da medição para não contar as bibliotecas."""
+    pd.read_csv(io.StringIO("a;b\n1;2\n"), sep=";", engine=MOTOR_CSV)
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def carga_completa_texto(arquivos: list[str]) -> tuple[int, float, float]:
+    """Carga original: 15 colunas como texto, concatenação e normalização."""
+    rss_inicial_mb: float = rss_apos_aquecimento_mb()
+    lotes: list[pd.DataFrame] = [
+        pd.read_csv(arquivo, sep=";", encoding=detectar_codificacao(arquivo))
+        for arquivo in arquivos
+    ]
+    df: pd.DataFrame = normalizar_cpgf(pd.concat(lotes, ignore_index=True))
+    memoria_mb: float = df.memory_usage(deep=True).sum() / 1024**2
+    pico_rss_mb: float = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    return len(df), memoria_mb, pico_rss_mb - rss_inicial_mb
+
+
+def carga_esquema_tipado(arquivos: list[str]) -> tuple[int, float, float]:
+    """Carga com o leitor tipado: colunas podadas e texto categórico."""
+    rss_inicial_mb: float = rss_apos_aquecimento_mb()
+    df: pd.DataFrame = concatenar_lotes([ler_arquivo_cpgf(a) for a in arquivos])
+    memoria_mb: float = df.memory_usage(deep=True).sum() / 1024**2
+    pico_rss_mb: float = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    return len(df), memoria_mb, pico_rss_mb - rss_inicial_mb
+
+
+def carregar_pasta_tentativa_utf8(arquivos: list[str]) -> int:
+    """Carga original: tenta UTF-8 e, em caso de erro, reparseia em latin1."""
+    total: int = 0
+    for arquivo in arquivos:
+        try:
+            df: pd.DataFrame = pd.read_csv(arquivo, sep=";", encoding="utf-8")
+        except UnicodeDecodeError:
+            df = pd.read_csv(arquivo, sep=";", encoding="latin1")
+        total += len(df)
+    return total
+
+
+def carregar_pasta_codificacao_detectada(arquivos: list[str]) -> int:
+    """Carga com a codificação detectada previamente por varredura de bytes."""
+    extraçao_dados._CODIFICACOES_DETECTADAS.clear()
+    total: int = 0
+    for arquivo in arquivos:
+        df: pd.DataFrame = pd.read_csv(
+            arquivo, sep=";", encoding=detectar_codificacao(arquivo)
+        )
+        total += len(df)
+    return total
+
+
+def medir_deteccao_codificacao(arquivos: list[str]) -> None:
+    antes: float = cronometrar(lambda: carregar_pasta_tentativa_utf8(arquivos))
+    depois: float = cronometrar(lambda: carregar_pasta_codificacao_detectada(arquivos))
+    registrar_medicao(
+        "CARGA DA PASTA (CODIFICAÇÃO)",
+        f"{len(arquivos)} arquivos | tentativa UTF-8 + latin1: {antes:.3f}s"
+        f" | codificação detectada: {depois:.3f}s | ganho: {antes / depois:.2f}x",
+    )
+
+
+def medir_memoria_leitor_tipado(arquivos: list[str]) -> None:
+    linhas, memoria_antes, rss_antes = medir_em_processo_isolado(carga_completa_texto, arquivos)
+    _, memoria_depois, rss_depois = medir_em_processo_isolado(carga_esquema_tipado, arquivos)
+    registrar_medicao(
+        "MEMÓRIA DA CARGA (ESQUEMA TIPADO)",
+        f"{len(arquivos)} arquivos, {linhas} linhas | DataFrame: {memoria_antes:.1f} MB"
+        f" -> {memoria_depois:.1f} MB ({memoria_antes / memoria_depois:.1f}x)"
+        f" | pico RSS acima da base: {rss_antes:.1f} MB -> {rss_depois:.1f} MB"
+        f" ({rss_antes / rss_depois:.1f}x)",
+    )
+
+
+def medir_mascaramento(arquivos: list[str]) -> None:
+    df: pd.DataFrame = concatenar_lotes(carregar_pasta(arquivos))
+    nomes: pd.Series = pd.concat(
+        [df["NOME PORTADOR"], df["NOME FAVORECIDO"]], ignore_index=True
+    )
+    antes: float = cronometrar(lambda: nomes.apply(mascarar_nome))
+    depois: float = cronometrar(lambda: mascarar_nomes(nomes))
+    registrar_medicao(
+        "MASCARAMENTO DE NOMES",
+        f"{len(nomes)} nomes ({nomes.nunique()} distintos) | .apply(mascarar_nome):"
+        f" {antes:.3f}s | mascarar_nomes: {depois:.3f}s | ganho: {antes / depois:.1f}x",
+    )
+
+
+def medir_fracionamento(arquivos: list[str]) -> None:
+    df: pd.DataFrame = concatenar_lotes(carregar_pasta(arquivos))
+    limites: dict[str, float] = next(r.limites for r in REGRAS_AUDITORIA if r.codigo == "R2")
+    antes: float = cronometrar(lambda: mascara_fracionamento_agrupada(df, limites))
+    depois: float = cronometrar(lambda: mascara_fracionamento(df, limites))
+    registrar_medicao(
+        "REGRA R2 (FRACIONAMENTO)",
+        f"{len(df)} transações | groupby + rolling: {antes:.3f}s"
+        f" | ordenação estável + arrays deslocados: {depois:.3f}s | ganho: {antes / depois:.1f}x",
+    )
+
+
+def medir_dia_nao_util(arquivos: list[str]) -> None:
+    df: pd.DataFrame = concatenar_lotes(carregar_pasta(arquivos))
+    antes: float = cronometrar(lambda: mascara_dia_nao_util_texto(df, {}))
+    depois: float = cronometrar(lambda: mascara_dia_nao_util(df, {}))
+    registrar_medicao(
+        "REGRA R3 (DIAS NÃO ÚTEIS)",
+        f"{len(df)} transações | strftime + isin (só feriados fixos): {antes:.3f}s"
+        f" | consulta ao calendário (fixos + móveis): {depois:.3f}s | ganho: {antes / depois:.1f}x",
+    )
+
+
+def medir_duplicidade(arquivos: list[str]) -> None:
+    lotes: list[pd.DataFrame] = carregar_pasta(arquivos)
+    df: pd.DataFrame = concatenar_lotes(lotes)
+    chaves: list[str] = ["DATA_DT", "VALOR_NUM", "NOME FAVORECIDO"]
+    no_dia: float = cronometrar(lambda: df.duplicated(subset=chaves, keep=False))
+    janela: float = cronometrar(lambda: mascara_duplicidade(df, {"janela_dias": 3}))
+    registrar_medicao(
+        "REGRA R5 (DUPLICIDADE)",
+        f"{len(df)} transações | no mesmo dia, duplicated(keep=False): {no_dia:.3f}s"
+        f" | janela de 3 dias, chaves inteiras ordenadas: {janela:.3f}s",
+    )
+
+    # Índice do modo em fluxo: registra mês a mês em partições em disco e
+    # marca uma partição de cada vez.
+    inicio: float = time.perf_counter()
+    indice: IndiceDuplicidade = IndiceDuplicidade(n_particoes=4)
+    for lote in lotes:
+        indice.registrar(lote)
+    indice.mascara()
+    indice.fechar()
+    em_disco: float = time.perf_counter() - inicio
+    registrar_medicao(
+        "REGRA R5 (ÍNDICE EM DISCO)",
+        f"{len(lotes)} meses registrados em 4 partições"
+        f" | duplicated sobre tudo: {no_dia:.3f}s | IndiceDuplicidade.registrar + mascara: {em_disco:.3f}s",
+    )
+
+
+def medir_mes_novo_incremental(arquivos: list[str], meses_historico: int) -> None:
+    """Tempo para publicar as métricas quando chega um mês novo ao histórico."""
+    with tempfile.TemporaryDirectory() as pasta_temp:
+        pasta_dados: str = os.path.join(pasta_temp, "dados")
+        pasta_estado: str = os.path.join(pasta_temp, "estado")
+        pasta_resultados: str = os.path.join(pasta_temp, "resultados")
+        os.makedirs(pasta_dados)
+        for arquivo in arquivos[:meses_historico]:
+            shutil.copy2(arquivo, pasta_dados)
+        executar_auditoria_pasta(pasta_dados, pasta_resultados, modo="incremental", pasta_estado=pasta_estado)
+
+        shutil.copy2(arquivos[meses_historico], pasta_dados)
+        inicio: float = time.perf_counter()
+        executar_auditoria_pasta(pasta_dados, pasta_resultados, modo="incremental", pasta_estado=pasta_estado)
+        incremental: float = time.perf_counter() - inicio
+        completo: float = cronometrar(
+            lambda: executar_auditoria_pasta(pasta_dados, pasta_resultados), repeticoes=1
+        )
+
+    registrar_medicao(
+        "MÊS NOVO (MODO INCREMENTAL)",
+        f"{meses_historico} arquivos no histórico + 1 novo | recálculo completo: {completo:.3f}s"
+        f" | modo incremental: {incremental:.3f}s | ganho: {completo / incremental:.1f}x",
+    )
+
+
+def rodar_benchmarks() -> None:
+    inicializar_log_desempenho()
+    print("⏱️ Iniciando bateria de medições de desempenho...")
+
+    arquivos: list[str] = sorted(
+        os.path.join(PASTA_DADOS_REAIS, nome)
+        for nome in os.listdir(PASTA_DADOS_REAIS)
+        if nome.endswith(".csv")
+    )
+
+    medir_deteccao_codificacao(arquivos)
+    medir_memoria_leitor_tipado(arquivos[:12])
+    medir_mascaramento(arquivos)
+    medir_fracionamento(arquivos)
+    medir_dia_nao_util(arquivos)
+    medir_duplicidade(arquivos)
+    # O custo incremental deve ficar estável enquanto o histórico cresce.
+    medir_mes_novo_incremental(arquivos, len(arquivos) // 2)
+    medir_mes_novo_incremental(arquivos, len(arquivos) - 1)
+
+    print("🏁 Medições finalizadas.")
+    print("📄 O arquivo 'auditoria_desempenho.log' foi gerado com os resultados.")
+
+
+if __name__ == "__main__":
+    rodar_benchmarks()
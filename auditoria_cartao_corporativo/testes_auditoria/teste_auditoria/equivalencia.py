@@ -0,0 +1,552 @@
+import filecmp
+import json
+from datetime import date
+import importlib.util
+import os
+import shutil
+import tempfile
+from datetime import datetime
+import numpy as np
+import pandas as pd
+
+import sys
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../../extracao_dados_dashboard')))
+# pyrefly: ignore [missing-import]
+from extraçao_dados import (
+    COLUNAS_CPGF, VARIAVEL_SAL_IDENTIFICADORES, auditar_em_duckdb, auditar_em_memoria,
+    carregar_pasta, concatenar_lotes, detectar_codificacao, executar_auditoria_pasta,
+    ler_arquivo_cpgf, mascarar_nome, mascarar_nomes, montar_concentracao, normalizar_cpgf,
+)
+# pyrefly: ignore [missing-import]
+from instrumentacao import ARQUIVO_HISTORICO, ARQUIVO_PERFIL, ARQUIVO_RELATORIO
+# pyrefly: ignore [missing-import]
+from saida_colunar import ler_tabela_particionada
+# pyrefly: ignore [missing-import]
+from calendario_feriados import CalendarioFeriados, domingo_de_pascoa
+# pyrefly: ignore [missing-import]
+from estruturas_incrementais import IndiceDuplicidade, chaves_duplicidade, marcar_duplicidades
+# pyrefly: ignore [missing-import]
+from dados_sinteticos import esvaziar_celulas
+# pyrefly: ignore [missing-import]
+from regras_auditoria import (
+    CHAVES_ALERTAS, REGRAS_AUDITORIA, agregar_alertas, avaliar_regras,
+    mascara_dia_nao_util_texto, mascara_fracionamento,
+    mascara_fracionamento_agrupada, montar_alertas,
+)
+
+PASTA_DADOS_REAIS: str = os.path.abspath(
+    os.path.join(os.path.dirname(__file__), "../../extracao_dados_dashboard/dados_brutos")
+)
+LOG_EQUIVALENCIA: str = os.path.join(os.path.dirname(__file__), "../logs/auditoria_equivalencia.log")
+
+# Sal fixo dos testes: a auditoria não publica identificadores sem sal.
+os.environ.setdefault(VARIAVEL_SAL_IDENTIFICADORES, "sal-dos-testes")
+
+
+def inicializar_log_equivalencia() -> None:
+    """Cria ou limpa o arquivo de log no início da suite de equivalência."""
+    with open(LOG_EQUIVALENCIA, mode="w", encoding="utf-8") as f:
+        data_hora: str = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        f.write("========================================================\n")
+        f.write(" SUITE DE EQUIVALÊNCIA - OTIMIZAÇÕES DO PIPELINE\n")
+        f.write(f" Data de Execução: {data_hora}\n")
+        f.write("========================================================\n\n")
+
+
+def registrar_resultado_teste(nome_teste: str, status: str, detalhe: str) -> None:
+    """Salva o resultado individual de cada teste no log de equivalência."""
+    data_hora: str = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    with open(LOG_EQUIVALENCIA, mode="a", encoding="utf-8") as f:
+        f.write(f"[{data_hora}] [{status}] {nome_teste}: {detalhe}\n")
+
+
+def listar_arquivos_reais() -> list[str]:
+    """Lista os CSVs de dados_brutos em ordem de nome."""
+    return sorted(
+        os.path.join(PASTA_DADOS_REAIS, nome)
+        for nome in os.listdir(PASTA_DADOS_REAIS)
+        if nome.endswith(".csv")
+    )
+
+
+def carregar_dados_reais() -> pd.DataFrame:
+    """Carrega e normaliza todos os CSVs de dados_brutos, em ordem."""
+    return concatenar_lotes(carregar_pasta(listar_arquivos_reais()))
+
+
+def testar_mascaramento_vetorizado(df_reais: pd.DataFrame) -> None:
+    nome_teste: str = "TESTE 1 (Mascaramento Vetorizado)"
+
+    casos_limite: pd.Series = pd.Series([
+        None, np.nan, "", "   ", "JOAO", "  JOAO  ", "JOAO DA SILVA",
+        "JOAO  DA\tSILVA", "SIGILOSO - ORGAO X", "sigiloso", "SAQUE EM ESPÉCIE",
+        "despesa operacional / sigilosa", "Ana de Souza", 12345, "JOAO DA SILVA",
+    ], dtype=object)
+
+    colunas: list[pd.Series] = [casos_limite]
+    colunas += [df_reais[c] for c in ["NOME PORTADOR", "NOME FAVORECIDO"]]
+
+    divergencias: int = 0
+    total: int = 0
+    for serie in colunas:
+        esperado: pd.Series = serie.apply(mascarar_nome)
+        obtido: pd.Series = mascarar_nomes(serie)
+        divergencias += int((esperado.astype(object) != obtido.astype(object)).sum())
+        total += len(serie)
+
+    if divergencias == 0:
+        registrar_resultado_teste(nome_teste, "SUCESSO", f"{total} nomes mascarados de forma idêntica à versão linha a linha.")
+    else:
+        registrar_resultado_teste(nome_teste, "FALHA", f"{divergencias} de {total} nomes divergem da versão linha a linha.")
+
+
+def comparar_saidas(pasta_a: str, pasta_b: str) -> list[str]:
+    """Lista os CSVs publicados que não são idênticos byte a byte."""
+    nomes: list[str] = sorted(n for n in os.listdir(pasta_a) if n.endswith(".csv"))
+    _, diferentes, ausentes = filecmp.cmpfiles(pasta_a, pasta_b, nomes, shallow=False)
+    return diferentes + ausentes
+
+
+def resumo_ordenado(alertas: pd.DataFrame) -> pd.DataFrame:
+    """Alertas agregados em ordem canônica, com a regra como texto."""
+    return (
+        alertas.assign(REGRA=alertas["REGRA"].astype(str))
+        .sort_values(CHAVES_ALERTAS)
+        .reset_index(drop=True)
+    )
+
+
+def divergencias_estados(df_reais: pd.DataFrame, tamanho_bloco: int, n_particoes: int) -> dict[str, int]:
+    """
+    Compara, regra a regra, o estado incremental do modo em fluxo com a regra
+    avaliada sobre o DataFrame inteiro.
+
+    Nos dados reais as linhas sigilosas não têm data, então a R6 nunca
+    dispara; aqui elas recebem um ANO_MES fixo para que a soma por órgão seja
+    exercitada nos dois caminhos com a mesma entrada.
+    """
+    df: pd.DataFrame = df_reais.copy()
+    df["ANO_MES"] = df["ANO_MES"].fillna("SEM DATA")
+
+    divergencias: dict[str, int] = {}
+    for regra in [r for r in REGRAS_AUDITORIA if not r.por_transacao]:
+        esperado: pd.DataFrame = agregar_alertas(
+            montar_alertas(df, avaliar_regras(df, [regra]), [regra])
+        )
+        estado = regra.estado_incremental(regra.limites, n_particoes)
+        try:
+            for inicio in range(0, len(df), tamanho_bloco):
+                estado.registrar(df.iloc[inicio:inicio + tamanho_bloco])
+            parciais: list[pd.DataFrame] = list(estado.alertas(regra))
+        finally:
+            estado.fechar()
+        obtido: pd.DataFrame = (
+            pd.concat(parciais, ignore_index=True)
+            .groupby(CHAVES_ALERTAS, observed=True).sum().reset_index()
+        )
+        divergentes: bool = tabelas_divergentes(resumo_ordenado(esperado), resumo_ordenado(obtido))
+        divergencias[regra.codigo] = int(esperado["TRANSACOES"].sum()) if not divergentes else -1
+    return divergencias
+
+
+def testar_modo_fluxo(df_reais: pd.DataFrame) -> None:
+    nome_teste: str = "TESTE 2 (Modo em Fluxo x Memória)"
+
+    divergentes: dict[int, list[str]] = {}
+    with tempfile.TemporaryDirectory() as pasta_temp:
+        pasta_memoria: str = os.path.join(pasta_temp, "memoria")
+        executar_auditoria_pasta(PASTA_DADOS_REAIS, pasta_memoria)
+        # Blocos pequenos e de tamanho "quebrado" forçam vários cortes por
+        # arquivo; com várias partições, o estado da R2 e da R5 fica espalhado.
+        for n_particoes in [1, 7]:
+            pasta_fluxo: str = os.path.join(pasta_temp, f"fluxo_{n_particoes}")
+            executar_auditoria_pasta(
+                PASTA_DADOS_REAIS, pasta_fluxo, modo="fluxo", tamanho_bloco=7_777, n_particoes=n_particoes
+            )
+            divergentes[n_particoes] = comparar_saidas(pasta_memoria, pasta_fluxo)
+
+    # -1 marca a regra cujo estado incremental divergiu da avaliação completa.
+    ocorrencias_por_regra: dict[str, int] = divergencias_estados(df_reais, tamanho_bloco=9_973, n_particoes=5)
+
+    if not any(divergentes.values()) and min(ocorrencias_por_regra.values()) > 0:
+        registrar_resultado_teste(
+            nome_teste, "SUCESSO",
+            f"Os CSVs publicados pelo modo em fluxo (1 e 7 partições) são idênticos byte a byte aos do modo em memória; estados por regra idênticos à avaliação completa (ocorrências: {ocorrencias_por_regra}).",
+        )
+    else:
+        registrar_resultado_teste(
+            nome_teste, "FALHA",
+            f"Arquivos divergentes por número de partições: {divergentes}; ocorrências por regra (-1 = divergente): {ocorrencias_por_regra}",
+        )
+
+
+def tabelas_divergentes(esperado: pd.DataFrame, obtido: pd.DataFrame) -> bool:
+    """Compara duas tabelas agregadas ignorando apenas o tipo das colunas de texto."""
+    try:
+        pd.testing.assert_frame_equal(
+            esperado.reset_index(drop=True), obtido.reset_index(drop=True),
+            check_dtype=False, check_categorical=False,
+        )
+    except AssertionError:
+        return True
+    return False
+
+
+def testar_motor_duckdb(df_reais: pd.DataFrame) -> None:
+    nome_teste: str = "TESTE 3 (Motor DuckDB x Pandas)"
+
+    if importlib.util.find_spec("duckdb") is None:
+        registrar_resultado_teste(nome_teste, "IGNORADO", "DuckDB não está instalado neste ambiente.")
+        return
+
+    agregados_pandas = auditar_em_memoria(df_reais)
+    agregados_duckdb, total_linhas = auditar_em_duckdb(listar_arquivos_reais())
+    tabelas: list[str] = [
+        nome for nome in ["alertas", "fornecedor", "total"]
+        if tabelas_divergentes(getattr(agregados_pandas, nome), getattr(agregados_duckdb, nome))
+    ]
+
+    with tempfile.TemporaryDirectory() as pasta_temp:
+        pasta_memoria: str = os.path.join(pasta_temp, "memoria")
+        pasta_duckdb: str = os.path.join(pasta_temp, "duckdb")
+        executar_auditoria_pasta(PASTA_DADOS_REAIS, pasta_memoria)
+        executar_auditoria_pasta(PASTA_DADOS_REAIS, pasta_duckdb, modo="duckdb")
+        divergentes: list[str] = comparar_saidas(pasta_memoria, pasta_duckdb)
+
+    if total_linhas == len(df_reais) and not tabelas and not divergentes:
+        registrar_resultado_teste(nome_teste, "SUCESSO", "Agregados e CSVs publicados pelo DuckDB são idênticos aos do pandas.")
+    else:
+        registrar_resultado_teste(
+            nome_teste, "FALHA",
+            f"Linhas: {total_linhas} x {len(df_reais)} | Agregados divergentes: {tabelas} | Arquivos divergentes: {divergentes}",
+        )
+
+
+def casos_limite_fracionamento() -> pd.DataFrame:
+    """Empates de data, nulos, NaT e portadores intercalados para a regra R2."""
+    return pd.DataFrame({
+        "NOME PORTADOR": ["ANA", "BIA", "ANA", "ANA", None, "ANA", "BIA", "BIA", "BIA", "ANA", "CAIO", "CAIO"],
+        "DATA_DT": pd.to_datetime([
+            "2025-01-03", "2025-01-01", "2025-01-01", "2025-01-01", "2025-01-01", "2025-01-02",
+            "2025-01-01", None, "2025-01-02", "2025-01-09", "2025-01-01", "2025-01-02",
+        ]),
+        "VALOR_NUM": [2000.0, 3000.0, 1500.0, 1800.0, 9000.0, 1700.01, 1000.0, 5000.0, np.nan, 4000.0, 6000.0, 6000.0],
+    })
+
+
+def testar_fracionamento_vetorizado(df_reais: pd.DataFrame) -> None:
+    nome_teste: str = "TESTE 4 (Fracionamento R2 Vetorizado)"
+    limites: dict[str, float] = next(r.limites for r in REGRAS_AUDITORIA if r.codigo == "R2")
+
+    casos: pd.DataFrame = casos_limite_fracionamento()
+    bases: list[pd.DataFrame] = [
+        casos,
+        casos.astype({"NOME PORTADOR": "category"}),
+        casos.iloc[::-1].reset_index(drop=True),
+        df_reais,
+    ]
+
+    divergencias: int = 0
+    marcadas: int = 0
+    for base in bases:
+        esperado: np.ndarray = mascara_fracionamento_agrupada(base, limites)
+        obtido: np.ndarray = mascara_fracionamento(base, limites)
+        divergencias += int((esperado != obtido).sum())
+        marcadas += int(esperado.sum())
+
+    if divergencias == 0:
+        registrar_resultado_teste(nome_teste, "SUCESSO", f"{marcadas} transações marcadas de forma idêntica à versão groupby + rolling.")
+    else:
+        registrar_resultado_teste(nome_teste, "FALHA", f"{divergencias} transações divergem da versão groupby + rolling.")
+
+
+def testar_calendario_feriados(df_reais: pd.DataFrame) -> None:
+    nome_teste: str = "TESTE 5 (Calendário de Feriados R3)"
+
+    # Páscoas conhecidas, incluindo anos de exceção do método de Gauss (1954, 1981).
+    pascoas: dict[int, date] = {
+        1954: date(1954, 4, 18), 1981: date(1981, 4, 19), 2000: date(2000, 4, 23),
+        2024: date(2024, 3, 31), 2025: date(2025, 4, 20), 2026: date(2026, 4, 5),
+    }
+    pascoas_erradas: list[int] = [a for a, d in pascoas.items() if domingo_de_pascoa(a) != d]
+
+    # Sem os feriados móveis, a consulta por número do dia deve reproduzir a
+    # versão por texto (fins de semana + feriados fixos) linha a linha.
+    datas: np.ndarray = df_reais["DATA_DT"].to_numpy(dtype="datetime64[D]")
+    anos: pd.Series = df_reais["DATA_DT"].dt.year.dropna()
+    so_fixos: CalendarioFeriados = CalendarioFeriados(int(anos.min()), int(anos.max()), moveis=())
+    divergencias: int = int(
+        (so_fixos.dias_nao_uteis(datas) != mascara_dia_nao_util_texto(df_reais, {})).sum()
+    )
+
+    if not pascoas_erradas and divergencias == 0:
+        registrar_resultado_teste(nome_teste, "SUCESSO", f"Páscoas corretas e {len(datas)} datas classificadas de forma idêntica à versão por texto.")
+    else:
+        registrar_resultado_teste(nome_teste, "FALHA", f"Páscoas erradas: {pascoas_erradas} | {divergencias} datas divergem da versão por texto.")
+
+
+def duplicidade_por_contagem(df: pd.DataFrame, janela_dias: int) -> np.ndarray:
+    """Referência da R5 com janela: conta, por deslocamento de dias, as chaves iguais."""
+    chaves: list[str] = ["DATA_DT", "VALOR_NUM", "NOME FAVORECIDO"]
+    contagens: pd.Series = df.groupby(chaves, dropna=False).size()
+    com_data: np.ndarray = df["DATA_DT"].notna().to_numpy()
+
+    total: np.ndarray = np.zeros(len(df), dtype=np.int64)
+    for deslocamento in range(-janela_dias, janela_dias + 1):
+        deslocadas: pd.MultiIndex = pd.MultiIndex.from_arrays([
+            df["DATA_DT"] + pd.Timedelta(days=deslocamento), df["VALOR_NUM"], df["NOME FAVORECIDO"]
+        ])
+        encontradas: np.ndarray = contagens.reindex(deslocadas).fillna(0).to_numpy(dtype=np.int64)
+        # NaT só casa com NaT, e apenas no próprio "dia".
+        total += encontradas if deslocamento == 0 else np.where(com_data, encontradas, 0)
+    return total > 1
+
+
+def testar_indice_duplicidade(df_reais: pd.DataFrame) -> None:
+    nome_teste: str = "TESTE 6 (Índice de Duplicidade R5)"
+
+    # Blocos de tamanho "quebrado" espalham as duplicidades entre registros diferentes.
+    tamanho_bloco: int = 9_973
+    divergencias: dict[int, int] = {}
+    marcadas: dict[int, int] = {}
+    for janela_dias in [0, 3]:
+        # Várias partições em disco: cada favorecido tem de cair numa só.
+        indice: IndiceDuplicidade = IndiceDuplicidade(janela_dias, n_particoes=5)
+        for inicio in range(0, len(df_reais), tamanho_bloco):
+            indice.registrar(df_reais.iloc[inicio:inicio + tamanho_bloco])
+
+        if janela_dias == 0:
+            esperado: np.ndarray = df_reais.duplicated(
+                subset=["DATA_DT", "VALOR_NUM", "NOME FAVORECIDO"], keep=False
+            ).to_numpy()
+        else:
+            esperado = duplicidade_por_contagem(df_reais, janela_dias)
+
+        dias, centavos, favorecidos = chaves_duplicidade(df_reais, pd.factorize(df_reais["NOME FAVORECIDO"])[0])
+        vetorizada: np.ndarray = marcar_duplicidades(dias, centavos, favorecidos, janela_dias)
+        divergencias[janela_dias] = int((esperado != indice.mascara()).sum() + (esperado != vetorizada).sum())
+        indice.fechar()
+        marcadas[janela_dias] = int(esperado.sum())
+
+    if not any(divergencias.values()):
+        registrar_resultado_teste(
+            nome_teste, "SUCESSO",
+            f"Índice incremental e versão vetorizada idênticos à referência: {marcadas[0]} duplicadas no dia e {marcadas[3]} com janela de 3 dias.",
+        )
+    else:
+        registrar_resultado_teste(nome_teste, "FALHA", f"Divergências por janela de dias: {divergencias}")
+
+
+def testar_modo_incremental() -> None:
+    nome_teste: str = "TESTE 7 (Modo Incremental x Memória)"
+    arquivos: list[str] = listar_arquivos_reais()
+
+    with tempfile.TemporaryDirectory() as pasta_temp:
+        pasta_dados: str = os.path.join(pasta_temp, "dados")
+        pasta_estado: str = os.path.join(pasta_temp, "estado")
+        os.makedirs(pasta_dados)
+
+        def conferir(etapa: str) -> list[str]:
+            pasta_memoria: str = os.path.join(pasta_temp, f"memoria_{etapa}")
+            pasta_incremental: str = os.path.join(pasta_temp, f"incremental_{etapa}")
+            executar_auditoria_pasta(pasta_dados, pasta_memoria)
+            executar_auditoria_pasta(pasta_dados, pasta_incremental, modo="incremental", pasta_estado=pasta_estado)
+            return [f"{etapa}: {nome}" for nome in comparar_saidas(pasta_memoria, pasta_incremental)]
+
+        for arquivo in arquivos[:-1]:
+            shutil.copy2(arquivo, pasta_dados)
+        divergentes: list[str] = conferir("historico")
+
+        # Chegada de um mês novo: só os meses vizinhos às suas datas são recalculados.
+        shutil.copy2(arquivos[-1], pasta_dados)
+        divergentes += conferir("mes_novo")
+
+        # Arquivo do meio regravado (novo mtime) e outro removido da pasta.
+        meio: str = os.path.join(pasta_dados, os.path.basename(arquivos[len(arquivos) // 2]))
+        os.utime(meio, ns=(os.stat(meio).st_atime_ns, os.stat(meio).st_mtime_ns + 1))
+        os.remove(os.path.join(pasta_dados, os.path.basename(arquivos[1])))
+        divergentes += conferir("alterado_removido")
+
+    if not divergentes:
+        registrar_resultado_teste(nome_teste, "SUCESSO", "Após mês novo, arquivo alterado e arquivo removido, os CSVs incrementais são idênticos aos do modo em memória.")
+    else:
+        registrar_resultado_teste(nome_teste, "FALHA", f"Arquivos divergentes: {divergentes}")
+
+
+def testar_relatorio_execucao() -> None:
+    nome_teste: str = "TESTE 8 (Relatório de Execução Instrumentado)"
+    problemas: list[str] = []
+
+    with tempfile.TemporaryDirectory() as pasta_temp:
+        pasta_simples: str = os.path.join(pasta_temp, "simples")
+        pasta_perfilada: str = os.path.join(pasta_temp, "perfilada")
+        executar_auditoria_pasta(PASTA_DADOS_REAIS, pasta_simples)
+        executar_auditoria_pasta(PASTA_DADOS_REAIS, pasta_perfilada)
+        executar_auditoria_pasta(PASTA_DADOS_REAIS, pasta_perfilada, perfilar=True, rastrear_memoria=True)
+        problemas += [f"CSV divergente com perfilamento: {n}" for n in comparar_saidas(pasta_simples, pasta_perfilada)]
+
+        with open(os.path.join(pasta_perfilada, ARQUIVO_RELATORIO), encoding="utf-8") as f:
+            relatorio: dict = json.load(f)
+        with open(os.path.join(pasta_perfilada, ARQUIVO_HISTORICO), encoding="utf-8") as f:
+            execucoes: int = sum(1 for _ in f)
+
+        etapas: dict[str, dict] = {e["etapa"]: e for e in relatorio["etapas"]}
+        total_linhas: int = relatorio["linhas"]
+        if execucoes != 2:
+            problemas.append(f"histórico com {execucoes} execuções em vez de 2")
+        if etapas.get("memoria/carga", {}).get("linhas_saida") != total_linhas:
+            problemas.append("linhas da carga diferentes do total do relatório")
+        for regra in REGRAS_AUDITORIA:
+            etapa: dict = etapas.get(f"memoria/regras/regra_{regra.codigo}", {})
+            if etapa.get("linhas_entrada") != total_linhas or etapa.get("linhas_saida") is None:
+                problemas.append(f"etapa da regra {regra.codigo} ausente ou incompleta")
+        if any(e["pico_tracemalloc_mb"] is None for e in etapas.values()):
+            problemas.append("etapa sem pico do tracemalloc")
+        # O pico de RSS é o de cada etapa, não o do processo: varia entre as
+        # etapas e a filha nunca passa da pai.
+        picos_rss: dict[str, float | None] = {c: e["pico_rss_mb"] for c, e in etapas.items()}
+        if any(p is None for p in picos_rss.values()) or any(e["delta_rss_mb"] is None for e in etapas.values()):
+            problemas.append("etapa sem pico ou variação de RSS")
+        else:
+            if len(set(picos_rss.values())) == 1:
+                problemas.append("todas as etapas com o mesmo pico de RSS")
+            for caminho, pico in picos_rss.items():
+                pai: str = caminho.rpartition("/")[0]
+                if pai and pico > picos_rss[pai]:
+                    problemas.append(f"pico de RSS de {caminho} acima do da etapa pai")
+            if max(picos_rss.values()) > relatorio["pico_rss_mb"]:
+                problemas.append("pico de RSS de etapa acima do pico da execução")
+        # Etapas filhas nunca somam mais tempo que a etapa que as contém.
+        for caminho, etapa in etapas.items():
+            filhas: float = sum(
+                e["segundos"] for c, e in etapas.items()
+                if c.startswith(f"{caminho}/") and "/" not in c[len(caminho) + 1:]
+            )
+            if filhas > etapa["segundos"]:
+                problemas.append(f"filhas de {caminho} somam mais tempo que a etapa")
+        if not relatorio.get("perfil", {}).get("funcoes_mais_custosas") or not os.path.exists(os.path.join(pasta_perfilada, ARQUIVO_PERFIL)):
+            problemas.append("perfil do cProfile ausente")
+
+    if not problemas:
+        registrar_resultado_teste(nome_teste, "SUCESSO", f"Relatório com {len(etapas)} etapas e {total_linhas} linhas; CSVs idênticos com cProfile e tracemalloc ligados.")
+    else:
+        registrar_resultado_teste(nome_teste, "FALHA", "; ".join(problemas))
+
+
+def testar_saida_colunar(df_reais: pd.DataFrame) -> None:
+    nome_teste: str = "TESTE 9 (Saída Colunar em Parquet Particionado)"
+    problemas: list[str] = []
+
+    agregados = auditar_em_memoria(df_reais, detalhar=True)
+    ocorrencias: pd.DataFrame = agregados.ocorrencias
+    # Reagrupadas, as ocorrências detalhadas reproduzem exatamente os alertas do score.
+    reagrupadas: pd.DataFrame = (
+        ocorrencias.groupby(["ANO_MES", "NOME PORTADOR", "REGRA"], observed=True)
+        .agg(CENTAVOS=("VALOR_CENTAVOS", "sum"), TRANSACOES=("VALOR_CENTAVOS", "count"))
+        .reset_index()
+    )
+    if tabelas_divergentes(agregados.alertas, reagrupadas):
+        problemas.append("ocorrências reagrupadas diferem dos alertas agregados")
+
+    with tempfile.TemporaryDirectory() as pasta_temp:
+        pasta_parquet: str = os.path.join(pasta_temp, "parquet")
+        executar_auditoria_pasta(PASTA_DADOS_REAIS, os.path.join(pasta_temp, "csv"), pasta_parquet=pasta_parquet)
+
+        meses: list[str] = sorted(ocorrencias["ANO_MES"].unique())[:2]
+        parciais: pd.DataFrame = ler_tabela_particionada(pasta_parquet, "ocorrencias", meses)
+        completas: pd.DataFrame = ler_tabela_particionada(pasta_parquet, "ocorrencias")
+        concentracao: pd.DataFrame = ler_tabela_particionada(pasta_parquet, "concentracao")
+
+        if sorted(parciais["ANO_MES"].unique()) != meses:
+            problemas.append("filtro por mês leu partições de outros meses")
+        if len(completas) != len(ocorrencias) or completas["VALOR_CENTAVOS"].sum() != ocorrencias["VALOR_CENTAVOS"].sum():
+            problemas.append("tabela de ocorrências gravada difere da calculada")
+        if len(concentracao) != len(montar_concentracao(agregados)):
+            problemas.append("tabela de concentração incompleta")
+        if not isinstance(completas["NOME FAVORECIDO"].dtype, pd.CategoricalDtype):
+            problemas.append("texto sem codificação em dicionário")
+        # A máscara é idempotente: nomes já mascarados não mudam ao mascarar de novo.
+        for coluna in ["NOME PORTADOR", "NOME FAVORECIDO"]:
+            nomes: pd.Series = completas[coluna].astype(str)
+            if (mascarar_nomes(nomes) != nomes).any():
+                problemas.append(f"{coluna} gravado sem máscara")
+
+        try:
+            executar_auditoria_pasta(PASTA_DADOS_REAIS, os.path.join(pasta_temp, "fluxo"), modo="fluxo", pasta_parquet=pasta_parquet)
+            problemas.append("modo fluxo aceitou pasta_parquet")
+        except ValueError:
+            pass
+
+    if not problemas:
+        registrar_resultado_teste(nome_teste, "SUCESSO", f"{len(ocorrencias)} ocorrências e {len(concentracao)} linhas de concentração gravadas por ANO_MES; leitura filtrada só toca os meses pedidos.")
+    else:
+        registrar_resultado_teste(nome_teste, "FALHA", "; ".join(problemas))
+
+
+def testar_celulas_em_branco() -> None:
+    nome_teste: str = "TESTE 10 (CNPJ e Valor em Branco)"
+    problemas: list[str] = []
+
+    with tempfile.TemporaryDirectory() as pasta_temp:
+        pasta_dados: str = os.path.join(pasta_temp, "dados")
+        os.makedirs(pasta_dados)
+        for arquivo in listar_arquivos_reais()[:2]:
+            copia: str = shutil.copy2(arquivo, pasta_dados)
+            esvaziar_celulas(
+                copia, {"CNPJ OU CPF FAVORECIDO": 7, "VALOR TRANSAÇÃO": 11}, detectar_codificacao(arquivo)
+            )
+
+        # Leitura tipada (pyarrow, quando instalado) x leitura original sem esquema.
+        for arquivo in sorted(os.listdir(pasta_dados)):
+            caminho: str = os.path.join(pasta_dados, arquivo)
+            original: pd.DataFrame = normalizar_cpgf(pd.read_csv(
+                caminho, sep=";", encoding=detectar_codificacao(caminho)
+            )[COLUNAS_CPGF])
+            lido: pd.DataFrame = ler_arquivo_cpgf(caminho)
+            if tabelas_divergentes(original, lido):
+                problemas.append(f"{arquivo}: leitura difere da original")
+            if lido["CNPJ OU CPF FAVORECIDO"].str.endswith(".0").any():
+                problemas.append(f"{arquivo}: CNPJ lido como float")
+
+        pasta_memoria: str = os.path.join(pasta_temp, "memoria")
+        executar_auditoria_pasta(pasta_dados, pasta_memoria)
+        modos: dict[str, dict] = {
+            "fluxo": {"modo": "fluxo", "tamanho_bloco": 7_777},
+            "incremental": {"modo": "incremental", "pasta_estado": os.path.join(pasta_temp, "estado")},
+        }
+        if importlib.util.find_spec("duckdb") is not None:
+            modos["duckdb"] = {"modo": "duckdb"}
+        for modo, parametros in modos.items():
+            pasta_modo: str = os.path.join(pasta_temp, modo)
+            executar_auditoria_pasta(pasta_dados, pasta_modo, **parametros)
+            problemas += [f"{modo}: {nome}" for nome in comparar_saidas(pasta_memoria, pasta_modo)]
+
+    if not problemas:
+        registrar_resultado_teste(nome_teste, "SUCESSO", f"Com 1 a cada 7 CNPJs e 1 a cada 11 valores em branco, a leitura tipada bate com a original e os modos memória, {', '.join(modos)} publicam CSVs idênticos.")
+    else:
+        registrar_resultado_teste(nome_teste, "FALHA", "; ".join(problemas))
+
+
+def rodar_suite_de_equivalencia() -> None:
+    inicializar_log_equivalencia()
+    print("🔁 Iniciando Suite de Equivalência das Otimizações...")
+
+    df_reais: pd.DataFrame = carregar_dados_reais()
+
+    testar_mascaramento_vetorizado(df_reais)
+    testar_modo_fluxo(df_reais)
+    testar_motor_duckdb(df_reais)
+    testar_fracionamento_vetorizado(df_reais)
+    testar_calendario_feriados(df_reais)
+    testar_indice_duplicidade(df_reais)
+    testar_modo_incremental()
+    testar_relatorio_execucao()
+    testar_saida_colunar(df_reais)
+    testar_celulas_em_branco()
+
+    print("🏁 Suite de equivalência finalizada.")
+    print("📄 O arquivo 'auditoria_equivalencia.log' foi gerado com as evidências.")
+
+
+if __name__ == "__main__":
+    rodar_suite_de_equivalencia()
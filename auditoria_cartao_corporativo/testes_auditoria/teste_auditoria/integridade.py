@@ -3,22 +3,26 @@ import json
 from datetime import datetime
 import requests
 
+ARQUIVO_LOG: str = os.path.join(os.path.dirname(__file__), "../logs/auditoria_integridade.log")
+MENSAGEM_INICIO: str = "--- INÍCIO DO TESTE DE INTEGRIDADE ---"
+MENSAGEM_FIM: str = "--- FIM DO TESTE DE INTEGRIDADE ---\n"
 
-def registrar_log_integridade(mensagem: str, status_code: int | None = None) -> None:
-    """Grava o resultado do teste de integridade no arquivo de log corporativo."""
+
+def formatar_log_integridade(mensagem: str, status_code: int | None = None) -> str:
+    """Monta a linha do log com o resultado do teste de integridade."""
     data_hora: str = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
     status_info: str = f" [Status HTTP: {status_code}]" if status_code else ""
-    linha_log: str = f"[{data_hora}]{status_info} {mensagem}\n"
+    return f"[{data_hora}]{status_info} {mensagem}\n"
 
-    log_path = os.path.join(os.path.dirname(__file__), "../logs/auditoria_integridade.log")
-    with open(log_path, mode="a", encoding="utf-8") as f:
-        f.write(linha_log)
 
+def registrar_log_integridade(mensagem: str, status_code: int | None = None) -> None:
+    """Grava o resultado do teste de integridade no arquivo de log corporativo."""
+    with open(ARQUIVO_LOG, mode="a", encoding="utf-8") as f:
+        f.write(formatar_log_integridade(mensagem, status_code))
 
-def testar_violacao_integridade() -> None:
-    print("[TESTE 2] Iniciando teste de Integridade e Injeção de Dados...")
-    registrar_log_integridade("--- INÍCIO DO TESTE DE INTEGRIDADE ---")
 
+def montar_requisicao() -> dict:
+    """Tentativa anônima de escrita na base (argumentos de `requests.request`)."""
     # Endpoint de escrita simulado baseado na estrutura do Airtable
     url_alteracao: str = (
         "https://airtable.com/v0.3/application/appjku7kXHQcVCcXM/alter"
@@ -42,46 +46,59 @@ def testar_violacao_integridade() -> None:
             "PERC_CONCENTRACAO": 100.0,
         },
     }
+    return {"method": "POST", "url": url_alteracao, "headers": headers, "json": dados_maliciosos, "timeout": 10}
 
-    try:
-        # Envia uma requisição POST anônima tentando forçar a inserção do registro
-        resposta = requests.post(
-            url_alteracao, headers=headers, json=dados_maliciosos, timeout=10
+
+def avaliar_resposta(status_code: int, corpo: str) -> tuple[str, str, list[tuple]]:
+    """
+    Classifica a resposta à tentativa de escrita.
+
+    Devolve a situação (APROVADO, REPROVADO ou ALERTA), a mensagem principal
+    e os argumentos de cada linha a registrar com `registrar_log_integridade`.
+    """
+    # Se o Airtable aceitar a gravação sem chave de API/Token
+    if status_code in [200, 201]:
+        msg_falha: str = (
+            "❌ CRÍTICO - FALHA DE INTEGRIDADE: O sistema aceitou a injeção"
+            " de dados anônima! A base de dados do dashboard foi violada."
         )
+        return "REPROVADO", msg_falha, [(msg_falha, status_code)]
 
-        # Se o Airtable aceitar a gravação sem chave de API/Token
-        if resposta.status_code in [200, 201]:
-            msg_falha: str = (
-                "❌ CRÍTICO - FALHA DE INTEGRIDADE: O sistema aceitou a injeção"
-                " de dados anônima! A base de dados do dashboard foi violada."
-            )
-            print(msg_falha)
-            registrar_log_integridade(msg_falha, resposta.status_code)
-
-        # Se o Airtable recusar por falta de privilégios (Cenário correto de segurança)
-        elif resposta.status_code in [401, 403, 404, 422]:
-            msg_sucesso: str = (
-                "✅ SUCESSO: O sistema bloqueou a tentativa de alteração"
-                " anônima. Os dados originais do Airtable permanecem íntegros."
-            )
-            print(msg_sucesso)
-            registrar_log_integridade(msg_sucesso, resposta.status_code)
-        else:
-            msg_indeterminado: str = (
-                "⚠️ ALERTA: Resposta inesperada do servidor durante a tentativa"
-                " de escrita."
-            )
-            print(msg_indeterminado)
-            registrar_log_integridade(msg_indeterminado, resposta.status_code)
+    # Se o Airtable recusar por falta de privilégios (Cenário correto de segurança)
+    if status_code in [401, 403, 404, 422]:
+        msg_sucesso: str = (
+            "✅ SUCESSO: O sistema bloqueou a tentativa de alteração"
+            " anônima. Os dados originais do Airtable permanecem íntegros."
+        )
+        return "APROVADO", msg_sucesso, [(msg_sucesso, status_code)]
+
+    msg_indeterminado: str = (
+        "⚠️ ALERTA: Resposta inesperada do servidor durante a tentativa"
+        " de escrita."
+    )
+    return "ALERTA", msg_indeterminado, [(msg_indeterminado, status_code)]
+
+
+def testar_violacao_integridade() -> None:
+    print("[TESTE 2] Iniciando teste de Integridade e Injeção de Dados...")
+    registrar_log_integridade(MENSAGEM_INICIO)
+
+    try:
+        # Envia uma requisição POST anônima tentando forçar a inserção do registro
+        resposta = requests.request(**montar_requisicao())
+        _, mensagem, registros = avaliar_resposta(resposta.status_code, resposta.text)
+        print(mensagem)
+        for registro in registros:
+            registrar_log_integridade(*registro)
 
     except requests.exceptions.RequestException as e:
         msg_erro: str = f"❌ ERRO EXCEÇÃO DE CONEXÃO: {e}"
         print(msg_erro)
         registrar_log_integridade(msg_erro)
 
-    registrar_log_integridade("--- FIM DO TESTE DE INTEGRIDADE ---\n")
+    registrar_log_integridade(MENSAGEM_FIM)
     print("[INFO] Processo finalizado. Verifique o arquivo 'auditoria_integridade.log'.")
 
 
 if __name__ == "__main__":
-    testar_violacao_integridade()
\ No newline at end of file
+    testar_violacao_integridade()
@@ -1,18 +1,43 @@
+import filecmp
 import os
-import shutil
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime
+from typing import Callable
 import pandas as pd
 
 import sys
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../../extracao_dados_dashboard')))
 # pyrefly: ignore [missing-import]
-from extraçao_dados import executar_auditoria_pasta
+from extraçao_dados import VARIAVEL_SAL_IDENTIFICADORES, ErroEsquemaCPGF, executar_auditoria_pasta
+# pyrefly: ignore [missing-import]
+from benchmark_escala import auditar_e_ler_relatorio
+# pyrefly: ignore [missing-import]
+from dados_sinteticos import esvaziar_celulas, gerar_pasta_cpgf
+# pyrefly: ignore [missing-import]
+from desempenho import medir_em_processo_isolado
+
+LOG_PIPELINE: str = os.path.join(os.path.dirname(__file__), "../logs/auditoria_completa_pipeline.log")
+
+# Sal fixo dos testes: a auditoria não publica identificadores sem sal.
+os.environ.setdefault(VARIAVEL_SAL_IDENTIFICADORES, "sal-dos-testes")
+
+# Cenário 5: dois anos de extratos sintéticos (~250 mil linhas). Os orçamentos
+# têm folga de ~5x no tempo e ~2x no pico de RSS sobre a medição de referência
+# (2,7s e 321 MB num núcleo); as variáveis de ambiente ajustam para outra máquina.
+MESES_ENTRADA_GRANDE: int = int(os.getenv("CPGF_PIPELINE_MESES", "24"))
+ORCAMENTO_SEGUNDOS: float = float(os.getenv("CPGF_PIPELINE_ORCAMENTO_SEGUNDOS", "15"))
+ORCAMENTO_RSS_MB: float = float(os.getenv("CPGF_PIPELINE_ORCAMENTO_RSS_MB", "640"))
+# Cenário 6: a reprovação só lê as primeiras linhas de cada CSV, então tem de
+# custar uma fração da auditoria completa medida no mesmo cenário (na
+# referência, 0,3s contra 2,4s), qualquer que seja a velocidade da máquina.
+FRACAO_FALHA_RAPIDA: float = 0.5
 
 
 def inicializar_log_consolidado() -> None:
     """Cria ou limpa o arquivo de log no início da suite de testes."""
-    log_path = os.path.join(os.path.dirname(__file__), "../logs/auditoria_completa_pipeline.log")
-    with open(log_path, mode="w", encoding="utf-8") as f:
+    with open(LOG_PIPELINE, mode="w", encoding="utf-8") as f:
         data_hora: str = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
         f.write(f"========================================================\n")
         f.write(f" SUITE DE TESTES CONSOLIDADA - PIPELINE DE EXTRAÇÃO\n")
@@ -24,32 +49,24 @@ def registrar_resultado_teste(nome_teste: str, status: str, detalhe: str) -> Non
     """Salva o resultado individual de cada teste no log corporativo."""
     data_hora: str = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
     linha: str = f"[{data_hora}] [{status}] {nome_teste}: {detalhe}\n"
-    log_path = os.path.join(os.path.dirname(__file__), "../logs/auditoria_completa_pipeline.log")
-    with open(log_path, mode="a", encoding="utf-8") as f:
+    with open(LOG_PIPELINE, mode="a", encoding="utf-8") as f:
         f.write(linha)
 
 
-def criar_cenario_limpo(pasta_brutos: str, pasta_resultados: str) -> None:
-    """Garante que as pastas de teste temporárias estejam limpas antes de iniciar."""
-    if os.path.exists(pasta_brutos):
-        shutil.rmtree(pasta_brutos)
-    if os.path.exists(pasta_resultados):
-        shutil.rmtree(pasta_resultados)
+def criar_cenario_limpo(pasta_base: str) -> tuple[str, str]:
+    """Cria as pastas de entrada e de resultados do cenário dentro de `pasta_base`."""
+    pasta_brutos: str = os.path.join(pasta_base, "dados_brutos_teste")
+    pasta_resultados: str = os.path.join(pasta_base, "resultados_auditoria_teste")
     os.makedirs(pasta_brutos, exist_ok=True)
+    return pasta_brutos, pasta_resultados
 
 
-def rodar_suite_de_testes() -> None:
-    inicializar_log_consolidado()
-    print("🚀 Iniciando Suite de Testes de Robustez e Confiabilidade...")
+# =========================================================================
+# CENÁRIO 1: Teste de Tolerância a Falhas (Dados Corrompidos na Conversão)
+# =========================================================================
+def cenario_dados_corrompidos(pasta_base: str) -> tuple[str, str]:
+    pasta_brutos, pasta_resultados = criar_cenario_limpo(pasta_base)
 
-    pasta_brutos: str = "dados_brutos_teste"
-    pasta_resultados: str = "resultados_auditoria_teste"
-
-    # =========================================================================
-    # CENÁRIO 1: Teste de Tolerância a Falhas (Dados Corrompidos na Conversão)
-    # =========================================================================
-    criar_cenario_limpo(pasta_brutos, pasta_resultados)
-    
     df_corrompido = pd.DataFrame({
         "DATA TRANSAÇÃO": ["25/05/2026"],
         "NOME PORTADOR": ["WEILLON B. M."],
@@ -63,17 +80,19 @@ def rodar_suite_de_testes() -> None:
 
     try:
         executar_auditoria_pasta(pasta_brutos, pasta_resultados)
-        registrar_resultado_teste("TESTE 1 (Tolerância a Falhas)", "FALHA", "O pipeline aceitou strings não numéricas sem disparar exceção.")
-    except ValueError as e:
-        registrar_resultado_teste("TESTE 1 (Tolerância a Falhas)", "SUCESSO", f"O sistema barrou a conversão de tipo inválido controladamente: {e}")
+        return "FALHA", "O pipeline aceitou strings não numéricas sem disparar exceção."
+    except ErroEsquemaCPGF as e:
+        return "SUCESSO", f"A validação de esquema barrou o tipo inválido antes da leitura completa: {e}"
     except Exception as e:
-        registrar_resultado_teste("TESTE 1 (Tolerância a Falhas)", "ALERTA", f"O sistema falhou com uma exceção genérica inesperada: {e}")
+        return "ALERTA", f"O sistema falhou com uma exceção genérica inesperada: {e}"
+
+
+# =========================================================================
+# CENÁRIO 2: Teste de Maturidade (Colunas Obrigatórias Ausentes)
+# =========================================================================
+def cenario_colunas_ausentes(pasta_base: str) -> tuple[str, str]:
+    pasta_brutos, pasta_resultados = criar_cenario_limpo(pasta_base)
 
-    # =========================================================================
-    # CENÁRIO 2: Teste de Maturidade (Colunas Obrigatórias Ausentes)
-    # =========================================================================
-    criar_cenario_limpo(pasta_brutos, pasta_resultados)
-    
     df_sem_coluna = pd.DataFrame({
         "DATA TRANSAÇÃO": ["25/05/2026"],
         "NOME PORTADOR": ["WEILLON B. M."]
@@ -83,30 +102,34 @@ def rodar_suite_de_testes() -> None:
 
     try:
         executar_auditoria_pasta(pasta_brutos, pasta_resultados)
-        registrar_resultado_teste("TESTE 2 (Maturidade Estrutural)", "FALHA", "O pipeline tentou processar um arquivo sem as colunas obrigatórias.")
-    except KeyError as e:
-        registrar_resultado_teste("TESTE 2 (Maturidade Estrutural)", "SUCESSO", f"A ausência de chaves estruturais foi capturada com sucesso: KeyError {e}")
+        return "FALHA", "O pipeline tentou processar um arquivo sem as colunas obrigatórias."
+    except ErroEsquemaCPGF as e:
+        return "SUCESSO", f"A ausência de colunas estruturais foi capturada na validação de esquema: {e}"
     except Exception as e:
-        registrar_resultado_teste("TESTE 2 (Maturidade Estrutural)", "ALERTA", f"O sistema quebrou de forma não mapeada: {e}")
+        return "ALERTA", f"O sistema quebrou de forma não mapeada: {e}"
 
-    # =========================================================================
-    # CENÁRIO 3: Teste de Resiliência (Pasta de Dados de Entrada Vazia)
-    # =========================================================================
-    criar_cenario_limpo(pasta_brutos, pasta_resultados)
+
+# =========================================================================
+# CENÁRIO 3: Teste de Resiliência (Pasta de Dados de Entrada Vazia)
+# =========================================================================
+def cenario_pasta_vazia(pasta_base: str) -> tuple[str, str]:
+    pasta_brutos, pasta_resultados = criar_cenario_limpo(pasta_base)
     # Deixamos a pasta intencionalmente sem nenhum arquivo CSV dentro
 
     try:
         executar_auditoria_pasta(pasta_brutos, pasta_resultados)
         # Como o seu código tem um 'return' amigável caso não ache arquivos, ele deve passar aqui suavemente
-        registrar_resultado_teste("TESTE 3 (Resiliência de Diretório)", "SUCESSO", "O pipeline identificou a pasta vazia e encerrou a execução de forma elegante.")
+        return "SUCESSO", "O pipeline identificou a pasta vazia e encerrou a execução de forma elegante."
     except Exception as e:
-        registrar_resultado_teste("TESTE 3 (Resiliência de Diretório)", "FALHA", f"O sistema crashou ao encontrar um diretório vazio: {e}")
+        return "FALHA", f"O sistema crashou ao encontrar um diretório vazio: {e}"
+
+
+# =========================================================================
+# CENÁRIO 4: Teste de Robustez (Valores Nulos/NaN em Campos Críticos)
+# =========================================================================
+def cenario_valores_nulos(pasta_base: str) -> tuple[str, str]:
+    pasta_brutos, pasta_resultados = criar_cenario_limpo(pasta_base)
 
-    # =========================================================================
-    # CENÁRIO 4: Teste de Robustez (Valores Nulos/NaN em Campos Críticos)
-    # =========================================================================
-    criar_cenario_limpo(pasta_brutos, pasta_resultados)
-    
     df_com_nulos = pd.DataFrame({
         "DATA TRANSAÇÃO": [None],  # Data nula que quebra a conversão de período temporal (.dt.to_period)
         "NOME PORTADOR": [None],
@@ -120,21 +143,166 @@ def rodar_suite_de_testes() -> None:
 
     try:
         executar_auditoria_pasta(pasta_brutos, pasta_resultados)
-        registrar_resultado_teste("TESTE 4 (Robustez contra Nulos)", "FALHA", "O pipeline processou valores nulos em colunas chave sem apresentar restrições.")
+        return "FALHA", "O pipeline processou valores nulos em colunas chave sem apresentar restrições."
     except AttributeError as e:
-        registrar_resultado_teste("TESTE 4 (Robustez contra Nulos)", "SUCESSO", f"O Pandas barrou a extração de data nula controladamente (AttributeError): {e}")
+        return "SUCESSO", f"O Pandas barrou a extração de data nula controladamente (AttributeError): {e}"
     except Exception as e:
-        registrar_resultado_teste("TESTE 4 (Robustez contra Nulos)", "SUCESSO", f"O pipeline evitou o processamento de nulos gerando a exceção: {e}")
+        return "SUCESSO", f"O pipeline evitou o processamento de nulos gerando a exceção: {e}"
+
+
+# =========================================================================
+# CENÁRIO 5: Teste de Desempenho (Entrada Grande com Orçamento de Tempo e Memória)
+# =========================================================================
+def cenario_entrada_grande(pasta_base: str) -> tuple[str, str]:
+    pasta_brutos, pasta_resultados = criar_cenario_limpo(pasta_base)
+    gerar_pasta_cpgf(pasta_brutos, MESES_ENTRADA_GRANDE)
+
+    # Processo novo: o pico de RSS do relatório é só da auditoria, sem a geração dos dados.
+    relatorio: dict = medir_em_processo_isolado(
+        auditar_e_ler_relatorio, pasta_brutos, pasta_resultados, "memoria"
+    )
+    segundos: float = relatorio["total_segundos"]
+    pico_rss_mb: float = relatorio["pico_rss_processo_mb"]
+    medicao: str = (
+        f"{relatorio['linhas']} linhas em {segundos:.2f}s (orçamento {ORCAMENTO_SEGUNDOS:g}s),"
+        f" pico de RSS de {pico_rss_mb:.0f} MB (orçamento {ORCAMENTO_RSS_MB:g} MB)"
+    )
+    if segundos > ORCAMENTO_SEGUNDOS or pico_rss_mb > ORCAMENTO_RSS_MB:
+        return "FALHA", f"Regressão de desempenho: {medicao}."
+    return "SUCESSO", f"Auditoria de {MESES_ENTRADA_GRANDE} meses dentro do orçamento: {medicao}."
+
+
+# =========================================================================
+# CENÁRIO 6: Teste de Falha Rápida (Vários Arquivos Fora do Esquema)
+# =========================================================================
+def cenario_falha_rapida(pasta_base: str) -> tuple[str, str]:
+    pasta_brutos, pasta_resultados = criar_cenario_limpo(pasta_base)
+    arquivos: list[str] = gerar_pasta_cpgf(pasta_brutos, MESES_ENTRADA_GRANDE)
+    # Dois meses quebrados no meio de dois anos de extratos válidos.
+    sem_colunas, datas_iso = arquivos[6], arquivos[7]
+    with open(sem_colunas, mode="w", encoding="utf-8") as f:
+        f.write("DATA TRANSAÇÃO;NOME PORTADOR\n25/05/2026;WEILLON B. M.\n")
+    df_datas: pd.DataFrame = pd.read_csv(datas_iso, sep=";", dtype=str, encoding="latin1")
+    df_datas["DATA TRANSAÇÃO"] = "2016-08-01"
+    df_datas.to_csv(datas_iso, sep=";", index=False, encoding="latin1")
+    esperados: list[str] = sorted(os.path.basename(a) for a in (sem_colunas, datas_iso))
+
+    inicio: float = time.perf_counter()
+    try:
+        executar_auditoria_pasta(pasta_brutos, pasta_resultados)
+        return "FALHA", "O pipeline processou a pasta com meses fora do esquema."
+    except ErroEsquemaCPGF as e:
+        segundos: float = time.perf_counter() - inicio
+        reprovados: list[str] = sorted(os.path.basename(a) for a in e.problemas)
+        erro: ErroEsquemaCPGF = e
+
+    problemas: list[str] = []
+    if reprovados != esperados:
+        problemas.append(f"arquivos reprovados inesperados: {reprovados}")
+    if os.path.commonpath([erro.pasta_quarentena, os.path.abspath(pasta_brutos)]) == os.path.abspath(pasta_brutos):
+        problemas.append(f"a quarentena ficou dentro da pasta de entrada: {erro.pasta_quarentena}")
+    em_quarentena: list[str] = sorted(os.listdir(erro.pasta_quarentena))
+    if em_quarentena != esperados + ["quarentena.jsonl"]:
+        problemas.append(f"quarentena inesperada: {em_quarentena}")
+    if os.path.exists(os.path.join(pasta_resultados, "relatorio_execucao.json")):
+        problemas.append("a auditoria completa rodou apesar da reprovação")
+    if problemas:
+        return "FALHA", "; ".join(problemas)
+
+    # Com os meses quebrados em quarentena, a reexecução segue com os demais;
+    # o tempo dela é a referência para o custo da reprovação.
+    inicio = time.perf_counter()
+    executar_auditoria_pasta(pasta_brutos, pasta_resultados)
+    segundos_completa: float = time.perf_counter() - inicio
+    if segundos > FRACAO_FALHA_RAPIDA * segundos_completa:
+        return "FALHA", (
+            f"a reprovação levou {segundos:.2f}s, mais de {FRACAO_FALHA_RAPIDA:.0%}"
+            f" da auditoria completa ({segundos_completa:.2f}s)"
+        )
+    return "SUCESSO", (
+        f"{len(reprovados)} arquivos reprovados de uma vez em {segundos * 1000:.0f} ms"
+        f" ({segundos / segundos_completa:.0%} da auditoria completa), movidos para a quarentena;"
+        f" a reexecução auditou os outros {MESES_ENTRADA_GRANDE - 2} meses em {segundos_completa:.2f}s."
+    )
+
+
+# =========================================================================
+# CENÁRIO 7: Teste de Robustez (CNPJ e Valor em Branco em Arquivo Válido)
+# =========================================================================
+def cenario_celulas_em_branco(pasta_base: str) -> tuple[str, str]:
+    pasta_brutos, pasta_resultados = criar_cenario_limpo(pasta_base)
+    # Células vazias passam na validação de esquema, mas mudam a inferência
+    # de tipos do leitor: o CNPJ numérico deixa de caber num inteiro.
+    for arquivo in gerar_pasta_cpgf(pasta_brutos, 2, linhas_por_mes=2_000):
+        esvaziar_celulas(arquivo, {"CNPJ OU CPF FAVORECIDO": 7, "VALOR TRANSAÇÃO": 11})
+
+    pasta_fluxo: str = os.path.join(pasta_base, "resultados_fluxo")
+    try:
+        executar_auditoria_pasta(pasta_brutos, pasta_resultados)
+        executar_auditoria_pasta(pasta_brutos, pasta_fluxo, modo="fluxo", tamanho_bloco=500)
+    except Exception as e:
+        return "FALHA", f"Arquivo válido com células em branco derrubou a auditoria: {type(e).__name__}: {e}"
+
+    nomes: list[str] = sorted(n for n in os.listdir(pasta_resultados) if n.endswith(".csv"))
+    _, diferentes, ausentes = filecmp.cmpfiles(pasta_resultados, pasta_fluxo, nomes, shallow=False)
+    if diferentes or ausentes or not nomes:
+        return "FALHA", f"Modos memória e fluxo divergem com células em branco: {diferentes + ausentes}"
+    return "SUCESSO", f"CNPJs e valores em branco processados; {len(nomes)} CSVs idênticos nos modos memória e fluxo."
+
+
+# =========================================================================
+# CENÁRIO 8: Teste de Confidencialidade (Auditoria sem o Sal dos Identificadores)
+# =========================================================================
+def cenario_sem_sal(pasta_base: str) -> tuple[str, str]:
+    pasta_brutos, pasta_resultados = criar_cenario_limpo(pasta_base)
+    gerar_pasta_cpgf(pasta_brutos, 1, linhas_por_mes=500)
+
+    sal: str | None = os.environ.pop(VARIAVEL_SAL_IDENTIFICADORES, None)
+    try:
+        executar_auditoria_pasta(pasta_brutos, pasta_resultados)
+        return "FALHA", "A auditoria publicou identificadores sem sal, recalculáveis a partir dos nomes."
+    except RuntimeError as e:
+        if os.path.exists(pasta_resultados):
+            return "FALHA", "A auditoria parou sem o sal, mas depois de gravar resultados."
+        return "SUCESSO", f"Sem o sal, a auditoria parou antes de ler os dados: {e}"
+    finally:
+        if sal is not None:
+            os.environ[VARIAVEL_SAL_IDENTIFICADORES] = sal
+
+
+CENARIOS: dict[str, Callable[[str], tuple[str, str]]] = {
+    "TESTE 1 (Tolerância a Falhas)": cenario_dados_corrompidos,
+    "TESTE 2 (Maturidade Estrutural)": cenario_colunas_ausentes,
+    "TESTE 3 (Resiliência de Diretório)": cenario_pasta_vazia,
+    "TESTE 4 (Robustez contra Nulos)": cenario_valores_nulos,
+    "TESTE 5 (Orçamento de Desempenho)": cenario_entrada_grande,
+    "TESTE 6 (Falha Rápida e Quarentena)": cenario_falha_rapida,
+    "TESTE 7 (Células em Branco)": cenario_celulas_em_branco,
+    "TESTE 8 (Identificadores sem Sal)": cenario_sem_sal,
+}
+
+
+def executar_cenario(nome_teste: str) -> tuple[str, str]:
+    """Roda um cenário numa pasta temporária própria, apagada ao final."""
+    with tempfile.TemporaryDirectory(prefix="cenario_pipeline_") as pasta_base:
+        return CENARIOS[nome_teste](pasta_base)
+
+
+def rodar_suite_de_testes() -> None:
+    inicializar_log_consolidado()
+    print("🚀 Iniciando Suite de Testes de Robustez e Confiabilidade...")
+
+    # Cada cenário tem a sua pasta e o seu processo, então podem rodar juntos;
+    # só o processo principal escreve no log, na ordem dos testes.
+    with ProcessPoolExecutor(max_workers=min(len(CENARIOS), os.cpu_count() or 1)) as executor:
+        resultados: list[tuple[str, str]] = list(executor.map(executar_cenario, CENARIOS))
 
-    # Limpeza final das pastas temporárias
-    if os.path.exists(pasta_brutos):
-        shutil.rmtree(pasta_brutos)
-    if os.path.exists(pasta_resultados):
-        shutil.rmtree(pasta_resultados)
+    for nome_teste, (status, detalhe) in zip(CENARIOS, resultados):
+        registrar_resultado_teste(nome_teste, status, detalhe)
 
     print("🏁 Suite de testes finalizada com sucesso!")
     print("📄 O arquivo 'auditoria_completa_pipeline.log' foi gerado com as evidências.")
 
 
 if __name__ == "__main__":
-    rodar_suite_de_testes()
\ No newline at end of file
+    rodar_suite_de_testes()
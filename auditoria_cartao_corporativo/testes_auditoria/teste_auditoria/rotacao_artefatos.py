@@ -0,0 +1,167 @@
+import json
+import os
+import random
+import string
+import tempfile
+import tracemalloc
+from datetime import datetime
+
+from artefatos_log import (
+    PonteiroArtefato, gravar_json_compactado, ler_json_compactado, listar_artefatos,
+)
+from confidencialidade import formatar_log
+
+LOG_ARTEFATOS: str = os.path.join(os.path.dirname(__file__), "../logs/auditoria_artefatos.log")
+
+
+def inicializar_log_artefatos() -> None:
+    """Cria ou limpa o arquivo de log no início da suite dos artefatos."""
+    with open(LOG_ARTEFATOS, mode="w", encoding="utf-8") as f:
+        data_hora: str = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        f.write("========================================================\n")
+        f.write(" SUITE DOS ARTEFATOS DE DADOS BRUTOS - DUMP EM FLUXO\n")
+        f.write(f" Data de Execução: {data_hora}\n")
+        f.write("========================================================\n\n")
+
+
+def registrar_resultado_teste(nome_teste: str, status: str, detalhe: str) -> None:
+    """Salva o resultado individual de cada teste no log dos artefatos."""
+    data_hora: str = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    with open(LOG_ARTEFATOS, mode="a", encoding="utf-8") as f:
+        f.write(f"[{data_hora}] [{status}] {nome_teste}: {detalhe}\n")
+
+
+def resposta_airtable_simulada(n_linhas: int, semente: int = 0) -> dict:
+    """Imita o JSON da API interna: uma tabela com `n_linhas` registros de gastos."""
+    aleatorio: random.Random = random.Random(semente)
+    linhas: list[dict] = [
+        {
+            "id": f"rec{i:014d}",
+            "cellValuesByColumnId": {
+                "ANO_MES": f"2025-{aleatorio.randint(1, 12):02d}",
+                "NOME PORTADOR": "".join(aleatorio.choices(string.ascii_uppercase + " ", k=24)),
+                "NOME FAVORECIDO": "".join(aleatorio.choices(string.ascii_uppercase + " ", k=32)),
+                "GASTO_FORNECEDOR_MES": round(aleatorio.uniform(10, 50_000), 2),
+                "PERC_CONCENTRACAO": round(aleatorio.uniform(75, 100), 2),
+            },
+        }
+        for i in range(n_linhas)
+    ]
+    return {"data": {"table": {"rows": linhas}}, "msg": "SUCCESS"}
+
+
+def pico_do_dump(dados: dict, pasta: str) -> tuple[float, float]:
+    """Pico de alocações (MB) do dump em fluxo e do `json.dumps(indent=4)` antigo."""
+    tracemalloc.start()
+    gravar_json_compactado(dados, pasta, "medicao")
+    pico_fluxo: int = tracemalloc.get_traced_memory()[1]
+    tracemalloc.reset_peak()
+    texto: str = json.dumps(dados, indent=4, ensure_ascii=False)
+    pico_antigo: int = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    del texto
+    return pico_fluxo / 1024**2, pico_antigo / 1024**2
+
+
+def testar_ponteiro_no_log(pasta: str) -> None:
+    nome_teste: str = "TESTE 1 (Log com Ponteiro e Hash no Lugar do Dump)"
+    problemas: list[str] = []
+
+    dados: dict = resposta_airtable_simulada(2_000)
+    primeiro: str = formatar_log("❌ CRÍTICO - teste", dados, pasta_artefatos=pasta)
+    segundo: str = formatar_log("❌ CRÍTICO - teste", resposta_airtable_simulada(10, semente=1), pasta_artefatos=pasta)
+    ponteiros: list[PonteiroArtefato] = [
+        PonteiroArtefato.do_texto(texto.splitlines()[1]) for texto in (primeiro, segundo)
+    ]
+
+    if len(primeiro) > 500 or "cellValuesByColumnId" in primeiro:
+        problemas.append("o log ainda carrega os dados brutos")
+    # Os dois dumps ficam no mesmo artefato, como membros gzip consecutivos.
+    if ponteiros[0].arquivo != ponteiros[1].arquivo or ponteiros[1].deslocamento <= 0:
+        problemas.append(f"ponteiros inesperados: {ponteiros}")
+    if ler_json_compactado(pasta, ponteiros[0]) != dados:
+        problemas.append("o primeiro dump não volta igual aos dados")
+    if ler_json_compactado(pasta, ponteiros[1]) != resposta_airtable_simulada(10, semente=1):
+        problemas.append("o segundo dump não volta igual aos dados")
+    tamanho_artefato: int = os.path.getsize(os.path.join(pasta, ponteiros[0].arquivo))
+
+    if not problemas:
+        registrar_resultado_teste(nome_teste, "SUCESSO", f"Linha do log com {len(primeiro)} caracteres; {ponteiros[0].bytes_json} bytes de JSON compactados para {tamanho_artefato} bytes no artefato e lidos de volta pelo ponteiro com SHA-256 conferido.")
+    else:
+        registrar_resultado_teste(nome_teste, "FALHA", "; ".join(problemas))
+
+
+def testar_memoria_constante(pasta: str) -> None:
+    nome_teste: str = "TESTE 2 (Pico de Memória Constante no Dump)"
+    problemas: list[str] = []
+
+    picos: dict[int, tuple[float, float]] = {}
+    for n_linhas in (10_000, 40_000):
+        dados: dict = resposta_airtable_simulada(n_linhas)
+        picos[n_linhas] = pico_do_dump(dados, pasta)
+        del dados
+
+    fluxo_menor, antigo_menor = picos[10_000]
+    fluxo_maior, antigo_maior = picos[40_000]
+    # Com 4x mais linhas o dump antigo cresce ~4x; o em fluxo fica no tamanho do bloco.
+    if fluxo_maior > 2.0 or fluxo_maior > 1.5 * fluxo_menor + 0.5:
+        problemas.append(f"pico do dump em fluxo cresceu: {fluxo_menor:.2f} -> {fluxo_maior:.2f} MB")
+
+    detalhe: str = (
+        f"10 mil linhas: {fluxo_menor:.2f} MB em fluxo x {antigo_menor:.1f} MB com json.dumps;"
+        f" 40 mil linhas: {fluxo_maior:.2f} MB x {antigo_maior:.1f} MB."
+    )
+    if not problemas:
+        registrar_resultado_teste(nome_teste, "SUCESSO", detalhe)
+    else:
+        registrar_resultado_teste(nome_teste, "FALHA", "; ".join(problemas) + f" ({detalhe})")
+
+
+def testar_rotacao_por_tamanho(pasta: str) -> None:
+    nome_teste: str = "TESTE 3 (Rotação por Tamanho e Retenção)"
+    problemas: list[str] = []
+
+    tamanho_maximo: int = 200 * 1024
+    ponteiros: list[PonteiroArtefato] = [
+        gravar_json_compactado(
+            resposta_airtable_simulada(1_500, semente=i), pasta, "rotacao",
+            tamanho_maximo=tamanho_maximo, mantidos=3,
+        )
+        for i in range(12)
+    ]
+    artefatos: list[str] = listar_artefatos(pasta, "rotacao")
+    arquivos_usados: list[str] = list(dict.fromkeys(p.arquivo for p in ponteiros))
+
+    if len(artefatos) != 3:
+        problemas.append(f"{len(artefatos)} artefatos mantidos, esperados 3")
+    if len(arquivos_usados) < 4:
+        problemas.append("o artefato não rotacionou ao passar do tamanho máximo")
+    # Um artefato só recebe dumps enquanto está abaixo do limite.
+    for caminho in artefatos[:-1]:
+        tamanho: int = os.path.getsize(caminho)
+        if tamanho > 2 * tamanho_maximo:
+            problemas.append(f"{os.path.basename(caminho)} com {tamanho} bytes")
+    if ler_json_compactado(pasta, ponteiros[-1]) != resposta_airtable_simulada(1_500, semente=11):
+        problemas.append("último dump ilegível após a rotação")
+
+    if not problemas:
+        registrar_resultado_teste(nome_teste, "SUCESSO", f"12 dumps distribuídos em {len(arquivos_usados)} artefatos de até ~{tamanho_maximo // 1024} KB; só os 3 mais recentes mantidos e o último lido pelo ponteiro.")
+    else:
+        registrar_resultado_teste(nome_teste, "FALHA", "; ".join(problemas))
+
+
+def rodar_suite_dos_artefatos() -> None:
+    inicializar_log_artefatos()
+    print("🗜️ Iniciando Suite dos Artefatos de Dados Brutos...")
+
+    with tempfile.TemporaryDirectory() as pasta:
+        testar_ponteiro_no_log(os.path.join(pasta, "ponteiro"))
+        testar_memoria_constante(os.path.join(pasta, "memoria"))
+        testar_rotacao_por_tamanho(os.path.join(pasta, "rotacao"))
+
+    print("🏁 Suite dos artefatos finalizada.")
+    print("📄 O arquivo 'auditoria_artefatos.log' foi gerado com as evidências.")
+
+
+if __name__ == "__main__":
+    rodar_suite_dos_artefatos()
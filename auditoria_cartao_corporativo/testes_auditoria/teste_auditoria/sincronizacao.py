@@ -0,0 +1,414 @@
+import json
+import os
+import shutil
+import tempfile
+import threading
+import time
+from datetime import datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, unquote, urlparse
+import pandas as pd
+
+import sys
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../../extracao_dados_dashboard')))
+# pyrefly: ignore [missing-import]
+from extraçao_dados import (
+    VARIAVEL_SAL_IDENTIFICADORES, AgregadosAuditoria, executar_auditoria_pasta, publicar_metricas,
+)
+# pyrefly: ignore [missing-import]
+from sincronizacao_airtable import (
+    REGISTROS_POR_LOTE, REQUISICOES_POR_SEGUNDO, TABELAS_AIRTABLE,
+    carregar_registros, sincronizar_resultados,
+)
+
+PASTA_DADOS_REAIS: str = os.path.abspath(
+    os.path.join(os.path.dirname(__file__), "../../extracao_dados_dashboard/dados_brutos")
+)
+LOG_SINCRONIZACAO: str = os.path.join(os.path.dirname(__file__), "../logs/auditoria_sincronizacao.log")
+
+# Sal fixo dos testes: a auditoria não publica identificadores sem sal.
+os.environ.setdefault(VARIAVEL_SAL_IDENTIFICADORES, "sal-dos-testes")
+TOKEN_TESTE: str = "pat_teste_local"
+BASE_TESTE: str = "appBaseDeTeste"
+N_WORKERS: int = 4
+
+
+def inicializar_log_sincronizacao() -> None:
+    """Cria ou limpa o arquivo de log no início da suite de sincronização."""
+    with open(LOG_SINCRONIZACAO, mode="w", encoding="utf-8") as f:
+        data_hora: str = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        f.write("========================================================\n")
+        f.write(" SUITE DE SINCRONIZAÇÃO - AIRTABLE (SERVIDOR SIMULADO)\n")
+        f.write(f" Data de Execução: {data_hora}\n")
+        f.write("========================================================\n\n")
+
+
+def registrar_resultado_teste(nome_teste: str, status: str, detalhe: str) -> None:
+    """Salva o resultado individual de cada teste no log de sincronização."""
+    data_hora: str = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    with open(LOG_SINCRONIZACAO, mode="a", encoding="utf-8") as f:
+        f.write(f"[{data_hora}] [{status}] {nome_teste}: {detalhe}\n")
+
+
+# ==========================================
+# SERVIDOR HTTP LOCAL QUE IMITA A API DO AIRTABLE
+# ==========================================
+class ManipuladorAirtable(BaseHTTPRequestHandler):
+    # HTTP/1.1 mantém a conexão aberta, permitindo verificar o pool da Session.
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, *args) -> None:
+        pass
+
+    def responder(self, status: int, corpo: dict, cabecalhos: dict[str, str] | None = None) -> None:
+        dados: bytes = json.dumps(corpo).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(dados)))
+        for nome, valor in (cabecalhos or {}).items():
+            self.send_header(nome, valor)
+        self.end_headers()
+        self.wfile.write(dados)
+
+    def atender(self, metodo: str) -> None:
+        simulado: ServidorAirtableSimulado = self.server.simulado
+        url = urlparse(self.path)
+        _, _, base, tabela = url.path.split("/")
+        tabela = unquote(tabela)
+        tamanho: int = int(self.headers.get("Content-Length") or 0)
+        corpo: dict = json.loads(self.rfile.read(tamanho)) if tamanho else {}
+        ids: list[str] = parse_qs(url.query).get("records[]", [])
+        n_registros: int = len(corpo.get("records", [])) or len(ids)
+
+        status: int = simulado.registrar(
+            metodo, tabela, n_registros, self.client_address[1],
+            self.headers.get("Authorization"), base,
+        )
+        corpo_forcado: dict | None = simulado.proximo_corpo_forcado() if status == 200 else None
+        if corpo_forcado is not None:
+            self.responder(200, corpo_forcado)
+        elif status == 429:
+            self.responder(429, {"errors": [{"error": {"type": "RATE_LIMIT_REACHED"}}]}, {"Retry-After": "1"})
+        elif status != 200:
+            self.responder(status, {"error": {"type": "INVALID_REQUEST"}})
+        elif metodo == "PATCH":
+            self.responder(200, {"records": simulado.upsert(tabela, corpo)})
+        else:
+            self.responder(200, {"records": simulado.remover(tabela, ids)})
+
+    def do_PATCH(self) -> None:
+        self.atender("PATCH")
+
+    def do_DELETE(self) -> None:
+        self.atender("DELETE")
+
+
+class ServidorAirtableSimulado:
+    """
+    Guarda as tabelas em memória, aplica upserts e exclusões como a API real
+    e anota cada requisição (instante, método, tabela, registros e porta do
+    cliente). `respostas_forcadas` devolve esses status antes de atender, e
+    `corpos_forcados` responde 200 com esses corpos sem aplicar nada.
+    """
+
+    def __init__(self) -> None:
+        self.tabelas: dict[str, dict[str, dict]] = {}
+        self.requisicoes: list[dict] = []
+        self.respostas_forcadas: list[int] = []
+        self.corpos_forcados: list[dict] = []
+        self.trava: threading.Lock = threading.Lock()
+        self._proximo_id: int = 0
+        self.http: ThreadingHTTPServer = ThreadingHTTPServer(("127.0.0.1", 0), ManipuladorAirtable)
+        self.http.simulado = self
+        self.url: str = f"http://127.0.0.1:{self.http.server_address[1]}/v0"
+
+    def __enter__(self) -> "ServidorAirtableSimulado":
+        threading.Thread(target=self.http.serve_forever, daemon=True).start()
+        return self
+
+    def __exit__(self, *excecao) -> None:
+        self.http.shutdown()
+        self.http.server_close()
+
+    def registrar(self, metodo: str, tabela: str, n_registros: int, porta: int, autorizacao: str | None, base: str) -> int:
+        with self.trava:
+            status: int = 200
+            if autorizacao != f"Bearer {TOKEN_TESTE}" or base != BASE_TESTE:
+                status = 401
+            elif n_registros > REGISTROS_POR_LOTE:
+                status = 422
+            elif self.respostas_forcadas:
+                status = self.respostas_forcadas.pop(0)
+            self.requisicoes.append({
+                "instante": time.monotonic(), "metodo": metodo, "tabela": tabela,
+                "registros": n_registros, "porta": porta, "status": status,
+            })
+            return status
+
+    def proximo_corpo_forcado(self) -> dict | None:
+        with self.trava:
+            return self.corpos_forcados.pop(0) if self.corpos_forcados else None
+
+    def upsert(self, tabela: str, corpo: dict) -> list[dict]:
+        chaves: list[str] = corpo["performUpsert"]["fieldsToMergeOn"]
+        registros: dict[str, dict] = self.tabelas.setdefault(tabela, {})
+        resposta: list[dict] = []
+        with self.trava:
+            for registro in corpo["records"]:
+                campos: dict = registro["fields"]
+                id_registro: str | None = next(
+                    (i for i, atuais in registros.items() if all(atuais[c] == campos[c] for c in chaves)),
+                    None,
+                )
+                if id_registro is None:
+                    self._proximo_id += 1
+                    id_registro = f"rec{self._proximo_id:014d}"
+                    registros[id_registro] = {}
+                registros[id_registro].update(campos)
+                resposta.append({"id": id_registro, "fields": registros[id_registro]})
+        return resposta
+
+    def remover(self, tabela: str, ids: list[str]) -> list[dict]:
+        with self.trava:
+            for id_registro in ids:
+                del self.tabelas[tabela][id_registro]
+        return [{"id": i, "deleted": True} for i in ids]
+
+    def limpar_requisicoes(self) -> None:
+        with self.trava:
+            self.requisicoes = []
+
+
+def tabelas_divergentes(servidor: ServidorAirtableSimulado, pasta_resultados: str) -> list[str]:
+    """Compara o conteúdo das tabelas simuladas com as linhas dos CSVs."""
+    divergentes: list[str] = []
+    for especificacao in TABELAS_AIRTABLE:
+        esperado: list[str] = sorted(
+            json.dumps(r, sort_keys=True) for r in carregar_registros(pasta_resultados, especificacao).values()
+        )
+        obtido: list[str] = sorted(
+            json.dumps(r, sort_keys=True) for r in servidor.tabelas.get(especificacao.tabela, {}).values()
+        )
+        if esperado != obtido:
+            divergentes.append(especificacao.tabela)
+    return divergentes
+
+
+def maior_rajada(instantes: list[float], janela: float = 1.0) -> int:
+    """Maior número de requisições iniciadas dentro de uma mesma janela de `janela` segundos."""
+    instantes = sorted(instantes)
+    maior: int = 0
+    inicio: int = 0
+    for fim, instante in enumerate(instantes):
+        while instante - instantes[inicio] >= janela:
+            inicio += 1
+        maior = max(maior, fim - inicio + 1)
+    return maior
+
+
+def sincronizar(servidor: ServidorAirtableSimulado, pasta: str) -> list:
+    return sincronizar_resultados(
+        pasta, token=TOKEN_TESTE, base_id=BASE_TESTE, url_base=servidor.url,
+        n_workers=N_WORKERS, espera_limite_excedido=1.0,
+    )
+
+
+def testar_carga_inicial(servidor: ServidorAirtableSimulado, pasta: str) -> None:
+    nome_teste: str = "TESTE 1 (Carga Inicial em Lotes com Limite de Taxa)"
+    problemas: list[str] = []
+
+    inicio: float = time.perf_counter()
+    resumos: list = sincronizar(servidor, pasta)
+    segundos: float = time.perf_counter() - inicio
+
+    linhas: int = sum(len(carregar_registros(pasta, e)) for e in TABELAS_AIRTABLE)
+    lotes_esperados: int = sum(-(-len(carregar_registros(pasta, e)) // REGISTROS_POR_LOTE) for e in TABELAS_AIRTABLE)
+    requisicoes: list[dict] = servidor.requisicoes
+    # Folga de 20 ms na janela para o agendamento das threads.
+    rajada: int = maior_rajada([r["instante"] for r in requisicoes], janela=0.98)
+    conexoes: int = len({r["porta"] for r in requisicoes})
+
+    if divergentes := tabelas_divergentes(servidor, pasta):
+        problemas.append(f"tabelas diferentes dos CSVs: {divergentes}")
+    if sum(r.enviados for r in resumos) != linhas:
+        problemas.append("nem todas as linhas foram enviadas")
+    if len(requisicoes) != lotes_esperados or any(r["status"] != 200 for r in requisicoes):
+        problemas.append(f"{len(requisicoes)} requisições para {lotes_esperados} lotes")
+    if rajada > REQUISICOES_POR_SEGUNDO:
+        problemas.append(f"{rajada} requisições no mesmo segundo")
+    if conexoes > N_WORKERS:
+        problemas.append(f"{conexoes} conexões abertas para {N_WORKERS} workers")
+
+    if not problemas:
+        registrar_resultado_teste(nome_teste, "SUCESSO", f"{linhas} linhas em {len(requisicoes)} upserts de até {REGISTROS_POR_LOTE} registros em {segundos:.1f}s; no máximo {rajada} requisições por segundo e {conexoes} conexão(ões) HTTP reaproveitada(s).")
+    else:
+        registrar_resultado_teste(nome_teste, "FALHA", "; ".join(problemas))
+
+
+def testar_envio_diferencial(servidor: ServidorAirtableSimulado, pasta: str) -> None:
+    nome_teste: str = "TESTE 2 (Envio Diferencial contra o Último Estado)"
+    problemas: list[str] = []
+
+    servidor.limpar_requisicoes()
+    sincronizar(servidor, pasta)
+    if servidor.requisicoes:
+        problemas.append(f"{len(servidor.requisicoes)} requisições sem nenhuma mudança nos CSVs")
+
+    # Uma linha alterada no score e uma linha que saiu da concentração.
+    caminho_score: str = os.path.join(pasta, TABELAS_AIRTABLE[0].arquivo_csv)
+    score: pd.DataFrame = pd.read_csv(caminho_score, sep=";", dtype=str, keep_default_na=False)
+    score.loc[0, "SCORE_RISCO"] = "1.0"
+    score.to_csv(caminho_score, sep=";", index=False, encoding="utf-8")
+    caminho_concentracao: str = os.path.join(pasta, TABELAS_AIRTABLE[1].arquivo_csv)
+    concentracao: pd.DataFrame = pd.read_csv(caminho_concentracao, sep=";", dtype=str, keep_default_na=False)
+    concentracao.iloc[:-1].to_csv(caminho_concentracao, sep=";", index=False, encoding="utf-8")
+
+    servidor.limpar_requisicoes()
+    sincronizar(servidor, pasta)
+    enviados: list[tuple] = sorted((r["metodo"], r["tabela"], r["registros"]) for r in servidor.requisicoes)
+    esperados: list[tuple] = [("DELETE", "top_concentracao_mensal", 1), ("PATCH", "top_5_score_mensal", 1)]
+    if enviados != esperados:
+        problemas.append(f"requisições enviadas {enviados}, esperadas {esperados}")
+    if divergentes := tabelas_divergentes(servidor, pasta):
+        problemas.append(f"tabelas diferentes dos CSVs: {divergentes}")
+
+    if not problemas:
+        registrar_resultado_teste(nome_teste, "SUCESSO", "Sem mudanças, nenhuma requisição; com 1 linha alterada e 1 removida, só 1 upsert e 1 exclusão.")
+    else:
+        registrar_resultado_teste(nome_teste, "FALHA", "; ".join(problemas))
+
+
+def testar_falhas_e_reenvio(servidor: ServidorAirtableSimulado, pasta: str) -> None:
+    nome_teste: str = "TESTE 3 (HTTP 429 e Reenvio de Lote Recusado)"
+    problemas: list[str] = []
+
+    caminho_score: str = os.path.join(pasta, TABELAS_AIRTABLE[0].arquivo_csv)
+    score: pd.DataFrame = pd.read_csv(caminho_score, sep=";", dtype=str, keep_default_na=False)
+    score.loc[:24, "SCORE_RISCO"] = "2.0"
+    score.to_csv(caminho_score, sep=";", index=False, encoding="utf-8")
+
+    # Dois 429 (o cliente espera e repete) e um 422 (o lote fica para a próxima vez).
+    servidor.limpar_requisicoes()
+    servidor.respostas_forcadas = [429, 429, 422]
+    resumos: list = sincronizar(servidor, pasta)
+    falhas: int = sum(len(r.lotes_com_falha) for r in resumos)
+    if falhas != 1:
+        problemas.append(f"{falhas} lotes com falha, esperado 1")
+    if sum(r["status"] == 429 for r in servidor.requisicoes) != 2:
+        problemas.append("o servidor não devolveu os dois 429")
+
+    servidor.limpar_requisicoes()
+    resumos = sincronizar(servidor, pasta)
+    if len(servidor.requisicoes) != 1 or sum(len(r.lotes_com_falha) for r in resumos):
+        problemas.append(f"{len(servidor.requisicoes)} requisições no reenvio, esperada 1")
+    if divergentes := tabelas_divergentes(servidor, pasta):
+        problemas.append(f"tabelas diferentes dos CSVs: {divergentes}")
+
+    if not problemas:
+        registrar_resultado_teste(nome_teste, "SUCESSO", "Os 429 foram aguardados e repetidos; o lote recusado ficou fora do estado e foi o único reenviado na sincronização seguinte.")
+    else:
+        registrar_resultado_teste(nome_teste, "FALHA", "; ".join(problemas))
+
+
+def testar_resposta_sem_registros(servidor: ServidorAirtableSimulado, pasta: str) -> None:
+    nome_teste: str = "TESTE 4 (HTTP 200 com Corpo de Erro ou Incompleto)"
+    problemas: list[str] = []
+
+    caminho_score: str = os.path.join(pasta, TABELAS_AIRTABLE[0].arquivo_csv)
+    score: pd.DataFrame = pd.read_csv(caminho_score, sep=";", dtype=str, keep_default_na=False)
+    score.loc[:14, "SCORE_RISCO"] = "3.0"
+    score.to_csv(caminho_score, sep=";", index=False, encoding="utf-8")
+
+    # Um 200 com corpo de erro e um 200 com menos registros do que os enviados.
+    servidor.limpar_requisicoes()
+    servidor.corpos_forcados = [{"error": {"type": "INVALID_REQUEST"}}, {"records": []}]
+    try:
+        resumos: list = sincronizar(servidor, pasta)
+    except (KeyError, TypeError) as erro:
+        problemas.append(f"a sincronização abortou com {type(erro).__name__}: {erro}")
+        resumos = []
+    falhas: int = sum(len(r.lotes_com_falha) for r in resumos)
+    if resumos and falhas != 2:
+        problemas.append(f"{falhas} lotes com falha, esperados 2")
+
+    servidor.limpar_requisicoes()
+    resumos = sincronizar(servidor, pasta)
+    if len(servidor.requisicoes) != 2 or sum(len(r.lotes_com_falha) for r in resumos):
+        problemas.append(f"{len(servidor.requisicoes)} requisições no reenvio, esperadas 2")
+    if divergentes := tabelas_divergentes(servidor, pasta):
+        problemas.append(f"tabelas diferentes dos CSVs: {divergentes}")
+
+    if not problemas:
+        registrar_resultado_teste(nome_teste, "SUCESSO", "Respostas 200 sem 'records' (ou com registros faltando) viraram lotes com falha, sem abortar a sincronização, e foram reenviadas na seguinte.")
+    else:
+        registrar_resultado_teste(nome_teste, "FALHA", "; ".join(problemas))
+
+
+def testar_homonimos_mascarados(servidor: ServidorAirtableSimulado) -> None:
+    nome_teste: str = "TESTE 5 (Chave de Upsert com Nomes Mascarados Iguais)"
+    problemas: list[str] = []
+
+    # JOAO SILVA e JOAO SOUZA viram "JOAO S." nos CSVs; o ID PORTADOR os separa.
+    portadores: list[str] = ["JOAO SILVA", "JOAO SOUZA"]
+    agregados: AgregadosAuditoria = AgregadosAuditoria(
+        alertas=pd.DataFrame({
+            "ANO_MES": "2025-01", "NOME PORTADOR": portadores,
+            "REGRA": "R1 - Gasto Diário Elevado", "CENTAVOS": [500_000.0, 400_000.0], "TRANSACOES": [1, 1],
+        }),
+        fornecedor=pd.DataFrame({
+            "ANO_MES": "2025-01", "NOME PORTADOR": portadores,
+            "CNPJ OU CPF FAVORECIDO": "***.123.456-**", "NOME FAVORECIDO": ["ANA LIMA", "ANA LEAL"],
+            "CENTAVOS": [500_000.0, 400_000.0],
+        }),
+        total=pd.DataFrame({"ANO_MES": "2025-01", "NOME PORTADOR": portadores, "CENTAVOS": [500_000.0, 400_000.0]}),
+    )
+
+    pasta: str = tempfile.mkdtemp()
+    try:
+        publicar_metricas(agregados, pasta)
+        servidor.limpar_requisicoes()
+        resumos: list = sincronizar(servidor, pasta)
+        for especificacao in TABELAS_AIRTABLE:
+            registros: dict = carregar_registros(pasta, especificacao)
+            nomes: set[str] = {r["NOME PORTADOR"] for r in registros.values()}
+            if len(registros) != 2 or nomes != {"JOAO S."}:
+                problemas.append(f"{especificacao.tabela}: {len(registros)} chaves para os nomes {nomes}")
+            if len(servidor.tabelas.get(especificacao.tabela, {})) != 2:
+                problemas.append(f"{especificacao.tabela}: os dois portadores não viraram dois registros")
+        if sum(len(r.lotes_com_falha) for r in resumos):
+            problemas.append("houve lotes com falha")
+    except ValueError as erro:
+        problemas.append(f"a sincronização recusou as chaves: {erro}")
+    finally:
+        shutil.rmtree(pasta)
+
+    if not problemas:
+        registrar_resultado_teste(nome_teste, "SUCESSO", "Dois portadores com o mesmo nome mascarado (e favorecidos com o mesmo CPF mascarado) viraram registros distintos pelo ID PORTADOR e ID FAVORECIDO.")
+    else:
+        registrar_resultado_teste(nome_teste, "FALHA", "; ".join(problemas))
+
+
+def rodar_suite_de_sincronizacao() -> None:
+    inicializar_log_sincronizacao()
+    print("🔄 Iniciando Suite de Sincronização com o Airtable (servidor local simulado)...")
+
+    pasta_temp: str = tempfile.mkdtemp()
+    try:
+        # CSVs gerados na hora a partir de dados_brutos, com as colunas de ID.
+        executar_auditoria_pasta(PASTA_DADOS_REAIS, pasta_temp)
+        with ServidorAirtableSimulado() as servidor:
+            testar_carga_inicial(servidor, pasta_temp)
+            testar_envio_diferencial(servidor, pasta_temp)
+            testar_falhas_e_reenvio(servidor, pasta_temp)
+            testar_resposta_sem_registros(servidor, pasta_temp)
+        with ServidorAirtableSimulado() as servidor:
+            testar_homonimos_mascarados(servidor)
+    finally:
+        shutil.rmtree(pasta_temp)
+
+    print("🏁 Suite de sincronização finalizada.")
+    print("📄 O arquivo 'auditoria_sincronizacao.log' foi gerado com as evidências.")
+
+
+if __name__ == "__main__":
+    rodar_suite_de_sincronizacao()
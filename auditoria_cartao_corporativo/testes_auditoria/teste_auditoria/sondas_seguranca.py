@@ -0,0 +1,193 @@
+import asyncio
+import json
+import os
+import time
+from dataclasses import asdict, dataclass
+from datetime import datetime
+from typing import Callable
+from urllib.parse import urlsplit
+import aiohttp
+
+import confidencialidade
+import integridade
+import versionamento
+
+PASTA_LOGS: str = os.path.join(os.path.dirname(__file__), "../logs")
+ARQUIVO_RELATORIO_SONDAS: str = "relatorio_sondas_seguranca.json"
+
+
+@dataclass(frozen=True)
+class Sonda:
+    """Um teste de segurança: a requisição, a avaliação da resposta e o seu log."""
+
+    nome: str
+    arquivo_log: str
+    mensagem_inicio: str
+    mensagem_fim: str
+    montar_requisicao: Callable[[], dict]
+    avaliar_resposta: Callable[[int, str], tuple[str, str, list[tuple]]]
+    formatar_log: Callable[..., str]
+
+
+SONDAS: tuple[Sonda, ...] = (
+    Sonda(
+        "confidencialidade", confidencialidade.ARQUIVO_LOG,
+        confidencialidade.MENSAGEM_INICIO, confidencialidade.MENSAGEM_FIM,
+        confidencialidade.montar_requisicao, confidencialidade.avaliar_resposta,
+        confidencialidade.formatar_log,
+    ),
+    Sonda(
+        "integridade", integridade.ARQUIVO_LOG,
+        integridade.MENSAGEM_INICIO, integridade.MENSAGEM_FIM,
+        integridade.montar_requisicao, integridade.avaliar_resposta,
+        integridade.formatar_log_integridade,
+    ),
+    Sonda(
+        "versionamento", versionamento.ARQUIVO_LOG,
+        versionamento.MENSAGEM_INICIO, versionamento.MENSAGEM_FIM,
+        versionamento.montar_requisicao, versionamento.avaliar_resposta,
+        versionamento.formatar_log_governance,
+    ),
+)
+
+
+@dataclass
+class ResultadoSonda:
+    sonda: str
+    situacao: str
+    mensagem: str
+    status_http: int | None
+    tentativas: int
+    segundos: float
+
+
+def redirecionar(url: str, url_base: str | None) -> str:
+    """Troca esquema e host de `url` por `url_base` (servidor local de testes)."""
+    if url_base is None:
+        return url
+    partes = urlsplit(url)
+    return url_base.rstrip("/") + partes.path + (f"?{partes.query}" if partes.query else "")
+
+
+async def executar_sonda(
+    sessao: aiohttp.ClientSession,
+    sonda: Sonda,
+    url_base: str | None,
+    tentativas: int,
+    espera_base: float,
+    timeout: float | None,
+) -> tuple[ResultadoSonda, list[str]]:
+    """
+    Executa uma sonda, repetindo em erro de conexão, tempo esgotado e HTTP 5xx.
+
+    Devolve o resultado e o trecho de log já formatado, para ser gravado de
+    uma vez no arquivo da sonda.
+    """
+    inicio: float = time.perf_counter()
+    trechos: list[str] = [sonda.formatar_log(sonda.mensagem_inicio)]
+    try:
+        requisicao: dict = sonda.montar_requisicao()
+    except ValueError as erro:
+        trechos.append(sonda.formatar_log(str(erro)))
+        return ResultadoSonda(sonda.nome, "ERRO", str(erro), None, 0, 0.0), trechos
+
+    timeout_requisicao: float = requisicao.pop("timeout")
+    limite: aiohttp.ClientTimeout = aiohttp.ClientTimeout(total=timeout or timeout_requisicao)
+    url: str = redirecionar(requisicao.pop("url"), url_base)
+
+    status: int | None = None
+    corpo: str = ""
+    falha: str = ""
+    tentativa: int = 0
+    for tentativa in range(1, tentativas + 1):
+        try:
+            async with sessao.request(url=url, timeout=limite, **requisicao) as resposta:
+                status, corpo = resposta.status, await resposta.text()
+            if status < 500:
+                break
+            falha = f"HTTP {status}"
+        except asyncio.TimeoutError:
+            status, falha = None, f"tempo limite de {limite.total:g}s esgotado"
+        except aiohttp.ClientError as erro:
+            status, falha = None, f"{type(erro).__name__}: {erro}"
+        if tentativa < tentativas:
+            await asyncio.sleep(espera_base * 2 ** (tentativa - 1))
+
+    if status is None:
+        mensagem: str = f"❌ ERRO EXCEÇÃO DE CONEXÃO: {falha}"
+        situacao: str = "ERRO"
+        trechos.append(sonda.formatar_log(mensagem))
+    else:
+        situacao, mensagem, registros = sonda.avaliar_resposta(status, corpo)
+        trechos += [sonda.formatar_log(*registro) for registro in registros]
+    trechos.append(sonda.formatar_log(sonda.mensagem_fim))
+
+    segundos: float = time.perf_counter() - inicio
+    return ResultadoSonda(sonda.nome, situacao, mensagem, status, tentativa, segundos), trechos
+
+
+async def executar_sondas_async(
+    sondas: tuple[Sonda, ...],
+    url_base: str | None,
+    tentativas: int,
+    espera_base: float,
+    timeouts: dict[str, float],
+    limite_conexoes: int,
+) -> list[tuple[ResultadoSonda, list[str]]]:
+    # Uma sessão para todas as sondas: o pool de conexões e o cache de DNS são compartilhados.
+    conector: aiohttp.TCPConnector = aiohttp.TCPConnector(limit=limite_conexoes)
+    async with aiohttp.ClientSession(connector=conector) as sessao:
+        return await asyncio.gather(*(
+            executar_sonda(sessao, sonda, url_base, tentativas, espera_base, timeouts.get(sonda.nome))
+            for sonda in sondas
+        ))
+
+
+def executar_sondas(
+    sondas: tuple[Sonda, ...] = SONDAS,
+    url_base: str | None = None,
+    tentativas: int = 3,
+    espera_base: float = 1.0,
+    timeouts: dict[str, float] | None = None,
+    limite_conexoes: int = 10,
+    pasta_logs: str = PASTA_LOGS,
+) -> list[ResultadoSonda]:
+    """
+    Executa todas as sondas de segurança ao mesmo tempo.
+
+    Cada sonda usa o timeout da própria requisição (ou o de `timeouts`) e é
+    repetida até `tentativas` vezes, com espera exponencial a partir de
+    `espera_base`. Ao final, o trecho de cada sonda é acrescentado ao seu log
+    de sempre (uma abertura por arquivo) e o conjunto vai para
+    `relatorio_sondas_seguranca.json`. `url_base` aponta as sondas para um
+    servidor local de testes.
+    """
+    inicio: float = time.perf_counter()
+    data_hora: str = datetime.now().isoformat(timespec="seconds")
+    execucoes: list[tuple[ResultadoSonda, list[str]]] = asyncio.run(executar_sondas_async(
+        sondas, url_base, tentativas, espera_base, timeouts or {}, limite_conexoes
+    ))
+    total_segundos: float = time.perf_counter() - inicio
+
+    os.makedirs(pasta_logs, exist_ok=True)
+    for sonda, (_, trechos) in zip(sondas, execucoes):
+        caminho_log: str = os.path.join(pasta_logs, os.path.basename(sonda.arquivo_log))
+        with open(caminho_log, mode="a", encoding="utf-8") as f:
+            f.write("".join(trechos))
+
+    resultados: list[ResultadoSonda] = [resultado for resultado, _ in execucoes]
+    relatorio: dict = {
+        "data_hora": data_hora,
+        "total_segundos": round(total_segundos, 6),
+        "sondas": [asdict(resultado) for resultado in resultados],
+    }
+    with open(os.path.join(pasta_logs, ARQUIVO_RELATORIO_SONDAS), mode="w", encoding="utf-8") as f:
+        json.dump(relatorio, f, ensure_ascii=False, indent=2)
+    return resultados
+
+
+if __name__ == "__main__":
+    print("🛡️ Executando as sondas de confidencialidade, integridade e versionamento em paralelo...")
+    for resultado in executar_sondas():
+        print(f"[{resultado.situacao}] {resultado.sonda} ({resultado.segundos:.2f}s): {resultado.mensagem}")
+    print(f"📄 Relatório consolidado em 'logs/{ARQUIVO_RELATORIO_SONDAS}'.")
@@ -0,0 +1,227 @@
+import json
+import os
+import tempfile
+import threading
+import time
+from datetime import datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse
+
+from sondas_seguranca import ARQUIVO_RELATORIO_SONDAS, SONDAS, executar_sondas
+
+LOG_SONDAS: str = os.path.join(os.path.dirname(__file__), "../logs/auditoria_sondas_simuladas.log")
+ATRASO_SEGUNDOS: float = 1.0
+
+# Caminhos das três sondas e o que o servidor simulado responde a cada uma.
+CAMINHO_CONFIDENCIALIDADE: str = "/v0.3/application/appjku7kXHQcVCcXM/read"
+CAMINHO_INTEGRIDADE: str = "/v0.3/application/appjku7kXHQcVCcXM/alter"
+CAMINHO_VERSIONAMENTO: str = "/v0/meta/enterpriseAccounts/entId/auditLogs"
+
+
+def inicializar_log_sondas() -> None:
+    """Cria ou limpa o arquivo de log no início da suite das sondas."""
+    with open(LOG_SONDAS, mode="w", encoding="utf-8") as f:
+        data_hora: str = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        f.write("========================================================\n")
+        f.write(" SUITE DAS SONDAS DE SEGURANÇA - SERVIDOR SIMULADO\n")
+        f.write(f" Data de Execução: {data_hora}\n")
+        f.write("========================================================\n\n")
+
+
+def registrar_resultado_teste(nome_teste: str, status: str, detalhe: str) -> None:
+    """Salva o resultado individual de cada teste no log das sondas."""
+    data_hora: str = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    with open(LOG_SONDAS, mode="a", encoding="utf-8") as f:
+        f.write(f"[{data_hora}] [{status}] {nome_teste}: {detalhe}\n")
+
+
+# ==========================================
+# SERVIDOR HTTP LOCAL NO LUGAR DO AIRTABLE
+# ==========================================
+class ManipuladorSondas(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, *args) -> None:
+        pass
+
+    def atender(self) -> None:
+        simulado: ServidorSondasSimulado = self.server.simulado
+        caminho: str = urlparse(self.path).path
+        tamanho: int = int(self.headers.get("Content-Length") or 0)
+        if tamanho:
+            self.rfile.read(tamanho)
+        status, atraso = simulado.registrar(caminho, self.client_address[1])
+        time.sleep(atraso)
+
+        dados: bytes = json.dumps({"error": "NOT_FOUND" if status == 404 else status}).encode("utf-8")
+        try:
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(dados)))
+            self.end_headers()
+            self.wfile.write(dados)
+        except (BrokenPipeError, ConnectionResetError):
+            # O cliente desistiu por tempo esgotado antes da resposta.
+            self.close_connection = True
+
+    def do_GET(self) -> None:
+        self.atender()
+
+    def do_POST(self) -> None:
+        self.atender()
+
+
+class ServidorSondasSimulado:
+    """
+    Responde a cada caminho com um status fixo após `atraso` segundos.
+    `respostas_forcadas[caminho]` devolve antes esses status (ex.: 503) e
+    `atrasos_forcados[caminho]`, esses atrasos, um por requisição.
+    """
+
+    def __init__(self, status: dict[str, int], atraso: float) -> None:
+        self.status: dict[str, int] = status
+        self.atraso: float = atraso
+        self.respostas_forcadas: dict[str, list[int]] = {}
+        self.atrasos_forcados: dict[str, list[float]] = {}
+        self.requisicoes: list[tuple[str, int]] = []
+        self.trava: threading.Lock = threading.Lock()
+        self.http: ThreadingHTTPServer = ThreadingHTTPServer(("127.0.0.1", 0), ManipuladorSondas)
+        self.http.daemon_threads = True
+        self.http.simulado = self
+        self.url: str = f"http://127.0.0.1:{self.http.server_address[1]}"
+
+    def __enter__(self) -> "ServidorSondasSimulado":
+        threading.Thread(target=self.http.serve_forever, daemon=True).start()
+        return self
+
+    def __exit__(self, *excecao) -> None:
+        self.http.shutdown()
+        self.http.server_close()
+
+    def registrar(self, caminho: str, porta: int) -> tuple[int, float]:
+        with self.trava:
+            self.requisicoes.append((caminho, porta))
+            forcadas: list[int] = self.respostas_forcadas.get(caminho, [])
+            atrasos: list[float] = self.atrasos_forcados.get(caminho, [])
+            status: int = forcadas.pop(0) if forcadas else self.status[caminho]
+            atraso: float = atrasos.pop(0) if atrasos else self.atraso
+            return status, atraso
+
+
+def servidor_bloqueando_tudo() -> ServidorSondasSimulado:
+    """Airtable bem configurado: leitura e escrita anônimas recusadas, plano sem auditLogs."""
+    return ServidorSondasSimulado(
+        {CAMINHO_CONFIDENCIALIDADE: 401, CAMINHO_INTEGRIDADE: 403, CAMINHO_VERSIONAMENTO: 404},
+        ATRASO_SEGUNDOS,
+    )
+
+
+def testar_execucao_concorrente(pasta_logs: str) -> None:
+    nome_teste: str = "TESTE 1 (Sondas em Paralelo com Relatório Único)"
+    problemas: list[str] = []
+
+    with servidor_bloqueando_tudo() as servidor:
+        inicio: float = time.perf_counter()
+        resultados = executar_sondas(url_base=servidor.url, pasta_logs=pasta_logs)
+        segundos: float = time.perf_counter() - inicio
+
+    situacoes: dict[str, str] = {r.sonda: r.situacao for r in resultados}
+    esperadas: dict[str, str] = {"confidencialidade": "APROVADO", "integridade": "APROVADO", "versionamento": "REPROVADO"}
+    if situacoes != esperadas:
+        problemas.append(f"situações {situacoes}, esperadas {esperadas}")
+    # Em sequência seriam 3 x ATRASO_SEGUNDOS; em paralelo, o tempo da sonda mais lenta.
+    if segundos > 1.8 * ATRASO_SEGUNDOS:
+        problemas.append(f"{segundos:.2f}s para sondas de {ATRASO_SEGUNDOS:.1f}s cada")
+
+    with open(os.path.join(pasta_logs, ARQUIVO_RELATORIO_SONDAS), encoding="utf-8") as f:
+        relatorio: dict = json.load(f)
+    if [s["sonda"] for s in relatorio["sondas"]] != [s.nome for s in SONDAS]:
+        problemas.append("relatório consolidado incompleto")
+    for sonda in SONDAS:
+        with open(os.path.join(pasta_logs, os.path.basename(sonda.arquivo_log)), encoding="utf-8") as f:
+            conteudo: str = f.read()
+        if sonda.mensagem_inicio not in conteudo or sonda.mensagem_fim.strip() not in conteudo:
+            problemas.append(f"log de {sonda.nome} sem início ou fim")
+
+    if not problemas:
+        registrar_resultado_teste(nome_teste, "SUCESSO", f"3 sondas de {ATRASO_SEGUNDOS:.1f}s cada concluídas em {segundos:.2f}s; relatório consolidado e logs de cada sonda gravados.")
+    else:
+        registrar_resultado_teste(nome_teste, "FALHA", "; ".join(problemas))
+
+
+def testar_repeticao_com_pool(pasta_logs: str) -> None:
+    nome_teste: str = "TESTE 2 (Repetição em HTTP 5xx com Pool Compartilhado)"
+    problemas: list[str] = []
+
+    with servidor_bloqueando_tudo() as servidor:
+        servidor.atraso = 0.0
+        servidor.respostas_forcadas[CAMINHO_INTEGRIDADE] = [503, 502]
+        resultados = executar_sondas(url_base=servidor.url, espera_base=0.1, pasta_logs=pasta_logs)
+        requisicoes: list[tuple[str, int]] = list(servidor.requisicoes)
+
+    integridade = next(r for r in resultados if r.sonda == "integridade")
+    if (integridade.tentativas, integridade.situacao, integridade.status_http) != (3, "APROVADO", 403):
+        problemas.append(f"integridade terminou com {integridade}")
+    # As repetições saem do pool compartilhado: nenhuma conexão além das 3 abertas em paralelo.
+    conexoes: int = len({porta for _, porta in requisicoes})
+    if len(requisicoes) != 5 or conexoes > len(SONDAS):
+        problemas.append(f"{len(requisicoes)} requisições em {conexoes} conexões")
+
+    if not problemas:
+        registrar_resultado_teste(nome_teste, "SUCESSO", f"Dois 5xx seguidos de 403: a sonda repetiu pelas conexões já abertas do pool ({conexoes} para {len(requisicoes)} requisições) e classificou a resposta final.")
+    else:
+        registrar_resultado_teste(nome_teste, "FALHA", "; ".join(problemas))
+
+
+def testar_tempo_limite(pasta_logs: str) -> None:
+    nome_teste: str = "TESTE 3 (Tempo Limite por Sonda)"
+    problemas: list[str] = []
+
+    with servidor_bloqueando_tudo() as servidor:
+        servidor.atraso = 0.0
+        servidor.atrasos_forcados[CAMINHO_VERSIONAMENTO] = [5.0, 5.0]
+        inicio: float = time.perf_counter()
+        resultados = executar_sondas(
+            url_base=servidor.url, tentativas=2, espera_base=0.1,
+            timeouts={"versionamento": 0.5}, pasta_logs=pasta_logs,
+        )
+        segundos: float = time.perf_counter() - inicio
+
+    situacoes: dict[str, str] = {r.sonda: r.situacao for r in resultados}
+    if situacoes["versionamento"] != "ERRO" or "tempo limite" not in resultados[2].mensagem:
+        problemas.append(f"versionamento terminou com {resultados[2]}")
+    if situacoes["confidencialidade"] != "APROVADO" or situacoes["integridade"] != "APROVADO":
+        problemas.append("a sonda lenta atrapalhou as demais")
+    if segundos > 2.0:
+        problemas.append(f"{segundos:.2f}s com tempo limite de 0.5s e 2 tentativas")
+
+    if not problemas:
+        registrar_resultado_teste(nome_teste, "SUCESSO", f"Sonda travada encerrada por tempo limite após 2 tentativas em {segundos:.2f}s, sem atrasar as demais.")
+    else:
+        registrar_resultado_teste(nome_teste, "FALHA", "; ".join(problemas))
+
+
+def rodar_suite_das_sondas() -> None:
+    inicializar_log_sondas()
+    print("🛡️ Iniciando Suite das Sondas de Segurança (servidor local simulado)...")
+
+    token_original: str | None = os.environ.get("AIRTABLE_API_TOKEN")
+    os.environ["AIRTABLE_API_TOKEN"] = "pat_teste_local"
+    try:
+        # Os logs das sondas vão para uma pasta temporária, sem misturar com os reais.
+        with tempfile.TemporaryDirectory() as pasta_logs:
+            testar_execucao_concorrente(pasta_logs)
+            testar_repeticao_com_pool(pasta_logs)
+            testar_tempo_limite(pasta_logs)
+    finally:
+        if token_original is None:
+            del os.environ["AIRTABLE_API_TOKEN"]
+        else:
+            os.environ["AIRTABLE_API_TOKEN"] = token_original
+
+    print("🏁 Suite das sondas finalizada.")
+    print("📄 O arquivo 'auditoria_sondas_simuladas.log' foi gerado com as evidências.")
+
+
+if __name__ == "__main__":
+    rodar_suite_das_sondas()
@@ -0,0 +1,11 @@
+import pytest
+
+from pipeline import CENARIOS
+
+
+# Cada caso recebe o seu tmp_path, sem pastas compartilhadas no diretório
+# atual: os cenários rodam em paralelo com `pytest -n auto` (pytest-xdist).
+@pytest.mark.parametrize("nome_teste", list(CENARIOS))
+def test_cenario_pipeline(nome_teste: str, tmp_path) -> None:
+    status, detalhe = CENARIOS[nome_teste](str(tmp_path))
+    assert status == "SUCESSO", f"{nome_teste}: {detalhe}"